@@ -0,0 +1,156 @@
+import os
+import numpy as np
+from models import Aircraft, SimulationCase
+from cases import derive_case, grid_cases
+from batch import run_batch
+from hinges import get_control_types
+
+# Database axis name -> (SimulationCase value field, mode field, mode)
+AXIS_FIELDS = {
+    "alpha": ("aoa_val", "aoa_mode", "Angle"),
+    "beta": ("beta", None, None),
+    "Mach": ("Mach", None, None),
+    "pb2V": ("pb2V", None, None),
+    "qc2V": ("qc2V", None, None),
+    "rb2V": ("rb2V", None, None),
+    "Flap": ("flap_val", "flap_mode", "Deflection"),
+    "Elevator": ("elevator_val", "elevator_mode", "Deflection"),
+    "Aileron": ("aileron_val", "aileron_mode", "Deflection"),
+    "Rudder": ("rudder_val", "rudder_mode", "Deflection"),
+}
+
+# Coefficients and derivatives stored by default (AVL output names)
+DATABASE_OUTPUTS = (
+    "CLtot", "CDtot", "CYtot", "Cltot", "Cmtot", "Cntot",
+    "CLa", "CYa", "Cla", "Cma", "Cna", "CLb", "CYb", "Clb", "Cmb", "Cnb",
+    "CLp", "CYp", "Clp", "Cmp", "Cnp", "CLq", "CYq", "Clq", "Cmq", "Cnq",
+    "CLr", "CYr", "Clr", "Cmr", "Cnr",
+)
+
+
+def database_outputs(aircraft: Aircraft, outputs=DATABASE_OUTPUTS) -> tuple:
+    """
+    Returns `outputs` plus the control derivatives of every control type on the aircraft.
+    """
+    controls = sorted(set(get_control_types(aircraft).values()))
+    return tuple(outputs) + tuple(f"{coef}d_{ctrl}" for ctrl in controls for coef in ("CL", "CDff", "CY", "Cl", "Cm", "Cn"))
+
+
+def build_aero_database(aircraft: Aircraft, base_case: SimulationCase, axes: dict, filepath: str,
+                        results_dir: str = "results", outputs: tuple = None, prefix: str = "aerodb",
+                        workers: int = None, cache: bool = True, **batch_options) -> str:
+    """
+    Runs the full grid of `axes` and writes the coefficients and derivatives as
+    gridded lookup tables to a compressed `.npz` file, read back by `AeroTable`.
+
+    Parameters:
+        aircraft (Aircraft): Aircraft model to run.
+        base_case (SimulationCase): Case supplying everything not on an axis (Cdo, rho, g, ...).
+        axes (dict): {axis name: increasing values}; axis names are the keys of AXIS_FIELDS,
+            e.g. {"alpha": [-4, 0, 4, 8], "Mach": [0.1, 0.3], "Elevator": [-10, 0, 10]}.
+        filepath (str): Path of the `.npz` file to write.
+        results_dir (str): Directory for the generated decks and results.
+        outputs (tuple): Output names to tabulate; defaults to `database_outputs(aircraft)`.
+        prefix (str): Prefix of the job names.
+        workers (int): Concurrent AVL sessions; defaults to the number of CPUs.
+        cache (bool): Reuse earlier results of identical cases.
+        **batch_options: Passed to `batch.run_batch` (solver, avl_exe_path, mesh, ...).
+
+    Returns:
+        str: `filepath`.
+    """
+    unknown = [axis for axis in axes if axis not in AXIS_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown database axes: {unknown}")
+
+    outputs = outputs or database_outputs(aircraft)
+    axis_values = {axis: np.asarray(values, dtype=float) for axis, values in axes.items()}
+
+    modes = {AXIS_FIELDS[axis][1]: AXIS_FIELDS[axis][2] for axis in axes if AXIS_FIELDS[axis][1]}
+    base = derive_case(base_case, prefix, **modes)
+    cases = grid_cases(base, {AXIS_FIELDS[axis][0]: values for axis, values in axis_values.items()}, "grid")
+
+    results = run_batch(aircraft, cases, results_dir, prefix=prefix, workers=workers or os.cpu_count() or 1,
+                        cache=cache, **batch_options)
+
+    shape = tuple(len(values) for values in axis_values.values())
+    tables = {name: np.full(len(cases), np.nan, dtype=np.float32) for name in outputs}
+    for index, case in enumerate(cases):
+        values = results.get(case.name, {})
+        for name in outputs:
+            if name in values:
+                tables[name][index] = values[name]
+
+    np.savez_compressed(
+        filepath,
+        axes=np.array(list(axis_values)),
+        outputs=np.array(list(outputs)),
+        **{f"axis_{axis}": values for axis, values in axis_values.items()},
+        **{f"table_{name}": table.reshape(shape) for name, table in tables.items()},
+    )
+    print(f"Aero database written to {filepath}: {len(cases)} cases, {len(outputs)} outputs.")
+    return filepath
+
+
+class AeroTable:
+    """
+    Reader of a database written by `build_aero_database` with vectorized
+    multilinear interpolation. Queries outside an axis are clamped to its ends.
+    """
+
+    def __init__(self, filepath: str):
+        with np.load(filepath) as data:
+            self.axes = [str(axis) for axis in data["axes"]]
+            self.outputs = [str(name) for name in data["outputs"]]
+            self.axis_values = [data[f"axis_{axis}"].astype(float) for axis in self.axes]
+            self.tables = {name: data[f"table_{name}"] for name in self.outputs}
+
+    def _weights(self, coords: dict):
+        """Returns per-axis (lower index, upper weight) arrays for the broadcast query points."""
+        missing = [axis for axis in self.axes if axis not in coords]
+        if missing:
+            raise ValueError(f"Missing database coordinates: {missing}")
+
+        points = np.broadcast_arrays(*(np.asarray(coords[axis], dtype=float) for axis in self.axes))
+        lower, upper = [], []
+        for grid, x in zip(self.axis_values, points):
+            if len(grid) == 1:
+                lower.append(np.zeros(x.shape, dtype=int))
+                upper.append(np.zeros(x.shape))
+                continue
+            x = np.clip(x, grid[0], grid[-1])
+            i = np.clip(np.searchsorted(grid, x, side="right") - 1, 0, len(grid) - 2)
+            lower.append(i)
+            upper.append((x - grid[i]) / (grid[i + 1] - grid[i]))
+        return lower, upper, points[0].shape
+
+    def interpolate(self, names, **coords) -> dict:
+        """
+        Interpolates outputs at query points given per axis, e.g.
+        table.interpolate(["CLtot", "Cmtot"], alpha=np.linspace(-4, 8, 100), Mach=0.2, Elevator=0.0).
+
+        Returns:
+            dict: {output name: array broadcast over the coordinate arrays}.
+        """
+        if isinstance(names, str):
+            names = [names]
+        lower, upper, shape = self._weights(coords)
+
+        results = {name: np.zeros(shape) for name in names}
+        for corner in range(2 ** len(self.axes)):
+            weight = np.ones(shape)
+            index = []
+            for k, (i, w) in enumerate(zip(lower, upper)):
+                if (corner >> k) & 1:
+                    weight = weight * w
+                    index.append(np.minimum(i + 1, len(self.axis_values[k]) - 1))
+                else:
+                    weight = weight * (1.0 - w)
+                    index.append(i)
+            index = tuple(index)
+            for name in names:
+                results[name] += weight * self.tables[name][index]
+        return results
+
+    def __call__(self, name: str, **coords):
+        return self.interpolate([name], **coords)[name]
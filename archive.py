@@ -0,0 +1,338 @@
+import os
+import time
+import zlib
+import hashlib
+import sqlite3
+from contextlib import contextmanager
+from batch import ARRAY_SUFFIXES, CACHE_DIR
+from export import export_plan
+
+# Archive database inside the results directory
+ARCHIVE_FILE = "archive.sqlite"
+
+# Per-job result files and per-deck input files moved into the archive
+JOB_SUFFIXES = (".sim",) + ARRAY_SUFFIXES
+DECK_SUFFIXES = (".avl", ".mass", ".run", "_avl_commands.txt")
+
+# Default policy of `maintain_results`: archive jobs an hour after they finish, keep everything.
+# The age, count and size limits also apply to the result cache (results/cache).
+RETENTION = {"min_age": 3600.0, "max_age": None, "max_count": None, "max_size": None}
+
+# Stands in for a file's own job/deck name in stored text, so decks that differ only
+# in their name share one blob
+NAME_TOKEN = "\x00name\x00"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (sha TEXT PRIMARY KEY, size INTEGER, stored INTEGER, data BLOB);
+CREATE TABLE IF NOT EXISTS jobs (job TEXT PRIMARY KEY, finished REAL, archived REAL);
+CREATE TABLE IF NOT EXISTS files (job TEXT, filename TEXT, sha TEXT, PRIMARY KEY (job, filename));
+CREATE INDEX IF NOT EXISTS files_sha ON files (sha);
+CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished);
+"""
+
+
+def _is_text(filename: str) -> bool:
+    return not filename.endswith((".npy", ".npz"))
+
+
+def _stem(filename: str) -> str:
+    for suffix in JOB_SUFFIXES + DECK_SUFFIXES:
+        if filename.endswith(suffix):
+            return filename[:-len(suffix)]
+    return os.path.splitext(filename)[0]
+
+
+class ResultArchive:
+    """
+    Packed, deduplicated store of finished job artifacts in one SQLite file.
+
+    Every archived file is a zlib-compressed blob keyed by the SHA-1 of its contents,
+    so identical decks and results (e.g. cached reruns, or decks that differ only in
+    their job name) are stored once. The `jobs` and `files` tables index which files
+    belong to which job; a job's files are its `.sim` and array outputs plus the
+    `.avl`/`.mass`/`.run` decks it was run from, which session jobs share.
+    """
+
+    def __init__(self, results_dir: str = "results", filename: str = ARCHIVE_FILE):
+        self.results_dir = results_dir
+        self.path = os.path.join(results_dir, filename)
+        with self._connect() as conn:
+            # Must be set before the first table exists, so deleted blobs return their pages
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per operation, so the archive can be shared across threads
+        conn = sqlite3.connect(self.path, timeout=30.0)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ---- writing ----
+
+    def _store(self, conn, job: str, filepath: str):
+        filename = os.path.basename(filepath)
+        with open(filepath, "rb") as f:
+            data = f.read()
+        if _is_text(filename):
+            data = data.replace(_stem(filename).encode(), NAME_TOKEN.encode())
+        sha = hashlib.sha1(data).hexdigest()
+        if conn.execute("SELECT 1 FROM blobs WHERE sha = ?", (sha,)).fetchone() is None:
+            packed = zlib.compress(data, 6)
+            conn.execute("INSERT INTO blobs VALUES (?, ?, ?, ?)", (sha, len(data), len(packed), packed))
+        conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?)", (job, filename, sha))
+
+    def archive_jobs(self, jobs=None, min_age: float = 0.0) -> list:
+        """
+        Moves finished jobs from the results directory into the archive.
+
+        A job is finished when its `.sim` file exists and is at least `min_age` seconds
+        old. Its result files are deleted after they are stored; the decks of a session
+        are deleted once none of its jobs is left unarchived.
+
+        Parameters:
+            jobs (iterable): Job names to consider; defaults to all.
+            min_age (float): Minimum age in seconds of the `.sim` file.
+
+        Returns:
+            list: Archived job names.
+        """
+        now = time.time()
+        plan = export_plan(self.results_dir, jobs)
+        archived, decks = [], set()
+
+        with self._connect() as conn:
+            for job, run_file in plan:
+                sim_path = os.path.join(self.results_dir, f"{job}.sim")
+                finished = os.path.getmtime(sim_path)
+                if now - finished < min_age:
+                    continue
+
+                paths = [os.path.join(self.results_dir, job + suffix) for suffix in JOB_SUFFIXES]
+                if run_file is not None:
+                    stem = os.path.splitext(run_file)[0]
+                    decks.add(stem)
+                    paths += [os.path.join(self.results_dir, stem + suffix) for suffix in DECK_SUFFIXES]
+                paths = [path for path in paths if os.path.exists(path)]
+
+                conn.execute("DELETE FROM files WHERE job = ?", (job,))
+                for path in paths:
+                    self._store(conn, job, path)
+                conn.execute("INSERT OR REPLACE INTO jobs VALUES (?, ?, ?)", (job, finished, now))
+                archived.append(job)
+
+        # Remove originals only after the archive transaction is committed
+        for job in archived:
+            for suffix in JOB_SUFFIXES:
+                self._remove(os.path.join(self.results_dir, job + suffix))
+
+        # A deck is still in use while any job left on disk was run from it
+        in_use = {os.path.splitext(run_file)[0] for _, run_file in export_plan(self.results_dir) if run_file}
+        for stem in decks - in_use:
+            for suffix in DECK_SUFFIXES:
+                self._remove(os.path.join(self.results_dir, stem + suffix))
+
+        return archived
+
+    @staticmethod
+    def _remove(path: str):
+        if not os.path.exists(path):
+            return
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"Warning: Could not delete {path}: {e}")
+
+    # ---- reading ----
+
+    def jobs(self) -> list:
+        """Returns the archived job names, oldest first."""
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute("SELECT job FROM jobs ORDER BY finished, job")]
+
+    def files(self, job: str) -> list:
+        """Returns the file names archived for a job."""
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute("SELECT filename FROM files WHERE job = ? ORDER BY filename", (job,))]
+
+    def read(self, job: str, filename: str) -> bytes:
+        """
+        Returns the original contents of one archived file, e.g. read("cruise", "cruise.sim").
+        Raises KeyError if the file is not archived.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT blobs.data FROM files JOIN blobs ON files.sha = blobs.sha "
+                "WHERE files.job = ? AND files.filename = ?", (job, filename)).fetchone()
+        if row is None:
+            raise KeyError(f"{filename} of job '{job}' is not archived")
+        data = zlib.decompress(row[0])
+        if _is_text(filename):
+            data = data.replace(NAME_TOKEN.encode(), _stem(filename).encode())
+        return data
+
+    def restore(self, job: str, directory: str = None) -> list:
+        """
+        Writes a job's archived files back to `directory` (default: the results directory).
+
+        Returns:
+            list: Paths of the restored files.
+        """
+        directory = directory or self.results_dir
+        paths = []
+        for filename in self.files(job):
+            path = os.path.join(directory, filename)
+            with open(path, "wb") as f:
+                f.write(self.read(job, filename))
+            paths.append(path)
+        return paths
+
+    # ---- deleting and retention ----
+
+    def delete(self, jobs) -> int:
+        """
+        Removes jobs from the archive, along with blobs no other job uses.
+
+        Returns:
+            int: Number of jobs removed.
+        """
+        jobs = list(jobs)
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM files WHERE job = ?", [(job,) for job in jobs])
+            removed = conn.executemany("DELETE FROM jobs WHERE job = ?", [(job,) for job in jobs]).rowcount
+            conn.execute("DELETE FROM blobs WHERE sha NOT IN (SELECT sha FROM files)")
+            conn.commit()
+            conn.execute("PRAGMA incremental_vacuum")
+        return removed
+
+    def stored_size(self) -> int:
+        """Returns the compressed size in bytes of all archived blobs."""
+        with self._connect() as conn:
+            return conn.execute("SELECT COALESCE(SUM(stored), 0) FROM blobs").fetchone()[0]
+
+    def apply_retention(self, max_age: float = None, max_count: int = None, max_size: int = None) -> list:
+        """
+        Deletes the oldest archived jobs until every limit holds.
+
+        Parameters:
+            max_age (float): Maximum age in seconds since a job finished.
+            max_count (int): Maximum number of archived jobs.
+            max_size (int): Maximum compressed size in bytes of the archive contents.
+
+        Returns:
+            list: Deleted job names.
+        """
+        jobs = self.jobs()
+        expired = set()
+        if max_age is not None:
+            cutoff = time.time() - max_age
+            with self._connect() as conn:
+                expired.update(row[0] for row in conn.execute("SELECT job FROM jobs WHERE finished < ?", (cutoff,)))
+        if max_count is not None and len(jobs) > max_count:
+            expired.update(jobs[:len(jobs) - max_count])
+
+        deleted = [job for job in jobs if job in expired]
+        if deleted:
+            self.delete(deleted)
+
+        if max_size is not None:
+            for job in jobs:
+                if job in expired:
+                    continue
+                if self.stored_size() <= max_size:
+                    break
+                self.delete([job])
+                deleted.append(job)
+        return deleted
+
+
+def prune_cache(results_dir: str = "results", max_age: float = None, max_count: int = None,
+                max_size: int = None) -> list:
+    """
+    Deletes least recently used entries of the result cache (`batch.CACHE_DIR`) until
+    every limit holds. An entry is a cached `.sim` file plus its array files; its age is
+    the time since it was last written or reused.
+
+    Parameters:
+        results_dir (str): Results directory.
+        max_age (float): Maximum age in seconds.
+        max_count (int): Maximum number of entries.
+        max_size (int): Maximum total size in bytes.
+
+    Returns:
+        list: Deleted cache keys.
+    """
+    cache_dir = os.path.join(results_dir, CACHE_DIR)
+    if not os.path.isdir(cache_dir):
+        return []
+
+    entries = []
+    for name in os.listdir(cache_dir):
+        if not name.endswith(".sim"):
+            continue
+        key = name[:-len(".sim")]
+        paths = [os.path.join(cache_dir, key + suffix) for suffix in JOB_SUFFIXES]
+        paths = [path for path in paths if os.path.exists(path)]
+        entries.append((os.path.getmtime(paths[0]), key, paths, sum(os.path.getsize(path) for path in paths)))
+    entries.sort()
+
+    now = time.time()
+    size = sum(entry[3] for entry in entries)
+    deleted = []
+    for index, (used, key, paths, entry_size) in enumerate(entries):
+        expired = ((max_age is not None and now - used > max_age)
+                   or (max_count is not None and len(entries) - index > max_count)
+                   or (max_size is not None and size > max_size))
+        if not expired:
+            break
+        for path in paths:
+            ResultArchive._remove(path)
+        size -= entry_size
+        deleted.append(key)
+    return deleted
+
+
+def maintain_results(results_dir: str = "results", policy: dict = None) -> dict:
+    """
+    Archives finished jobs and applies the retention limits to the archive and the
+    result cache; meant to be called after each run or periodically by long-running
+    processes.
+
+    Parameters:
+        results_dir (str): Results directory.
+        policy (dict): Overrides of RETENTION ("min_age", "max_age", "max_count", "max_size").
+
+    Returns:
+        dict: {"archived": job names, "deleted": job names, "pruned": cache keys}.
+    """
+    policy = {**RETENTION, **(policy or {})}
+    archive = ResultArchive(results_dir)
+    archived = archive.archive_jobs(min_age=policy["min_age"])
+    deleted = archive.apply_retention(policy["max_age"], policy["max_count"], policy["max_size"])
+    pruned = prune_cache(results_dir, policy["max_age"], policy["max_count"], policy["max_size"])
+    return {"archived": archived, "deleted": deleted, "pruned": pruned}
+
+
+def read_job_text(results_dir: str, job: str, suffix: str = ".sim") -> str:
+    """
+    Returns the text of a job file from the results directory, or decompressed from the
+    archive when it has been archived. Raises KeyError if neither has it.
+    """
+    path = os.path.join(results_dir, job + suffix)
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            return f.read()
+    if not os.path.exists(os.path.join(results_dir, ARCHIVE_FILE)):
+        raise KeyError(f"{job}{suffix} not found")
+    return ResultArchive(results_dir).read(job, job + suffix).decode()
+
+
+def list_jobs(results_dir: str) -> list:
+    """Returns the names of all jobs with results, on disk or archived."""
+    jobs = {os.path.splitext(name)[0] for name in os.listdir(results_dir) if name.endswith(".sim")}
+    if os.path.exists(os.path.join(results_dir, ARCHIVE_FILE)):
+        jobs.update(ResultArchive(results_dir).jobs())
+    return sorted(jobs)
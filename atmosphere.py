@@ -0,0 +1,46 @@
+import numpy as np
+
+# ISA layers up to 20 km: (base altitude [m], base temperature [K], lapse rate [K/m])
+ISA_LAYERS = ((0.0, 288.15, -0.0065), (11000.0, 216.65, 0.0))
+ISA_P0 = 101325.0      # sea-level pressure [Pa]
+ISA_R = 287.05287      # specific gas constant of air [J/(kg K)]
+ISA_GAMMA = 1.4
+ISA_G0 = 9.80665
+
+FT = 0.3048            # m per ft
+SLUG_FT3 = 515.378818  # kg/m^3 per slug/ft^3
+
+
+def isa(altitude, units: str = "MKS") -> dict:
+    """
+    International Standard Atmosphere (troposphere and lower stratosphere, to 20 km)
+    evaluated for any array of geopotential altitudes in one pass.
+
+    Parameters:
+        altitude (array): Altitudes in m ("MKS") or ft ("FPS").
+        units (str): "MKS" or "FPS"; selects the units of inputs and outputs.
+
+    Returns:
+        dict: {"T" [K], "p" [Pa or lbf/ft^2], "rho" [kg/m^3 or slug/ft^3],
+            "a" speed of sound [m/s or ft/s]} shaped like `altitude`.
+    """
+    units = units.upper()
+    if units not in ("MKS", "FPS"):
+        raise ValueError(f"Unknown unit system: {units}")
+    h = np.asarray(altitude, dtype=float) * (FT if units == "FPS" else 1.0)
+    if np.any(h < -1000.0) or np.any(h > 20000.0):
+        raise ValueError("ISA model is valid from -1 km to 20 km.")
+
+    (h0, T0, lapse), (h1, T1, _) = ISA_LAYERS
+    troposphere = h < h1
+    T = np.where(troposphere, T0 + lapse * (h - h0), T1)
+    p_tropopause = ISA_P0 * (T1 / T0) ** (-ISA_G0 / (lapse * ISA_R))
+    p = np.where(troposphere,
+                 ISA_P0 * (T / T0) ** (-ISA_G0 / (lapse * ISA_R)),
+                 p_tropopause * np.exp(-ISA_G0 * (h - h1) / (ISA_R * T1)))
+    rho = p / (ISA_R * T)
+    a = np.sqrt(ISA_GAMMA * ISA_R * T)
+
+    if units == "FPS":
+        return {"T": T, "p": p / 47.880259, "rho": rho / SLUG_FT3, "a": a / FT}
+    return {"T": T, "p": p, "rho": rho, "a": a}
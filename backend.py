@@ -1,7 +1,8 @@
 from models import Aircraft, SimulationCase, GeometrySurface, MassProperty
 import numpy as np
 
-def write_avl_file(jobname: str, aircraft: Aircraft, sim_case: SimulationCase, geom, filepath: str):
+def write_avl_file(jobname: str, aircraft: Aircraft, sim_case: SimulationCase, geom, filepath: str, mesh: dict = None,
+                   symmetric: bool = False):
 
     """
     Writes a .avl file formatted for AVL's LOAD command.
@@ -11,29 +12,36 @@ def write_avl_file(jobname: str, aircraft: Aircraft, sim_case: SimulationCase, g
         aircraft (Aircraft): Global aircraft model containing properties global to session.
         sim_case (SimulationCase): The selected simulation case.
         filepath (str): Path to write the .avl file (e.g., "results/jobname.avl").
+        mesh (dict): Optional {surface name: (Nchord, Cspace, Nspan, Sspace)} overriding
+            the lattice stored on each surface.
+        symmetric (bool): Use AVL's y-symmetry (iYsym = 1) instead of YDUPLICATE images.
+            Only valid when `is_symmetric_case` holds for the case.
     """
     
     lines = []
     lines.append(jobname)
-    lines.append(f"{sim_case.Mach:.1f}                   !   Mach")
-    lines.append("0     0     0.0       !   iYsym  iZsym  Zsym")
+    lines.append(f"{sim_case.Mach:<22.6g}!   Mach")
+    lines.append(f"{1 if symmetric else 0}     0     0.0       !   iYsym  iZsym  Zsym")
     lines.append("{:.4g} {:.4g} {:.4g}       !   Sref   Cref   Bref".format(aircraft.Sref, aircraft.Cref, aircraft.Bref))
     lines.append("0.00  0.0   0.0       !   Xref   Yref   Zref   moment reference location (arb.)")
     lines.append(f"{sim_case.Cdo:.5f}                 !   CDp")
     
+    mesh = mesh or {}
     for surface in aircraft.geometry.values():
-        lines.extend(write_surface(surface))
+        lines.extend(write_surface(surface, mesh.get(surface.name), duplicate=not symmetric))
     
     with open(filepath, "w") as f:
         f.write("\n".join(lines))
 
 
-def write_surface(surface: GeometrySurface) -> list[str]:
+def write_surface(surface: GeometrySurface, mesh: tuple = None, duplicate: bool = True) -> list[str]:
     """
     Returns a list of strings representing the AVL-formatted surface definition.
 
     Parameters:
         surface (GeometrySurface): A single surface object containing position and incidence angle.
+        mesh (tuple): Optional (Nchord, Cspace, Nspan, Sspace) used instead of the surface's own lattice.
+        duplicate (bool): Mirror the surface with YDUPLICATE (off when the deck uses iYsym).
 
     Returns:
         List[str]: Lines defining the surface block in .avl format.
@@ -46,11 +54,13 @@ def write_surface(surface: GeometrySurface) -> list[str]:
 
     lines.append("SURFACE")
     lines.append(surface.name)  
-    lines.append("10  1.0  22  1.0   ! Nchord   Cspace   Nspan  Sspace")
+    nchord, cspace, nspan, sspace = mesh or get_surface_mesh(surface)
+    lines.append(f"{nchord:d}  {cspace:.1f}  {nspan:d}  {sspace:.1f}   ! Nchord   Cspace   Nspan  Sspace")
     lines.append("#")
     # Symmetry plane
-    lines.append("YDUPLICATE")
-    lines.append("     0.00000")
+    if duplicate:
+        lines.append("YDUPLICATE")
+        lines.append("     0.00000")
     lines.append("")
     # Incidence angle (twist bias for the whole surface)
     lines.append("ANGLE")
@@ -65,13 +75,46 @@ def write_surface(surface: GeometrySurface) -> list[str]:
     lines.append(f"    {surface.x:.5f}     {surface.y:.5f}     {surface.z:.5f}")
 
     total_span = compute_total_span(surface)
-    attach_controls_to_sections(surface)
     #control_points = get_control_breakpoints(surface, total_span)
     lines.extend(write_section_block(surface, total_span))
 
     return lines
 
 
+def is_symmetric_case(aircraft: Aircraft, sim_case: SimulationCase) -> bool:
+    """
+    Checks whether a case can be solved on the half-span with AVL's y-symmetry.
+
+    The flight condition must have no sideslip, roll or yaw rate, and every
+    antisymmetric control (aileron, rudder) present on the aircraft must be
+    held at zero deflection.
+    """
+    if sim_case.beta or sim_case.pb2V or sim_case.rb2V:
+        return False
+
+    control_types = {
+        ctrl.get("Control Type", "").lower()
+        for surface in aircraft.geometry.values()
+        for ctrl in surface.control_surfaces
+    }
+    for ctrl_type in ("aileron", "rudder"):
+        if ctrl_type not in control_types:
+            continue
+        mode = getattr(sim_case, f"{ctrl_type}_mode")
+        value = getattr(sim_case, f"{ctrl_type}_val")
+        if mode is None:
+            continue
+        if mode != "Deflection" or value:
+            return False
+
+    return True
+
+
+def get_surface_mesh(surface: GeometrySurface) -> tuple:
+    """
+    Returns the (Nchord, Cspace, Nspan, Sspace) lattice stored on a surface.
+    """
+    return (int(surface.nchord), float(surface.cspace), int(surface.nspan), float(surface.sspace))
 
 
 def compute_xle(section, chord_mode: str, sweep_mode: str, current_span: float) -> float:
@@ -132,29 +175,15 @@ def compute_chord(section, chord_mode: str, sweep_mode: str, current_span: float
 def compute_total_span(surface):
     return sum(float(s["Span"]) for s in surface.sections)
 
-def attach_controls_to_sections(surface: GeometrySurface):
+def compute_surface_area(surface) -> float:
     """
-    Links each control surface definition to the appropriate section(s)
-    based on Inboard/Outboard span locations.
+    Returns the planform area of one side of a surface (trapezoidal sections).
     """
-    total_span = compute_total_span(surface)
-    for control in surface.control_surfaces:
-        try:
-            y_inboard = float(control["Inboard Loc"]) * total_span
-            y_outboard = float(control["Outboard Loc"]) * total_span
-        except ValueError:
-            continue
-
-        current_span = 0.0
-        for section in surface.sections:
-            span = float(section.get("Span", 0))
-            next_span = current_span + span
-
-            # Does this section fall within the control span range?
-            if current_span <= y_outboard and next_span >= y_inboard:
-                section.update(control)  # Copy all relevant fields
-            current_span = next_span
-
+    area = 0.0
+    for section in surface.sections:
+        root_c, tip_c, _ = resolve_chord_lengths(section)
+        area += 0.5 * float(section["Span"]) * (root_c + tip_c)
+    return area
 
 def get_control_breakpoints_from_controls(surface: GeometrySurface, total_span: float) -> list[dict]:
     """
@@ -327,20 +356,15 @@ def assemble_augmented_sections(surface: GeometrySurface, total_span: float) ->
 
     return all_sections
 
-def write_section_block(surface, total_span):
-    section_lines = []
-    seen_spans = set()
-
-    def write_section_block_line(sec):
-        section_lines.append("")
-        section_lines.append("#--------------------------------------------------------------")
-        section_lines.append("#    Xle         Yle         Zle         chord       ainc")
-        section_lines.append("SECTION")
-        section_lines.append(f"    {sec['Xle']:.5f}     {sec['Yle']:.5f}     {sec['Zle']:.5f}     {sec['chord']:.5f}     {sec['ainc']:.4f}")
-        section_lines.append("NACA")
-        section_lines.append(surface.naca_airfoil)
-        return section_lines
+def compute_section_stations(surface, total_span) -> list[dict]:
+    """
+    Returns the spanwise stations (root, user section tips and control breakpoints)
+    of a surface in AVL order. Stations at the same span location are merged into one
+    that keeps the section's geometry and every control breakpoint there.
 
+    Each station is a dict with span, Xle, Yle, Zle, chord, ainc, is_control and
+    controls (the control metadata of its breakpoints), in surface-local coordinates.
+    """
     # === Interpolated control sections ===
     control_sections = []
     control_points = get_control_breakpoints_from_controls(surface, total_span)
@@ -398,16 +422,44 @@ def write_section_block(surface, total_span):
     }
 
     all_sections = [root_section] + tip_sections + control_sections
-    all_sections.sort(key=lambda s: s["span"])
+    all_sections.sort(key=lambda s: (s["span"], s["is_control"]))
 
+    # Control locations are stored as span fractions, so a breakpoint meant to sit on a
+    # section tip can be off by rounding
+    tolerance = 1e-4 * total_span
+    stations = []
     for sec in all_sections:
-        if sec["span"] in seen_spans:
-            continue
-        seen_spans.add(sec["span"])
+        if stations and sec["span"] - stations[-1]["span"] <= tolerance:
+            station = stations[-1]
+            if not sec["is_control"]:
+                station.update({key: sec[key] for key in ("span", "Xle", "Yle", "Zle", "chord", "ainc")})
+        else:
+            station = {key: sec[key] for key in ("span", "Xle", "Yle", "Zle", "chord", "ainc")}
+            station.update(is_control=False, controls=[])
+            stations.append(station)
+        if sec["is_control"] and sec["control"] not in station["controls"]:
+            station["is_control"] = True
+            station["controls"].append(sec["control"])
+
+    return stations
+
+def write_section_block(surface, total_span):
+    section_lines = []
+
+    def write_section_block_line(sec):
+        section_lines.append("")
+        section_lines.append("#--------------------------------------------------------------")
+        section_lines.append("#    Xle         Yle         Zle         chord       ainc")
+        section_lines.append("SECTION")
+        section_lines.append(f"    {sec['Xle']:.5f}     {sec['Yle']:.5f}     {sec['Zle']:.5f}     {sec['chord']:.5f}     {sec['ainc']:.4f}")
+        section_lines.append("NACA")
+        section_lines.append(surface.naca_airfoil)
+        return section_lines
+
+    for sec in compute_section_stations(surface, total_span):
         write_section_block_line(sec)
 
-        if sec.get("is_control"):
-            ctrl = sec["control"]
+        for ctrl in sec["controls"]:
             print(f"Writing control surface: {ctrl['name']} at span {sec['span']:.2f}")
             xhinge = ctrl["hinge"]
             ctrl_type = ctrl["type"]
@@ -479,10 +531,38 @@ def write_run_file(jobname: str, sim_case, filepath: str):
         sim_case (SimulationCase): The input conditions for the simulation.
         filepath (str): The full path to write the .run file.
     """
+    lines = format_run_case(1, jobname, sim_case)
+
+    with open(filepath, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def write_multi_run_file(jobnames: list, sim_cases: list, filepath: str):
+    """
+    Writes a .run file holding several run cases, numbered in list order, for
+    execution in a single AVL session.
+
+    Parameters:
+        jobnames (list): The name used for each CASE field.
+        sim_cases (list): The input conditions of each run case.
+        filepath (str): The full path to write the .run file.
+    """
+    lines = []
+    for index, (jobname, sim_case) in enumerate(zip(jobnames, sim_cases), start=1):
+        lines.extend(format_run_case(index, jobname, sim_case))
+
+    with open(filepath, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def format_run_case(index: int, jobname: str, sim_case) -> list[str]:
+    """
+    Returns the lines of one run case block of a .run file.
+    """
     lines = []
     lines.append("")
     lines.append("---------------------------------------------")
-    lines.append(f" Run case  1:  {jobname}")
+    lines.append(f" Run case {index:>2d}:  {jobname}")
     lines.append("")
 
     # AoA / CL / Cm pitchmom
@@ -493,10 +573,10 @@ def write_run_file(jobname: str, sim_case, filepath: str):
     elif sim_case.aoa_mode == "Cm":
         lines.append(f" alpha        ->  Cm pitchmom =   {sim_case.aoa_val:<8.4f}")
 
-    lines.append(f" beta         ->  beta        =   0.00000")
-    lines.append(f" pb/2V        ->  pb/2V       =   0.00000")
-    lines.append(f" qc/2V        ->  qc/2V       =   0.00000")
-    lines.append(f" rb/2V        ->  rb/2V       =   0.00000")
+    lines.append(f" beta         ->  beta        =   {sim_case.beta:<8.5f}")
+    lines.append(f" pb/2V        ->  pb/2V       =   {sim_case.pb2V:<8.5f}")
+    lines.append(f" qc/2V        ->  qc/2V       =   {sim_case.qc2V:<8.5f}")
+    lines.append(f" rb/2V        ->  rb/2V       =   {sim_case.rb2V:<8.5f}")
 
     # Flap
     if sim_case.flap_mode == "Deflection":
@@ -509,11 +589,28 @@ def write_run_file(jobname: str, sim_case, filepath: str):
     elif sim_case.elevator_mode == "Cm":
         lines.append(f" Elevator     ->  Cm pitchmom =   {sim_case.elevator_val:<8.4f}")
 
+    # Aileron
+    if sim_case.aileron_mode == "Deflection":
+        lines.append(f" Aileron      ->  Aileron     =   {sim_case.aileron_val:<8.4f}")
+    elif sim_case.aileron_mode == "Cl":
+        lines.append(f" Aileron      ->  Cl roll mom =   {sim_case.aileron_val:<8.4f}")
 
+    # Rudder
+    if sim_case.rudder_mode == "Deflection":
+        lines.append(f" Rudder       ->  Rudder      =   {sim_case.rudder_val:<8.4f}")
+    elif sim_case.rudder_mode == "Cn":
+        lines.append(f" Rudder       ->  Cn yaw  mom =   {sim_case.rudder_val:<8.4f}")
+
+    # Run case parameters (mass, inertia, CG, rho and g are applied from the .mass file by MSET)
     lines.append("")
+    lines.append(f" Mach      =   {sim_case.Mach:<10.6g}")
+    velocity = getattr(sim_case, "velocity", None)
+    if velocity is not None:
+        lines.append(f" velocity  =   {velocity:<10.5f}")
 
-    with open(filepath, "w") as f:
-        f.write("\n".join(lines) + "\n")
+    lines.append("")
+
+    return lines
 
 
 
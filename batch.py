@@ -0,0 +1,197 @@
+import os
+import math
+import shutil
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from models import Aircraft
+from backend import write_avl_file, write_mass_file, write_multi_run_file, is_symmetric_case, format_run_case
+from runner import run_avl_session, check_eigenmode_cases, AVL_EXECUTABLE_PATH, AVL_MAX_RUN_CASES
+from output_parser import parse_sim_file
+import vlm
+
+
+def deck_key(aircraft: Aircraft, sim_case, allow_symmetry: bool = False) -> tuple:
+    """
+    Returns the key of the geometry/mass deck a case needs. Cases with equal keys
+    differ only in right-hand-side quantities (alpha, beta, rates, deflections,
+    trim targets) and can share one factorization.
+    """
+    symmetric = allow_symmetry and is_symmetric_case(aircraft, sim_case)
+    return (round(float(sim_case.Mach), 6), round(float(sim_case.Cdo), 8), round(float(sim_case.rho), 8), symmetric)
+
+
+def group_cases(aircraft: Aircraft, cases, allow_symmetry: bool = False) -> dict:
+    """
+    Groups cases by `deck_key`, preserving the queued order within each group.
+    """
+    groups = {}
+    for case in cases:
+        groups.setdefault(deck_key(aircraft, case, allow_symmetry), []).append(case)
+    return groups
+
+
+def batch_jobnames(prefix: str, cases) -> dict:
+    """
+    Returns {case name: job name}. A single case keeps the plain prefix as its job name.
+    """
+    cases = list(cases)
+    if len(cases) == 1:
+        return {cases[0].name: prefix}
+    return {case.name: f"{prefix}_{case.name}" for case in cases}
+
+
+# Subdirectory of the results directory holding content-addressed results
+CACHE_DIR = "cache"
+
+# Array outputs stored next to a job's .sim file
+ARRAY_SUFFIXES = ("_strips.npy", "_elements.npy", "_modes.npz")
+
+
+def case_cache_key(session: str, results_dir: str, sim_case, options: tuple) -> str:
+    """
+    Returns a content hash of everything that determines a case's AVL output: the
+    session's .avl and .mass decks (without their name header lines), the case's
+    run block and the requested outputs.
+    """
+    digest = hashlib.sha1()
+    with open(os.path.join(results_dir, f"{session}.avl"), "r") as f:
+        digest.update("".join(f.readlines()[1:]).encode())
+    with open(os.path.join(results_dir, f"{session}.mass"), "r") as f:
+        digest.update("".join(line for line in f if line.strip() != f"# {session}").encode())
+    digest.update("\n".join(format_run_case(1, "", sim_case)).encode())
+    digest.update(repr(options).encode())
+    return digest.hexdigest()
+
+
+def run_session(aircraft: Aircraft, session: str, group: list, jobnames: dict, results_dir: str,
+                mesh: dict = None, symmetric: bool = False, avl_exe_path: str = AVL_EXECUTABLE_PATH,
+                strip_forces: bool = False, element_forces: bool = False, hinge_moments: bool = False,
+                eigenmodes: bool = False, cache: bool = False) -> dict:
+    """
+    Writes one deck for a group of cases that share it and runs them in one AVL session.
+    With `cache`, cases whose inputs were run before are copied from `results_dir/cache`
+    instead of being rerun, and new results are added to it.
+
+    Returns:
+        dict: {case name: parsed values}.
+    """
+    write_mass_file(session, aircraft, group[0], os.path.join(results_dir, f"{session}.mass"))
+    write_avl_file(session, aircraft, group[0], None, os.path.join(results_dir, f"{session}.avl"), mesh, symmetric)
+
+    keys = {}
+    if cache:
+        cache_dir = os.path.join(results_dir, CACHE_DIR)
+        os.makedirs(cache_dir, exist_ok=True)
+        options = (strip_forces, element_forces, hinge_moments, eigenmodes)
+        keys = {case.name: case_cache_key(session, results_dir, case, options) for case in group}
+
+    def cached(case, suffix=".sim"):
+        return os.path.join(results_dir, CACHE_DIR, f"{keys[case.name]}{suffix}")
+
+    pending = []
+    for case in group:
+        if cache and os.path.exists(cached(case)):
+            job = jobnames[case.name]
+            os.utime(cached(case))  # Retention prunes the least recently used entries first
+            shutil.copyfile(cached(case), os.path.join(results_dir, f"{job}.sim"))
+            for suffix in ARRAY_SUFFIXES:
+                if os.path.exists(cached(case, suffix)):
+                    shutil.copyfile(cached(case, suffix), os.path.join(results_dir, f"{job}{suffix}"))
+        else:
+            pending.append(case)
+
+    sim_files = []
+    if pending:
+        names = [jobnames[case.name] for case in pending]
+        # Results of an earlier run under the same job names must not pass for this run's
+        for name in names:
+            for suffix in (".sim",) + ARRAY_SUFFIXES:
+                path = os.path.join(results_dir, name + suffix)
+                if os.path.exists(path):
+                    os.remove(path)
+        write_multi_run_file(names, pending, os.path.join(results_dir, f"{session}.run"))
+        sim_files = run_avl_session(session, names, results_dir, avl_exe_path,
+                                    strip_forces, element_forces, hinge_moments, eigenmodes)
+
+    results = {case.name: parse_sim_file(os.path.join(results_dir, f"{jobnames[case.name]}.sim")) for case in group}
+
+    # Only complete AVL output is cached; sim_files is empty when the session failed
+    if cache:
+        for case, sim_file in zip(pending, sim_files):
+            if "CLtot" not in results[case.name]:
+                continue
+            shutil.copyfile(sim_file, cached(case))
+            for suffix in ARRAY_SUFFIXES:
+                array_file = os.path.join(results_dir, f"{jobnames[case.name]}{suffix}")
+                if os.path.exists(array_file):
+                    shutil.copyfile(array_file, cached(case, suffix))
+
+    return results
+
+
+def run_batch(aircraft: Aircraft, cases, results_dir: str, prefix: str = "batch", solver: str = "avl",
+              mesh: dict = None, avl_exe_path: str = AVL_EXECUTABLE_PATH, allow_symmetry: bool = False,
+              strip_forces: bool = False, element_forces: bool = False, hinge_moments: bool = False,
+              eigenmodes: bool = False, workers: int = 1, cache: bool = False) -> dict:
+    """
+    Runs many cases, solving each group of cases that share geometry and Mach as one
+    multi-right-hand-side problem.
+
+    With solver="avl" each group is written as one `.avl`/`.mass` deck plus a multi-case
+    `.run` file and executed in a single AVL session; every case still gets its own
+    `{job}.sim`. With solver="vlm" the groups are solved by `vlm.solve_cases`.
+
+    Parameters:
+        aircraft (Aircraft): Aircraft model to run.
+        cases (iterable): SimulationCase objects.
+        results_dir (str): Directory for the generated decks and results.
+        prefix (str): Prefix of the session and job names.
+        solver (str): "avl" or "vlm".
+        mesh (dict): Optional {surface name: (Nchord, Cspace, Nspan, Sspace)} lattice override.
+        avl_exe_path (str): Path to the AVL executable.
+        allow_symmetry (bool): Use half-span decks for symmetric groups (AVL only).
+        strip_forces, element_forces, hinge_moments (bool): Extra AVL outputs per job.
+        eigenmodes (bool): Run AVL's eigenmode analysis per job (see `modes.load_modes`).
+            Every case needs a velocity.
+        workers (int): Number of AVL sessions run concurrently. Groups are split into
+            that many sessions when there are fewer groups than workers. Sessions never
+            hold more than AVL_MAX_RUN_CASES cases; larger groups run as several sessions.
+        cache (bool): Reuse results of identical inputs from `results_dir/cache` (AVL only).
+
+    Returns:
+        dict: {case name: parsed values}.
+    """
+    cases = list(cases)
+    if solver == "vlm":
+        return vlm.solve_cases(aircraft, cases, mesh)
+    if solver != "avl":
+        raise ValueError(f"Unknown solver: {solver}")
+    if eigenmodes:
+        check_eigenmode_cases(cases)
+
+    jobnames = batch_jobnames(prefix, cases)
+    groups = group_cases(aircraft, cases, allow_symmetry)
+
+    # Split groups into chunks so that every worker gets a session, and no session
+    # holds more run cases than AVL can store
+    chunks = []
+    for (mach, cdo, rho, symmetric), group in groups.items():
+        size = min(math.ceil(len(group) / max(1, workers // len(groups))), AVL_MAX_RUN_CASES)
+        chunks.extend((group[i:i + size], symmetric) for i in range(0, len(group), size))
+
+    def run_chunk(index):
+        group, symmetric = chunks[index]
+        session = prefix if len(chunks) == 1 else f"{prefix}_session{index + 1}"
+        return run_session(aircraft, session, group, jobnames, results_dir, mesh, symmetric, avl_exe_path,
+                           strip_forces, element_forces, hinge_moments, eigenmodes, cache)
+
+    results = {}
+    if workers > 1 and len(chunks) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for chunk_results in pool.map(run_chunk, range(len(chunks))):
+                results.update(chunk_results)
+    else:
+        for index in range(len(chunks)):
+            results.update(run_chunk(index))
+
+    return {case.name: results[case.name] for case in cases}
@@ -0,0 +1,88 @@
+import itertools
+import numpy as np
+from models import Aircraft, SimulationCase
+from atmosphere import isa
+from snapshot import replace
+
+
+def derive_case(base: SimulationCase, name: str, **overrides) -> SimulationCase:
+    """
+    Returns a copy of `base` renamed to `name` with the given attributes replaced,
+    e.g. derive_case(cruise, "cruise_a4", aoa_val=4.0). Snapshot cases give snapshot copies.
+    """
+    for field in overrides:
+        if not hasattr(base, field):
+            raise AttributeError(f"SimulationCase has no field '{field}'")
+    return replace(base, name=name, **overrides)
+
+
+def sweep_cases(base: SimulationCase, field: str, values, prefix: str = None) -> list:
+    """
+    Returns one case per value of `field`, named "<prefix>_<field>_<value>".
+    """
+    prefix = prefix or base.name
+    return [derive_case(base, f"{prefix}_{field}_{value:.6g}", **{field: float(value)}) for value in values]
+
+
+def grid_cases(base: SimulationCase, axes: dict, prefix: str = None) -> list:
+    """
+    Returns the full-factorial grid of `axes` ({field: values}), with the last
+    axis varying fastest. Cases are named "<prefix>_<index>".
+    """
+    prefix = prefix or base.name
+    fields = list(axes)
+    combos = list(itertools.product(*(axes[field] for field in fields)))
+    width = len(str(max(len(combos) - 1, 0)))
+    return [
+        derive_case(base, f"{prefix}_{index:0{width}d}", **{field: float(value) for field, value in zip(fields, combo)})
+        for index, combo in enumerate(combos)
+    ]
+
+
+def envelope_cases(aircraft: Aircraft, base: SimulationCase, altitudes, weight: float, speeds=None,
+                   machs=None, cl_max: float = None, prefix: str = "env") -> list:
+    """
+    Returns level-flight trim cases over an altitude x airspeed (or Mach) grid.
+
+    Density and speed of sound come from one vectorized ISA evaluation in the
+    aircraft's unit system. Each case targets the CL that supports `weight` at its
+    dynamic pressure (aoa_mode "CL") and carries its rho, Mach and velocity; all other
+    fields, such as an Elevator Cm = 0 trim, are taken from `base`.
+
+    Parameters:
+        aircraft (Aircraft): Aircraft providing Sref and units.
+        base (SimulationCase): Case supplying every field not set here.
+        altitudes (array): Altitudes in m or ft.
+        weight (float): Aircraft weight in N or lbf.
+        speeds (array): True airspeeds in m/s or ft/s (give either speeds or machs).
+        machs (array): Mach numbers.
+        cl_max (float): Drop points whose required CL exceeds this.
+        prefix (str): Prefix of the case names.
+
+    Returns:
+        list: SimulationCase objects named "<prefix>_h<altitude>_V<speed>".
+    """
+    if (speeds is None) == (machs is None):
+        raise ValueError("Give either speeds or machs.")
+    if aircraft.Sref <= 0:
+        raise ValueError("Sref must be positive.")
+
+    h, x = np.meshgrid(np.asarray(altitudes, dtype=float),
+                       np.asarray(speeds if machs is None else machs, dtype=float), indexing="ij")
+    atm = isa(h, aircraft.units)
+    V = x if machs is None else x * atm["a"]
+    mach = V / atm["a"]
+    cl = weight / (0.5 * atm["rho"] * V ** 2 * aircraft.Sref)
+
+    cases, names = [], set()
+    for i, j in np.ndindex(h.shape):
+        if cl_max is not None and cl[i, j] > cl_max:
+            continue
+        name = f"{prefix}_h{h[i, j]:.6g}_V{V[i, j]:.6g}"
+        if name in names:
+            raise ValueError(f"Envelope points too close to tell apart by name: {name}")
+        names.add(name)
+        cases.append(derive_case(base, name,
+                                 aoa_mode="CL", aoa_val=float(cl[i, j]), Mach=float(mach[i, j]),
+                                 rho=float(atm["rho"][i, j]), velocity=float(V[i, j])))
+    return cases
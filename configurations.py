@@ -0,0 +1,142 @@
+from concurrent.futures import ThreadPoolExecutor
+from models import Aircraft
+from batch import run_batch
+from doe import GeometryParameter, apply_parameters
+from snapshot import replace, fingerprint
+
+# Name under which the unmodified aircraft appears in configuration results
+BASE_CONFIGURATION = "base"
+
+# Aircraft attributes a configuration may override
+CONFIGURATION_SETTINGS = ("Sref", "Cref", "Bref", "units")
+
+
+def parse_parameter(name: str) -> GeometryParameter:
+    """
+    Returns the GeometryParameter of a name such as "wing.twist" or "wing[0].Span"
+    (the format of GeometryParameter.name).
+    """
+    target, _, field = name.rpartition(".")
+    if not target or not field:
+        raise ValueError(f"Invalid parameter name: {name}")
+    section = None
+    if target.endswith("]") and "[" in target:
+        target, _, index = target[:-1].rpartition("[")
+        section = int(index)
+    return GeometryParameter(target, field, 0.0, 0.0, section=section)
+
+
+def build_configuration(aircraft: Aircraft, configuration) -> Aircraft:
+    """
+    Returns the aircraft of a configuration: the base aircraft with the configuration's
+    changes applied as a shallow delta. Surfaces, sections and mass components the
+    configuration does not touch are the base aircraft's own objects.
+
+    Parameters:
+        aircraft (Aircraft): Base aircraft (live or snapshot).
+        configuration (Configuration or str): Configuration, or the name of one in
+            `aircraft.configurations`.
+    """
+    if isinstance(configuration, str):
+        if configuration not in aircraft.configurations:
+            raise ValueError(f"Unknown configuration: {configuration}")
+        configuration = aircraft.configurations[configuration]
+
+    changes = {}
+    for name, value in configuration.settings.items():
+        if name not in CONFIGURATION_SETTINGS:
+            raise ValueError(f"Aircraft setting '{name}' cannot be changed by a configuration.")
+        changes[name] = value
+
+    if configuration.surfaces:
+        geometry = dict(aircraft.geometry)
+        for name, surface in configuration.surfaces.items():
+            if surface is not None:
+                geometry[name] = surface
+            elif geometry.pop(name, None) is None:
+                raise ValueError(f"Unknown surface: {name}")
+        changes["geometry"] = geometry
+
+    if configuration.mass_changes or configuration.mass_properties:
+        props = dict(aircraft.mass_properties)
+        for name, prop in configuration.mass_properties.items():
+            if prop is not None:
+                props[name] = prop
+            elif props.pop(name, None) is None:
+                raise ValueError(f"Unknown mass component: {name}")
+        for name, fields in configuration.mass_changes.items():
+            if name not in props:
+                raise ValueError(f"Unknown mass component: {name}")
+            props[name] = replace(props[name], **{field: float(value) for field, value in fields.items()})
+        changes["mass_properties"] = props
+
+    variant = replace(aircraft, **changes) if changes else aircraft
+    if configuration.parameters:
+        parameters = [parse_parameter(name) for name in configuration.parameters]
+        variant = apply_parameters(variant, parameters, list(configuration.parameters.values()))
+    return variant
+
+
+def configuration_variants(aircraft: Aircraft, names=None, include_base: bool = True) -> dict:
+    """
+    Returns {configuration name: aircraft} for the named configurations (default: all
+    of `aircraft.configurations`), preceded by the base aircraft under BASE_CONFIGURATION.
+    """
+    names = list(aircraft.configurations) if names is None else list(names)
+    if BASE_CONFIGURATION in names:
+        raise ValueError(f"'{BASE_CONFIGURATION}' is reserved for the base aircraft.")
+    variants = {BASE_CONFIGURATION: aircraft} if include_base else {}
+    for name in names:
+        variants[name] = build_configuration(aircraft, name)
+    return variants
+
+
+def deck_contents(aircraft: Aircraft) -> tuple:
+    """
+    Returns a hashable summary of everything the .avl and .mass decks are written from.
+    Aircraft with equal summaries produce identical decks.
+    """
+    return fingerprint((aircraft.geometry, aircraft.mass_properties,
+                        [getattr(aircraft, name) for name in CONFIGURATION_SETTINGS]))
+
+
+def run_configurations(aircraft: Aircraft, cases, results_dir: str, names=None, include_base: bool = True,
+                       prefix: str = "cfg", workers: int = 1, cache: bool = True, **batch_options) -> dict:
+    """
+    Runs every configuration with every case.
+
+    Configurations whose decks have identical content run once and share the results;
+    with `cache`, results of decks run before (by any configuration or job) are taken
+    from `results_dir/cache`. Configuration c uses the job prefix "<prefix>_<c>".
+
+    Parameters:
+        aircraft (Aircraft): Base aircraft holding the configurations.
+        cases (list): SimulationCase objects run for every configuration.
+        results_dir (str): Directory for the generated decks and results.
+        names (list): Configuration names; defaults to all of them.
+        include_base (bool): Also run the base aircraft, as BASE_CONFIGURATION.
+        prefix (str): Prefix of the job names.
+        workers (int): Number of configurations run at the same time.
+        cache (bool): Reuse results of identical decks (AVL only).
+        **batch_options: Passed to `batch.run_batch` (solver, avl_exe_path, mesh, ...).
+
+    Returns:
+        dict: {configuration name: {case name: parsed values}}.
+    """
+    cases = list(cases)
+    variants = configuration_variants(aircraft, names, include_base)
+
+    # Map every configuration to the first one with the same deck contents
+    owners, first = {}, {}
+    for name, variant in variants.items():
+        owners[name] = first.setdefault(deck_contents(variant), name)
+    to_run = list(first.values())
+
+    def run_configuration(name):
+        return run_batch(variants[name], cases, results_dir, prefix=f"{prefix}_{name}", cache=cache,
+                         **batch_options)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        outcomes = dict(zip(to_run, pool.map(run_configuration, to_run)))
+
+    return {name: outcomes[owners[name]] for name in variants}
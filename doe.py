@@ -0,0 +1,167 @@
+import itertools
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from models import Aircraft
+from batch import run_batch
+from snapshot import replace
+
+try:
+    from scipy.stats import qmc
+except ImportError:  # scipy is optional; Sobol designs fall back to Latin hypercube
+    qmc = None
+
+# Surface attributes a parameter may vary when no section is given
+SURFACE_FIELDS = ("x", "y", "z", "incidence", "twist")
+
+# Outputs gathered into the DOE table by default (AVL output names)
+DOE_OUTPUTS = ("Alpha", "CLtot", "CDtot", "CDind", "CDff", "Cmtot", "CLa", "Cma", "Xnp", "Elevator", "e")
+
+
+class GeometryParameter:
+    """
+    A varied geometry input: a surface attribute (x, y, z, incidence, twist) or a field
+    of one section dict (e.g. "Span", "Taper", "Root C", "LE Sweep", "Dihedral").
+    """
+
+    def __init__(self, surface: str, field: str, lo: float, hi: float, section: int = None):
+        if section is None and field not in SURFACE_FIELDS:
+            raise ValueError(f"'{field}' is not a surface field; give a section index for section fields.")
+        self.surface = surface
+        self.field = field
+        self.section = section
+        self.lo = float(lo)
+        self.hi = float(hi)
+
+    @property
+    def name(self) -> str:
+        if self.section is None:
+            return f"{self.surface}.{self.field}"
+        return f"{self.surface}[{self.section}].{self.field}"
+
+    def value(self, aircraft: Aircraft) -> float:
+        surface = aircraft.geometry[self.surface]
+        if self.section is None:
+            return float(getattr(surface, self.field))
+        return float(surface.sections[self.section].get(self.field, 0))
+
+
+def apply_parameters(aircraft: Aircraft, parameters, values) -> Aircraft:
+    """
+    Returns a variant of `aircraft` with the parameters set to `values`.
+
+    The variant is a shallow delta: only the surfaces and section dicts that change
+    are copied, everything else (other surfaces, sections, controls, mass components,
+    cases) is shared with the base aircraft. Snapshots give snapshot variants.
+    """
+    changes = {}
+    for parameter, value in zip(parameters, values):
+        if parameter.surface not in aircraft.geometry:
+            raise ValueError(f"Unknown surface: {parameter.surface}")
+        surface_changes = changes.setdefault(parameter.surface, {})
+        if parameter.section is None:
+            surface_changes[parameter.field] = float(value)
+        else:
+            sections = surface_changes.setdefault("sections", list(aircraft.geometry[parameter.surface].sections))
+            section = dict(sections[parameter.section])
+            # Section fields are stored as entry strings, as saved by the property editor
+            section[parameter.field] = f"{float(value):.10g}"
+            sections[parameter.section] = section
+
+    geometry = dict(aircraft.geometry)
+    for name, surface_changes in changes.items():
+        geometry[name] = replace(geometry[name], **surface_changes)
+    return replace(aircraft, geometry=geometry)
+
+
+def latin_hypercube(n: int, d: int, seed: int = None) -> np.ndarray:
+    """Returns n points of a Latin hypercube in [0, 1]^d."""
+    rng = np.random.default_rng(seed)
+    strata = np.argsort(rng.random((n, d)), axis=0)
+    return (strata + rng.random((n, d))) / n
+
+
+def sobol(n: int, d: int, seed: int = None) -> np.ndarray:
+    """Returns n points of a scrambled Sobol sequence in [0, 1]^d (needs scipy)."""
+    if qmc is None:
+        print("Warning: scipy is not available; using a Latin hypercube instead of Sobol.")
+        return latin_hypercube(n, d, seed)
+    return qmc.Sobol(d, scramble=True, seed=seed).random(n)
+
+
+def full_factorial(levels: int, d: int) -> np.ndarray:
+    """Returns the levels^d grid in [0, 1]^d."""
+    axis = np.linspace(0.0, 1.0, levels) if levels > 1 else np.array([0.5])
+    return np.array(list(itertools.product(axis, repeat=d)))
+
+
+def design_points(parameters, method: str = "lhs", n: int = 20, levels: int = 3, seed: int = None) -> np.ndarray:
+    """
+    Returns the (k, n_parameters) design scaled to each parameter's [lo, hi].
+
+    Parameters:
+        parameters (list): GeometryParameter objects.
+        method (str): "lhs", "sobol" or "factorial".
+        n (int): Number of points for "lhs" and "sobol".
+        levels (int): Levels per parameter for "factorial".
+        seed (int): Random seed.
+    """
+    d = len(parameters)
+    if method == "lhs":
+        unit = latin_hypercube(n, d, seed)
+    elif method == "sobol":
+        unit = sobol(n, d, seed)
+    elif method == "factorial":
+        unit = full_factorial(levels, d)
+    else:
+        raise ValueError(f"Unknown design method: {method}")
+    lo = np.array([p.lo for p in parameters])
+    hi = np.array([p.hi for p in parameters])
+    return lo + unit * (hi - lo)
+
+
+def run_doe(aircraft: Aircraft, parameters, cases, results_dir: str, method: str = "lhs", n: int = 20,
+            levels: int = 3, seed: int = None, outputs=DOE_OUTPUTS, prefix: str = "doe", workers: int = 4,
+            **batch_options) -> dict:
+    """
+    Runs every design variant with every case and gathers one result table.
+
+    Variants run concurrently, each as one batch of all cases; variant i uses the job
+    prefix "<prefix><i>".
+
+    Parameters:
+        aircraft (Aircraft): Base aircraft.
+        parameters (list): GeometryParameter objects.
+        cases (list): SimulationCase objects run for every variant.
+        results_dir (str): Directory for the generated decks and results.
+        method, n, levels, seed: Design settings, see `design_points`.
+        outputs (tuple): Parsed output names to tabulate.
+        prefix (str): Prefix of the job names.
+        workers (int): Number of variants run at the same time.
+        **batch_options: Passed to `batch.run_batch` (solver, avl_exe_path, cache, ...).
+
+    Returns:
+        dict: Columns of one row per (variant, case): "variant", "case", each parameter
+            name, and each output (NaN where missing).
+    """
+    parameters, cases = list(parameters), list(cases)
+    design = design_points(parameters, method, n, levels, seed)
+
+    def run_variant(index):
+        variant = apply_parameters(aircraft, parameters, design[index])
+        return run_batch(variant, cases, results_dir, prefix=f"{prefix}{index + 1}", **batch_options)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        outcomes = list(pool.map(run_variant, range(len(design))))
+
+    table = {"variant": [], "case": [], **{p.name: [] for p in parameters}, **{name: [] for name in outputs}}
+    for index, results in enumerate(outcomes):
+        for case in cases:
+            values = results.get(case.name, {})
+            table["variant"].append(index + 1)
+            table["case"].append(case.name)
+            for parameter, value in zip(parameters, design[index]):
+                table[parameter.name].append(value)
+            for name in outputs:
+                table[name].append(values.get(name, np.nan))
+
+    return {column: values if column == "case" else np.array(values) for column, values in table.items()}
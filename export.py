@@ -0,0 +1,345 @@
+import io
+import os
+import csv
+import zipfile
+import tempfile
+import numpy as np
+from output_parser import parse_sim_file, load_force_array, STRIP_COLUMNS
+from importer import read_avl_header, read_mass, read_run, CONTROL_TYPES
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; only Parquet export needs it
+    pa = pq = None
+
+# Case metadata taken from the .run decks (SimulationCase fields)
+METADATA_COLUMNS = (
+    "aoa_mode", "aoa_val", "beta", "pb2V", "qc2V", "rb2V",
+    "elevator_mode", "elevator_val", "flap_mode", "flap_val",
+    "aileron_mode", "aileron_val", "rudder_mode", "rudder_val",
+    "Mach", "Cdo", "rho", "velocity",
+)
+TEXT_METADATA = ("aoa_mode", "elevator_mode", "flap_mode", "aileron_mode", "rudder_mode")
+
+# Parsed .sim values (AVL output names)
+COEFFICIENT_COLUMNS = (
+    "Alpha", "Beta", "pb/2V", "qc/2V", "rb/2V",
+    "CXtot", "CYtot", "CZtot", "Cltot", "Cmtot", "Cntot", "CLtot", "CDtot",
+    "CDvis", "CDind", "CLff", "CDff", "CYff", "e",
+)
+DERIVATIVE_COLUMNS = (
+    "CLa", "CYa", "Cla", "Cma", "Cna", "CLb", "CYb", "Clb", "Cmb", "Cnb",
+    "CLp", "CYp", "Clp", "Cmp", "Cnp", "CLq", "CYq", "Clq", "Cmq", "Cnq",
+    "CLr", "CYr", "Clr", "Cmr", "Cnr", "Xnp",
+)
+# Per control type: deflection, control derivatives and hinge moment
+CONTROL_COLUMNS = tuple(
+    name for ctrl in CONTROL_TYPES
+    for name in (ctrl, *(f"{coef}d_{ctrl}" for coef in ("CL", "CY", "Cl", "Cm", "Cn", "CDff", "e")), f"Chinge_{ctrl}")
+)
+
+# Width of text columns in NPZ files
+TEXT_WIDTH = 64
+
+
+def result_schema() -> list:
+    """
+    Returns the fixed [(column, "str" or "float")] schema of exported results. Every
+    export has exactly these columns in this order; missing values are NaN (or "").
+    """
+    schema = [("job", "str"), ("run_file", "str")]
+    schema += [(name, "str" if name in TEXT_METADATA else "float") for name in METADATA_COLUMNS]
+    schema += [(name, "float") for name in COEFFICIENT_COLUMNS + DERIVATIVE_COLUMNS + CONTROL_COLUMNS]
+    return schema
+
+
+def strip_schema() -> list:
+    """Returns the fixed schema of exported strip data (one row per job and strip)."""
+    return [("job", "str"), ("surface", "int"), ("strip", "int")] + [(name, "float") for name in STRIP_COLUMNS]
+
+
+def _run_defaults(results_dir: str, stem: str) -> dict:
+    """Mach and CDp from a .run file's .avl deck and rho from its .mass file, when present."""
+    defaults = {}
+    avl_path = os.path.join(results_dir, f"{stem}.avl")
+    mass_path = os.path.join(results_dir, f"{stem}.mass")
+    try:
+        if os.path.exists(avl_path):
+            header = read_avl_header(avl_path)
+            defaults.update(Mach=header["Mach"], Cdo=header["CDp"])
+        if os.path.exists(mass_path):
+            _, info = read_mass(mass_path)
+            if info["rho"] is not None:
+                defaults["rho"] = info["rho"]
+    except (ValueError, IndexError, StopIteration) as e:
+        print(f"Warning: Could not read the decks of {stem}: {e}")
+    return defaults
+
+
+def export_plan(results_dir: str, jobs=None, archive=None) -> list:
+    """
+    Returns [(job, .run file name or None)] for every job with a `.sim` file, grouped
+    by the .run file (single-case or session) that describes it.
+
+    Parameters:
+        results_dir (str): Directory holding the results.
+        jobs (iterable): Job names to export; defaults to all.
+        archive (ResultArchive): Also list the archived jobs no longer on disk.
+    """
+    wanted = set(jobs) if jobs is not None else None
+    sims = set()
+    runs = []
+    with os.scandir(results_dir) as entries:
+        for entry in entries:
+            stem, ext = os.path.splitext(entry.name)
+            if ext == ".sim" and (wanted is None or stem in wanted):
+                sims.add(stem)
+            elif ext == ".run":
+                runs.append(entry.name)
+
+    plan = []
+    for run_file in sorted(runs):
+        with open(os.path.join(results_dir, run_file), "r") as f:
+            names = [line.partition(":")[2].strip() for line in f if line.strip().lower().startswith("run case")]
+        for name in names:
+            if name in sims:
+                plan.append((name, run_file))
+                sims.discard(name)
+    plan.extend((job, None) for job in sorted(sims))
+
+    if archive is not None:
+        on_disk = {job for job, _ in plan}
+        archived = []
+        for job in archive.jobs():
+            if job in on_disk or (wanted is not None and job not in wanted):
+                continue
+            run_files = [name for name in archive.files(job) if name.endswith(".run")]
+            archived.append((run_files[0] if run_files else None, job))
+        plan.extend((job, run_file) for run_file, job in sorted(archived, key=lambda item: (item[0] or "", item[1])))
+    return plan
+
+
+def result_row(job: str, run_file: str, case, values: dict) -> dict:
+    """
+    Returns one result row over `result_schema()` from a job's case (or None) and
+    parsed `.sim` values.
+    """
+    row = {"job": job, "run_file": run_file or ""}
+    for name in METADATA_COLUMNS:
+        value = getattr(case, name, None) if case is not None else None
+        row[name] = (value or "") if name in TEXT_METADATA else (np.nan if value is None else float(value))
+    for name in COEFFICIENT_COLUMNS + DERIVATIVE_COLUMNS + CONTROL_COLUMNS:
+        row[name] = values.get(name, np.nan)
+    if "Mach" in values:
+        row["Mach"] = values["Mach"]  # The Mach AVL actually ran
+    return row
+
+
+def _job_row(directory: str, job: str, run_file: str, cases: dict, mmap: bool = True) -> tuple:
+    """(row, strips) of a job whose files are in `directory`; `cases` caches the .run file's cases."""
+    if run_file is not None and run_file not in cases:
+        stem = os.path.splitext(run_file)[0]
+        run_path = os.path.join(directory, run_file)
+        cases.clear()
+        cases[run_file] = {}
+        if os.path.exists(run_path):
+            cases[run_file] = {case.name: case for case in read_run(run_path, _run_defaults(directory, stem))}
+
+    values = parse_sim_file(os.path.join(directory, f"{job}.sim"))
+    row = result_row(job, run_file, cases.get(run_file, {}).get(job), values)
+
+    strips = None
+    if os.path.exists(os.path.join(directory, f"{job}_strips.npy")):
+        strips = load_force_array(directory, job, "strips", mmap)
+    return row, strips
+
+
+def iter_rows(results_dir: str, plan: list, archive=None):
+    """
+    Yields (row, strips) per job of an export plan: the result row as a dict over
+    `result_schema()` and the job's strip array (or None). Only one .run file's
+    cases are held at a time.
+
+    Jobs without a `.sim` file in `results_dir` are read from `archive`, if given:
+    their files are restored to a temporary directory one job at a time.
+    """
+    disk_cases, archive_cases = {}, {}
+    for job, run_file in plan:
+        if archive is None or os.path.exists(os.path.join(results_dir, f"{job}.sim")):
+            yield _job_row(results_dir, job, run_file, disk_cases)
+            continue
+        with tempfile.TemporaryDirectory() as directory:
+            archive.restore(job, directory)
+            yield _job_row(directory, job, run_file, archive_cases, mmap=False)
+
+
+def _chunks(rows, chunk_size: int, schema: list):
+    """Groups dict rows into column chunks {column: list}."""
+    chunk = {name: [] for name, _ in schema}
+    count = 0
+    for row in rows:
+        for name, _ in schema:
+            chunk[name].append(row[name])
+        count += 1
+        if count == chunk_size:
+            yield chunk
+            chunk = {name: [] for name, _ in schema}
+            count = 0
+    if count:
+        yield chunk
+
+
+def _strip_rows(job: str, strips: np.ndarray):
+    for record in strips:
+        row = {"job": job, "surface": int(record["surface"]), "strip": int(record["strip"])}
+        for name in STRIP_COLUMNS:
+            row[name] = float(record[name])
+        yield row
+
+
+class _Writer:
+    """
+    Appends column chunks to one output file; the format follows the file extension
+    (.csv, .parquet or .npz).
+    """
+
+    def __init__(self, filepath: str, schema: list, rows: int):
+        self.filepath = filepath
+        self.schema = schema
+        self.kind = os.path.splitext(filepath)[1].lower().lstrip(".")
+        self.written = 0
+
+        if self.kind == "csv":
+            self.file = open(filepath, "w", newline="")
+            self.csv = csv.writer(self.file)
+            self.csv.writerow([name for name, _ in schema])
+        elif self.kind == "parquet":
+            types = {"str": pa.string(), "int": pa.int32(), "float": pa.float64()}
+            self.arrow_schema = pa.schema([(name, types[kind]) for name, kind in schema])
+            self.parquet = pq.ParquetWriter(filepath, self.arrow_schema)
+        elif self.kind == "npz":
+            # Columns are filled on disk and zipped at the end, so no column is held in memory
+            self.tmpdir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(filepath)))
+            dtypes = {"str": f"U{TEXT_WIDTH}", "int": np.int32, "float": np.float64}
+            self.columns = {
+                name: np.lib.format.open_memmap(os.path.join(self.tmpdir, f"{i}.npy"), mode="w+",
+                                                dtype=dtypes[kind], shape=(rows,))
+                for i, (name, kind) in enumerate(schema)
+            }
+        else:
+            raise ValueError(f"Unsupported export format: {self.kind}")
+
+    def write(self, chunk: dict):
+        n = len(chunk[self.schema[0][0]])
+        if self.kind == "csv":
+            self.csv.writerows(zip(*(chunk[name] for name, _ in self.schema)))
+        elif self.kind == "parquet":
+            self.parquet.write_table(pa.table(chunk, schema=self.arrow_schema))
+        else:
+            for name, _ in self.schema:
+                self.columns[name][self.written:self.written + n] = chunk[name]
+        self.written += n
+
+    def close(self):
+        if self.kind == "csv":
+            self.file.close()
+        elif self.kind == "parquet":
+            self.parquet.close()
+        else:
+            with zipfile.ZipFile(self.filepath, "w", zipfile.ZIP_DEFLATED) as archive:
+                for i, (name, _) in enumerate(self.schema):
+                    self.columns[name].flush()
+                    path = self.columns[name].filename
+                    del self.columns[name]
+                    archive.write(path, f"{name}.npy")
+                    os.remove(path)
+            os.rmdir(self.tmpdir)
+
+
+def export_results(results_dir: str, filepath: str, jobs=None, strips: bool = True, chunk_size: int = 1000) -> dict:
+    """
+    Exports the parsed results of a whole campaign to one columnar file.
+
+    Every job with a `.sim` file, on disk or archived (see `archive.ResultArchive`),
+    becomes one row of `result_schema()`: its job name, the case inputs from the .run
+    deck it was run with, and its coefficients, stability and control derivatives and
+    hinge moments. With `strips`, the strip
+    forces of jobs that saved them go to "<name>_strips.<ext>" in long format (one
+    row per job and strip, see `strip_schema()`).
+
+    Rows are processed in chunks of `chunk_size`, so memory use does not grow with the
+    number of jobs. NPZ files hold one array per column ("Alpha", "CLtot", ...); in
+    NPZ, text is limited to TEXT_WIDTH characters and strip data needs a first pass
+    to count the strips.
+
+    Parameters:
+        results_dir (str): Directory holding the results.
+        filepath (str): Output path; ".csv", ".parquet" (needs pyarrow) or ".npz".
+        jobs (iterable): Job names to export; defaults to all.
+        strips (bool): Also export strip data.
+        chunk_size (int): Rows per chunk (and per Parquet row group).
+
+    Returns:
+        dict: {"rows", "strip_rows", "files"}, or None if the format is unavailable.
+    """
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext == ".parquet" and pa is None:
+        print("[ERROR] Parquet export needs pyarrow; export to .csv or .npz instead.")
+        return None
+
+    # Imported here: archive imports export_plan from this module
+    from archive import ResultArchive, ARCHIVE_FILE
+    archive = None
+    if os.path.exists(os.path.join(results_dir, ARCHIVE_FILE)):
+        archive = ResultArchive(results_dir)
+
+    plan = export_plan(results_dir, jobs, archive)
+    files = [filepath]
+    writer = _Writer(filepath, result_schema(), len(plan))
+
+    strip_writer = None
+    strip_path = os.path.splitext(filepath)[0] + "_strips" + ext
+    if strips:
+        strip_files, archived_strips = [], []
+        for job, _ in plan:
+            if os.path.exists(os.path.join(results_dir, f"{job}_strips.npy")):
+                strip_files.append(job)
+            elif archive is not None and not os.path.exists(os.path.join(results_dir, f"{job}.sim")) \
+                    and f"{job}_strips.npy" in archive.files(job):
+                archived_strips.append(job)
+        if strip_files or archived_strips:
+            total = 0
+            if ext == ".npz":
+                total = sum(len(load_force_array(results_dir, job, "strips")) for job in strip_files)
+                total += sum(len(np.load(io.BytesIO(archive.read(job, f"{job}_strips.npy"))))
+                             for job in archived_strips)
+            strip_writer = _Writer(strip_path, strip_schema(), total)
+            files.append(strip_path)
+
+    strip_buffer = []
+
+    def flush_strips():
+        for chunk in _chunks(strip_buffer, chunk_size, strip_writer.schema):
+            strip_writer.write(chunk)
+        strip_buffer.clear()
+
+    def rows():
+        for row, job_strips in iter_rows(results_dir, plan, archive):
+            if strip_writer is not None and job_strips is not None:
+                strip_buffer.extend(_strip_rows(row["job"], job_strips))
+                if len(strip_buffer) >= chunk_size:
+                    flush_strips()
+            yield row
+
+    try:
+        for chunk in _chunks(rows(), chunk_size, writer.schema):
+            writer.write(chunk)
+        if strip_writer is not None:
+            flush_strips()
+    finally:
+        writer.close()
+        if strip_writer is not None:
+            strip_writer.close()
+
+    return {"rows": writer.written, "strip_rows": strip_writer.written if strip_writer else 0, "files": files}
@@ -0,0 +1,89 @@
+import numpy as np
+from models import Aircraft
+
+# Control derivative coefficients available per control from AVL stability output
+CONTROL_COEFFICIENTS = ("CL", "CY", "Cl", "Cm", "Cn", "CDff", "e")
+
+
+def get_control_types(aircraft: Aircraft) -> dict:
+    """
+    Maps each `Control Name` (as generated in GeometryPropertyEditor.save_draft)
+    to its control type.
+
+    The deck writer names AVL controls by type, so every control of one type is
+    ganged into a single AVL control variable and shares its hinge moment and
+    derivatives.
+    """
+    return {
+        ctrl["Control Name"]: ctrl.get("Control Type", "Elevator")
+        for surface in aircraft.geometry.values()
+        for ctrl in surface.control_surfaces
+        if "Control Name" in ctrl
+    }
+
+
+def hinge_moments_by_control(aircraft: Aircraft, values: dict) -> dict:
+    """
+    Returns {Control Name: Chinge} for one parsed run (see `output_parser.parse_sim_file`).
+    Controls missing from the output are omitted.
+    """
+    moments = {}
+    for name, ctrl_type in get_control_types(aircraft).items():
+        key = f"Chinge_{ctrl_type}"
+        if key in values:
+            moments[name] = values[key]
+    return moments
+
+
+def control_derivatives_by_control(aircraft: Aircraft, values: dict) -> dict:
+    """
+    Returns {Control Name: {coefficient: derivative per degree}} for one parsed run.
+    """
+    derivatives = {}
+    for name, ctrl_type in get_control_types(aircraft).items():
+        entry = {
+            coef: values[f"{coef}d_{ctrl_type}"]
+            for coef in CONTROL_COEFFICIENTS
+            if f"{coef}d_{ctrl_type}" in values
+        }
+        if entry:
+            derivatives[name] = entry
+    return derivatives
+
+
+def control_table(aircraft: Aircraft, results, control_name: str, quantity: str = "Chinge") -> dict:
+    """
+    Assembles a deflection x alpha table of one control quantity across a batch.
+
+    Parameters:
+        aircraft (Aircraft): Aircraft the batch was run on.
+        results (iterable): Parsed runs (dicts from `output_parser.parse_sim_file`).
+        control_name (str): `Control Name` of the control, e.g. "htail_elevator_1".
+        quantity (str): "Chinge" for hinge moments or a coefficient from
+            CONTROL_COEFFICIENTS for control derivatives.
+
+    Returns:
+        dict: {"alpha": (n_alpha,), "deflection": (n_defl,), quantity: (n_defl, n_alpha)}.
+            Combinations not present in the batch are NaN.
+    """
+    ctrl_type = get_control_types(aircraft).get(control_name)
+    if ctrl_type is None:
+        raise ValueError(f"Unknown control: {control_name}")
+
+    key = f"Chinge_{ctrl_type}" if quantity == "Chinge" else f"{quantity}d_{ctrl_type}"
+    points = [
+        (values["Alpha"], values[ctrl_type], values[key])
+        for values in results
+        if "Alpha" in values and ctrl_type in values and key in values
+    ]
+    if not points:
+        return {"alpha": np.empty(0), "deflection": np.empty(0), quantity: np.empty((0, 0))}
+
+    data = np.round(np.array(points, dtype=float), 6)
+    alphas, alpha_idx = np.unique(data[:, 0], return_inverse=True)
+    deflections, defl_idx = np.unique(data[:, 1], return_inverse=True)
+
+    table = np.full((len(deflections), len(alphas)), np.nan)
+    table[defl_idx, alpha_idx] = data[:, 2]
+
+    return {"alpha": alphas, "deflection": deflections, quantity: table}
@@ -0,0 +1,525 @@
+import os
+import math
+from models import Aircraft, GeometrySurface, MassProperty, SimulationCase
+
+# Control types known to PAVL; other AVL control names are imported as their own type
+CONTROL_TYPES = ("Aileron", "Elevator", "Rudder", "Flap")
+
+# .run constraint names of the alpha variable and their SimulationCase aoa_mode
+AOA_CONSTRAINTS = {"alpha": "Angle", "CL": "CL", "Cm pitchmom": "Cm"}
+
+# .run constraint names of moment-trimmed controls: {control type: (constraint, mode)}
+CONTROL_CONSTRAINTS = {
+    "Elevator": ("Cm pitchmom", "Cm"),
+    "Aileron": ("Cl roll mom", "Cl"),
+    "Rudder": ("Cn yaw mom", "Cn"),
+}
+
+# .mass unit names: {name: (unit system, factor to the system's base unit)}
+LENGTH_UNITS = {"m": ("MKS", 1.0), "cm": ("MKS", 0.01), "mm": ("MKS", 0.001),
+                "ft": ("FPS", 1.0), "in": ("FPS", 1.0 / 12.0)}
+MASS_UNITS = {"kg": ("MKS", 1.0), "g": ("MKS", 0.001), "slug": ("FPS", 1.0), "lbm": ("FPS", 1.0 / 32.174)}
+
+MASS_FIELDS = ("mass", "x", "y", "z", "Ixx", "Iyy", "Izz", "Ixy", "Ixz", "Iyz")
+
+
+class _Lines:
+    """
+    Streams the data lines of an AVL file: comments (# or !) and blank lines are
+    dropped, and one line can be pushed back after peeking.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.pushed = []
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.pushed:
+            return self.pushed.pop()
+        for line in self.f:
+            line = line.split("!", 1)[0].split("#", 1)[0].strip()
+            if line:
+                return line
+        raise StopIteration
+
+    def push(self, line):
+        self.pushed.append(line)
+
+    def numbers(self) -> list:
+        """Returns the numbers on the next data line."""
+        return [float(token) for token in next(self).split()]
+
+
+def _is_number(token: str) -> bool:
+    try:
+        float(token)
+        return True
+    except ValueError:
+        return False
+
+
+def _text(value: float, decimals: int = 5) -> str:
+    # Section and control fields are stored as entry strings, as saved by the property editor.
+    # Rounding to the precision of the deck removes noise from reconstructing the sections.
+    return f"{round(value, decimals) + 0.0:.10g}"
+
+
+def _read_header(lines: _Lines) -> dict:
+    header = {"title": next(lines), "Mach": lines.numbers()[0], "iYsym": int(lines.numbers()[0]), "CDp": 0.0}
+    header["Sref"], header["Cref"], header["Bref"] = lines.numbers()[:3]
+    header["Xref"], header["Yref"], header["Zref"] = lines.numbers()[:3]
+    line = next(lines, None)
+    if line is not None and _is_number(line.split()[0]):
+        header["CDp"] = float(line.split()[0])
+    elif line is not None:
+        lines.push(line)
+    return header
+
+
+def read_avl_header(filepath: str) -> dict:
+    """
+    Reads only the header of a .avl deck.
+
+    Returns:
+        dict: "title", "Mach", "iYsym", "Sref", "Cref", "Bref", "Xref", "Yref", "Zref" and "CDp".
+    """
+    with open(filepath, "r") as f:
+        return _read_header(_Lines(f))
+
+
+def read_avl(filepath: str) -> tuple:
+    """
+    Reads a .avl geometry deck.
+
+    AVL sections become PAVL sections in PAVL's own convention: the section Span is the
+    increase of the distance from the root station, Dihedral and LE Sweep are the angles
+    that place the section's tip station at that distance (so PAVL writes the original
+    stations back), and chords are given as Root+Tip. The surface twist is the linear
+    fit of the section incidences from root to tip. Stations that only mark control
+    ends and lie on a straight line between their neighbours are dropped, since PAVL
+    inserts them again from the control's span locations.
+
+    Parameters:
+        filepath (str): Path to the .avl file.
+
+    Returns:
+        tuple: (Aircraft with geometry and reference values, header dict, see `read_avl_header`).
+    """
+    aircraft = Aircraft()
+    warned = set()
+
+    def warn_once(message):
+        if message not in warned:
+            warned.add(message)
+            print(f"Warning: {message}")
+
+    with open(filepath, "r") as f:
+        lines = _Lines(f)
+        header = _read_header(lines)
+        aircraft.Sref, aircraft.Cref, aircraft.Bref = header["Sref"], header["Cref"], header["Bref"]
+
+        surface = None
+        raw = None
+        for line in lines:
+            key = line[:4].upper()
+            if key == "SURF":
+                if surface is not None:
+                    _finish_surface(aircraft, surface, raw, header["iYsym"], warn_once)
+                surface = GeometrySurface(next(lines).strip())
+                mesh = lines.numbers()
+                surface.nchord, surface.cspace = int(mesh[0]), mesh[1]
+                if len(mesh) >= 4:
+                    surface.nspan, surface.sspace = int(mesh[2]), mesh[3]
+                raw = {"stations": [], "scale": (1.0, 1.0, 1.0), "translate": (0.0, 0.0, 0.0),
+                       "angle": 0.0, "duplicate": None}
+            elif key == "BODY":
+                if surface is not None:
+                    _finish_surface(aircraft, surface, raw, header["iYsym"], warn_once)
+                surface = raw = None
+                warn_once(f"BODY blocks are not supported by PAVL and were skipped ({filepath}).")
+                next(lines)
+            elif raw is None:
+                continue  # Inside a skipped BODY block
+            elif key == "YDUP":
+                raw["duplicate"] = lines.numbers()[0]
+            elif key == "SCAL":
+                raw["scale"] = tuple(lines.numbers()[:3])
+            elif key == "TRAN":
+                raw["translate"] = tuple(lines.numbers()[:3])
+            elif key == "ANGL":
+                raw["angle"] = lines.numbers()[0]
+            elif key == "SECT":
+                values = lines.numbers()
+                raw["stations"].append({"xyz": values[:3], "chord": values[3], "ainc": values[4], "controls": []})
+            elif key == "NACA":
+                digits = next(lines).split()[0]
+                if not surface.naca_airfoil:
+                    surface.naca_airfoil = digits
+                elif digits != surface.naca_airfoil:
+                    warn_once(f"Surface '{surface.name}' uses several NACA airfoils; PAVL keeps {surface.naca_airfoil}.")
+            elif key == "CONT":
+                tokens = next(lines).split()
+                if raw["stations"]:
+                    raw["stations"][-1]["controls"].append((tokens[0], float(tokens[2])))
+            elif key == "AIRF":
+                for data in lines:
+                    if not all(_is_number(token) for token in data.split()):
+                        lines.push(data)
+                        break
+                warn_once("Airfoil coordinates are not supported by PAVL and were skipped.")
+            elif key in ("AFIL", "BFIL"):
+                next(lines)
+                warn_once("Airfoil files are not supported by PAVL and were skipped.")
+            elif key in ("COMP", "INDE", "CLAF", "CDCL", "DESI"):
+                next(lines)
+            elif key in ("NOWA", "NOAL", "NOLO"):
+                continue
+            elif not _is_number(line.split()[0]):
+                warn_once(f"Unknown AVL keyword '{line.split()[0]}' was skipped.")
+
+        if surface is not None:
+            _finish_surface(aircraft, surface, raw, header["iYsym"], warn_once)
+
+    return aircraft, header
+
+
+def _finish_surface(aircraft: Aircraft, surface: GeometrySurface, raw: dict, iysym: int, warn_once):
+    """
+    Converts the collected AVL stations of one surface into PAVL sections and controls.
+    """
+    stations = raw["stations"]
+    if len(stations) < 2:
+        warn_once(f"Surface '{surface.name}' has fewer than two sections and was skipped.")
+        return
+    if raw["duplicate"] is None and not iysym:
+        warn_once(f"Surface '{surface.name}' is not mirrored in the deck; PAVL always mirrors surfaces.")
+    elif raw["duplicate"]:
+        warn_once(f"Surface '{surface.name}' is mirrored about y = {raw['duplicate']}; PAVL mirrors about y = 0.")
+
+    # Scaled stations relative to the root leading edge, which becomes the surface position
+    sx, sy, sz = raw["scale"]
+    dx, dy, dz = raw["translate"]
+    x0, y0, z0 = stations[0]["xyz"]
+    surface.x, surface.y, surface.z = dx + sx * x0, dy + sy * y0, dz + sz * z0
+    for station in stations:
+        x, y, z = station["xyz"]
+        station["local"] = (sx * (x - x0), sy * (y - y0), sz * (z - z0))
+        station["chord"] *= sx
+        station["span"] = math.hypot(station["local"][1], station["local"][2])
+
+    total_span = stations[-1]["span"]
+    if total_span <= 0:
+        warn_once(f"Surface '{surface.name}' has no span and was skipped.")
+        return
+
+    # Incidence at the root plus a linear twist to the tip
+    ainc_root, ainc_tip = stations[0]["ainc"], stations[-1]["ainc"]
+    surface.incidence = raw["angle"] + ainc_root
+    surface.twist = ainc_tip - ainc_root
+    for station in stations[1:-1]:
+        linear = ainc_root + surface.twist * station["span"] / total_span
+        if abs(station["ainc"] - linear) > 0.01:
+            warn_once(f"Surface '{surface.name}' has non-linear twist; PAVL uses a linear fit.")
+            break
+
+    # Controls: consecutive stations carrying the same control form one control surface
+    runs, open_runs = [], {}
+    for i, station in enumerate(stations):
+        names = {name for name, _ in station["controls"]}
+        for name in list(open_runs):
+            if name not in names:
+                runs.append(open_runs.pop(name))
+        for name, hinge in station["controls"]:
+            if name in open_runs:
+                open_runs[name]["end"] = i
+            else:
+                open_runs[name] = {"name": name, "hinge": hinge, "start": i, "end": i}
+    runs.extend(open_runs.values())
+
+    boundaries = set()
+    for index, run in enumerate(sorted(runs, key=lambda r: r["start"]), start=1):
+        if run["end"] == run["start"]:
+            warn_once(f"Control '{run['name']}' on '{surface.name}' spans no section and was skipped.")
+            continue
+        control_type = run["name"].capitalize() if run["name"].capitalize() in CONTROL_TYPES else run["name"]
+        surface.control_surfaces.append({
+            "Hinge Loc": _text(run["hinge"]),
+            "Inboard Loc": _text(stations[run["start"]]["span"] / total_span, 4),
+            "Outboard Loc": _text(stations[run["end"]]["span"] / total_span, 4),
+            "Control Type": control_type,
+            "Control Name": f"{surface.name}_{control_type.lower()}_{index}",
+        })
+        boundaries.update((run["start"], run["end"]))
+
+    kept = [stations[0]]
+    for i in range(1, len(stations) - 1):
+        if i in boundaries and _on_line(stations[i - 1], stations[i], stations[i + 1]):
+            continue
+        kept.append(stations[i])
+    kept.append(stations[-1])
+
+    for inboard, outboard in zip(kept[:-1], kept[1:]):
+        span = outboard["span"] - inboard["span"]
+        if span <= 1e-9:
+            warn_once(f"Surface '{surface.name}' has coincident sections; they were merged.")
+            continue
+        x, y, z = outboard["local"]
+        s = outboard["span"]
+        surface.sections.append({
+            "Span": _text(span),
+            "Root C": _text(inboard["chord"]),
+            "Tip C": _text(outboard["chord"]),
+            "LE Sweep": _text(math.degrees(math.atan(x / s)), 3),
+            "Dihedral": _text(math.degrees(math.atan2(z, y)), 3),
+            "ChordMode": "Root+Tip",
+            "SweepMode": "LE",
+        })
+
+    aircraft.geometry[surface.name] = surface
+
+
+def _on_line(a: dict, b: dict, c: dict, tol: float = 1e-4) -> bool:
+    """Checks whether station b is the linear interpolation of stations a and c."""
+    if c["span"] <= a["span"]:
+        return False
+    t = (b["span"] - a["span"]) / (c["span"] - a["span"])
+    scale = max(1.0, c["span"])
+    pairs = [(a["local"][k], b["local"][k], c["local"][k]) for k in range(3)]
+    pairs += [(a["chord"], b["chord"], c["chord"]), (a["ainc"], b["ainc"], c["ainc"])]
+    return all(abs(va + t * (vc - va) - vb) <= tol * scale for va, vb, vc in pairs)
+
+
+def read_mass(filepath: str) -> tuple:
+    """
+    Reads a .mass file, applying its unit factors and "*" / "+" scale and offset lines.
+
+    Lengths and masses are converted to the base unit (m/kg or ft/slug) of the unit
+    system named by Lunit.
+
+    Returns:
+        tuple: ({name: MassProperty}, info dict with "units", "length_factor", "g" and "rho").
+    """
+    info = {"units": "MKS", "length_factor": 1.0, "g": None, "rho": None}
+    mass_factor = 1.0
+    scale = [1.0] * len(MASS_FIELDS)
+    offset = [0.0] * len(MASS_FIELDS)
+    props = {}
+
+    with open(filepath, "r") as f:
+        for raw in f:
+            line, _, comment = raw.partition("!")
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+
+            if "=" in line:
+                key, _, value = line.partition("=")
+                key, tokens = key.strip().lower(), value.split()
+                if key == "lunit":
+                    unit = tokens[1].lower() if len(tokens) > 1 else "m"
+                    system, factor = LENGTH_UNITS.get(unit, ("MKS", 1.0))
+                    if unit not in LENGTH_UNITS:
+                        print(f"Warning: Unknown length unit '{unit}' in {filepath}; assuming m.")
+                    info["units"], info["length_factor"] = system, float(tokens[0]) * factor
+                elif key == "munit":
+                    unit = tokens[1].lower() if len(tokens) > 1 else "kg"
+                    system, factor = MASS_UNITS.get(unit, (info["units"], 1.0))
+                    if system != info["units"]:
+                        print(f"Warning: Mass unit '{unit}' does not match the {info['units']} length unit.")
+                    mass_factor = float(tokens[0]) * factor
+                elif key in ("g", "rho"):
+                    info[key] = float(tokens[0])
+                continue
+
+            if line[0] in "*+":
+                values = [float(token) for token in line[1:].split()]
+                target = scale if line[0] == "*" else offset
+                target[:len(values)] = values
+                continue
+
+            values = [float(token) for token in line.split()]
+            values += [0.0] * (len(MASS_FIELDS) - len(values))
+            values = [v * s + o for v, s, o in zip(values, scale, offset)]
+
+            length = info["length_factor"]
+            factors = [mass_factor] + [length] * 3 + [mass_factor * length ** 2] * 6
+            fields = dict(zip(MASS_FIELDS, (v * k for v, k in zip(values, factors))))
+
+            name = comment.strip() or f"mass{len(props) + 1}"
+            base, suffix = name, 2
+            while name in props:
+                name, suffix = f"{base}_{suffix}", suffix + 1
+            props[name] = MassProperty(name, **fields)
+
+    return props, info
+
+
+def read_run(filepath: str, defaults: dict = None) -> list:
+    """
+    Reads the run cases of a .run file (one or many) into SimulationCase objects.
+
+    Constraints PAVL cannot represent (e.g. beta -> Cn) are reported and skipped.
+
+    Parameters:
+        filepath (str): Path to the .run file.
+        defaults (dict): SimulationCase values used when a case does not set them
+            (e.g. {"Mach": ..., "Cdo": ..., "rho": ...} from the .avl and .mass files).
+
+    Returns:
+        list: SimulationCase objects in file order.
+    """
+    defaults = defaults or {}
+    cases, names = [], set()
+    case = None
+
+    with open(filepath, "r") as f:
+        for raw in f:
+            line = raw.strip()
+            if not line or line.startswith("#") or set(line) <= set("-="):
+                continue
+
+            if line.lower().startswith("run case"):
+                name = line.partition(":")[2].strip() or f"case{len(cases) + 1}"
+                base, suffix = name, 2
+                while name in names:
+                    name, suffix = f"{base}_{suffix}", suffix + 1
+                names.add(name)
+                case = SimulationCase(name, **defaults)
+                cases.append(case)
+                continue
+            if case is None:
+                continue
+
+            if "->" in line:
+                variable, _, constraint = line.partition("->")
+                constraint, _, value = constraint.partition("=")
+                _apply_constraint(case, " ".join(variable.split()), " ".join(constraint.split()),
+                                  float(value.split()[0]))
+            elif "=" in line:
+                key, _, value = line.partition("=")
+                tokens = value.split()
+                if not tokens or not _is_number(tokens[0]):
+                    continue
+                key, value = key.strip().lower(), float(tokens[0])
+                if key == "mach":
+                    case.Mach = value
+                elif key == "cdo":
+                    case.Cdo = value
+                elif key == "density":
+                    case.rho = value
+                elif key == "velocity" and value > 0:
+                    case.velocity = value
+
+    return cases
+
+
+def _apply_constraint(case: SimulationCase, variable: str, constraint: str, value: float):
+    if variable == "alpha":
+        if constraint in AOA_CONSTRAINTS:
+            case.aoa_mode, case.aoa_val = AOA_CONSTRAINTS[constraint], value
+            return
+    elif variable in ("beta", "pb/2V", "qc/2V", "rb/2V"):
+        if constraint == variable:
+            setattr(case, variable.replace("/", ""), value)
+            return
+    else:
+        control_type = variable.capitalize()
+        if control_type in CONTROL_TYPES:
+            prefix = control_type.lower()
+            if constraint.lower() == variable.lower():
+                setattr(case, f"{prefix}_mode", "Deflection")
+                setattr(case, f"{prefix}_val", value)
+                return
+            if CONTROL_CONSTRAINTS.get(control_type, (None,))[0] == constraint:
+                setattr(case, f"{prefix}_mode", CONTROL_CONSTRAINTS[control_type][1])
+                setattr(case, f"{prefix}_val", value)
+                return
+    print(f"Warning: Constraint '{variable} -> {constraint}' of case '{case.name}' is not supported and was skipped.")
+
+
+def _scale_lengths(aircraft: Aircraft, factor: float):
+    """Scales the geometry and reference lengths of an imported aircraft by `factor`."""
+    aircraft.Sref *= factor ** 2
+    aircraft.Cref *= factor
+    aircraft.Bref *= factor
+    for surface in aircraft.geometry.values():
+        surface.x, surface.y, surface.z = surface.x * factor, surface.y * factor, surface.z * factor
+        for section in surface.sections:
+            for key in ("Span", "Root C", "Tip C"):
+                section[key] = _text(float(section[key]) * factor)
+
+
+def import_avl(avl_path: str, mass_path: str = None, run_path: str = None) -> Aircraft:
+    """
+    Imports an AVL deck into a new Aircraft.
+
+    The .mass and .run files default to the files next to `avl_path` with the same
+    name, when they exist. Cases take Mach and CDp from the .avl header and rho from
+    the .mass file unless the .run file sets them. When the .mass Lunit is not the
+    base unit (e.g. inches), the geometry is converted along with the masses.
+
+    Parameters:
+        avl_path (str): Path to the .avl file.
+        mass_path (str): Path to the .mass file.
+        run_path (str): Path to the .run file.
+
+    Returns:
+        Aircraft: Geometry, mass components, cases and reference values.
+    """
+    stem = os.path.splitext(avl_path)[0]
+    if mass_path is None and os.path.exists(stem + ".mass"):
+        mass_path = stem + ".mass"
+    if run_path is None and os.path.exists(stem + ".run"):
+        run_path = stem + ".run"
+
+    aircraft, header = read_avl(avl_path)
+    defaults = {"Mach": header["Mach"], "Cdo": header["CDp"]}
+
+    if mass_path:
+        aircraft.mass_properties, info = read_mass(mass_path)
+        aircraft.units = info["units"]
+        if info["length_factor"] != 1.0:
+            _scale_lengths(aircraft, info["length_factor"])
+        if info["rho"] is not None:
+            defaults["rho"] = info["rho"]
+
+    if run_path:
+        aircraft.simulation_cases = {case.name: case for case in read_run(run_path, defaults)}
+
+    return aircraft
+
+
+def import_directory(directory: str) -> dict:
+    """
+    Imports every .avl deck in a directory, with its same-named .mass and .run files.
+    Decks that fail to parse are reported and skipped.
+
+    Returns:
+        dict: {deck name: Aircraft}.
+    """
+    imported = {}
+    for filename in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(filename)
+        if ext.lower() != ".avl":
+            continue
+        try:
+            imported[stem] = import_avl(os.path.join(directory, filename))
+        except (OSError, ValueError, IndexError, StopIteration) as e:
+            print(f"[ERROR] Failed to import {filename}: {e}")
+    return imported
+
+
+def merge_aircraft(target: Aircraft, source: Aircraft):
+    """
+    Copies an imported aircraft into an existing one in place (e.g. the session's
+    global aircraft): surfaces, mass components and cases are added or replaced by
+    name, and the reference values and units are taken from `source`.
+    """
+    target.geometry.update(source.geometry)
+    target.mass_properties.update(source.mass_properties)
+    target.simulation_cases.update(source.simulation_cases)
+    target.units = source.units
+    target.Sref, target.Cref, target.Bref = source.Sref, source.Cref, source.Bref
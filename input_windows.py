@@ -390,6 +390,12 @@ def apply_geometry_surface(tab):
         gs.sections = draft["Sections"]
         gs.control_surfaces = draft["Controls"]
 
+        # Keep any lattice chosen by a mesh study when the surface is re-applied
+        if name in aircraft.geometry:
+            previous = aircraft.geometry[name]
+            gs.nchord, gs.cspace = previous.nchord, previous.cspace
+            gs.nspan, gs.sspace = previous.nspan, previous.sspace
+
         aircraft.geometry[name] = gs
         tab.update_listbox(aircraft.geometry.keys())
         
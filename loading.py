@@ -0,0 +1,107 @@
+import itertools
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from models import Aircraft
+from batch import run_batch
+from snapshot import replace
+
+# MassProperty fields a loading variation may change
+LOADING_FIELDS = ("mass", "x", "y", "z", "Ixx", "Iyy", "Izz", "Ixy", "Ixz", "Iyz")
+
+
+def loading_variants(aircraft: Aircraft, variations: dict) -> list:
+    """
+    Expands component variations into distinct mass configurations.
+
+    Parameters:
+        aircraft (Aircraft): Aircraft providing the nominal mass components.
+        variations (dict): {component name: {field: values}}, e.g.
+            {"battery": {"x": [0.1, 0.2, 0.3]}, "payload": {"mass": [0.0, 0.5]}}.
+
+    Returns:
+        list: (settings, mass_properties) per distinct configuration, where settings is
+            {"<component>.<field>": value} and mass_properties a new component dict
+            sharing the unchanged components.
+            Combinations that produce an identical .mass deck are kept once.
+    """
+    axes = []
+    for name, fields in variations.items():
+        if name not in aircraft.mass_properties:
+            raise ValueError(f"Unknown mass component: {name}")
+        for field, values in fields.items():
+            if field not in LOADING_FIELDS:
+                raise ValueError(f"Mass component field '{field}' cannot be varied.")
+            axes.append((name, field, list(values)))
+
+    variants, seen = [], set()
+    for combo in itertools.product(*(values for _, _, values in axes)):
+        changes = {}
+        for (name, field, _), value in zip(axes, combo):
+            changes.setdefault(name, {})[field] = float(value)
+        props = {name: replace(prop, **changes[name]) if name in changes else prop
+                 for name, prop in aircraft.mass_properties.items()}
+
+        key = tuple(round(float(getattr(prop, field)), 6) for prop in props.values() for field in LOADING_FIELDS)
+        if key in seen:
+            continue
+        seen.add(key)
+        settings = {f"{name}.{field}": float(value) for (name, field, _), value in zip(axes, combo)}
+        variants.append((settings, props))
+    return variants
+
+
+def cg_envelope(aircraft: Aircraft, variations: dict, trim_cases, results_dir: str, prefix: str = "cg",
+                workers: int = 4, **batch_options) -> dict:
+    """
+    Runs the trim cases for every distinct loading and tabulates neutral point,
+    static margin and trim elevator against CG.
+
+    Each loading gets its own `.mass` deck (AVL's MSET moves the moment reference to
+    its CG); the loadings run concurrently, each as one batch of all trim cases.
+
+    Parameters:
+        aircraft (Aircraft): Aircraft model to run.
+        variations (dict): Component variations, see `loading_variants`.
+        trim_cases (list): SimulationCase objects, typically CL-targeted with an Elevator Cm=0 trim.
+        results_dir (str): Directory for the generated decks and results.
+        prefix (str): Prefix of the job names; loading i runs as "<prefix><i>".
+        workers (int): Number of loadings run at the same time.
+        **batch_options: Passed to `batch.run_batch` (solver, avl_exe_path, mesh, ...).
+
+    Returns:
+        dict: Columns of one row per (loading, case): "loading", "case", each varied
+            "<component>.<field>", "mass", "Xcg", "Ycg", "Zcg", "Alpha", "CLtot",
+            "Elevator", "Xnp", "static_margin". Missing results are NaN.
+    """
+    trim_cases = list(trim_cases)
+    variants = loading_variants(aircraft, variations)
+
+    def run_loading(index):
+        variant = replace(aircraft, mass_properties=variants[index][1])
+        return run_batch(variant, trim_cases, results_dir, prefix=f"{prefix}{index + 1}", **batch_options)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        outcomes = list(pool.map(run_loading, range(len(variants))))
+
+    masses = np.array([[prop.mass for prop in props.values()] for _, props in variants])
+    positions = np.array([[[prop.x, prop.y, prop.z] for prop in props.values()] for _, props in variants])
+    totals = masses.sum(axis=1)
+    cgs = np.einsum("kn,kni->ki", masses, positions) / totals[:, None]
+
+    rows = []
+    for index, ((settings, _), results) in enumerate(zip(variants, outcomes)):
+        for case in trim_cases:
+            values = results.get(case.name, {})
+            xnp = values.get("Xnp", np.nan)
+            row = {"loading": index + 1, "case": case.name, **settings,
+                   "mass": totals[index], "Xcg": cgs[index, 0], "Ycg": cgs[index, 1], "Zcg": cgs[index, 2],
+                   "Alpha": values.get("Alpha", np.nan), "CLtot": values.get("CLtot", np.nan),
+                   "Elevator": values.get("Elevator", np.nan), "Xnp": xnp,
+                   "static_margin": (xnp - cgs[index, 0]) / aircraft.Cref}
+            rows.append(row)
+
+    table = {}
+    for column in (rows[0] if rows else []):
+        values = [row[column] for row in rows]
+        table[column] = values if column == "case" else np.array(values)
+    return table
@@ -0,0 +1,127 @@
+import itertools
+import numpy as np
+from models import Aircraft
+
+# Order of the inertia columns, as in the .mass file
+INERTIA_COLUMNS = ("Ixx", "Iyy", "Izz", "Ixy", "Ixz", "Iyz")
+
+
+class MassModel:
+    """
+    Mass components held as arrays for vectorized totals.
+
+    Inertias follow the AVL .mass convention: each component's Ixx..Izz and
+    products Ixy = int(x y dm), Ixz, Iyz are about its own CG, and the inertia
+    tensor is [[Ixx, -Ixy, -Ixz], [-Ixy, Iyy, -Iyz], [-Ixz, -Iyz, Izz]].
+
+    A loading is a vector of component masses. A component's own inertia scales
+    with its mass, so a half-full fuel tank keeps its shape and position.
+    """
+
+    def __init__(self, names, masses, positions, inertias):
+        """
+        Parameters:
+            names (list): Component names.
+            masses (array): (n,) nominal component masses.
+            positions (array): (n, 3) component CG positions.
+            inertias (array): (n, 6) component inertias about their own CG, in INERTIA_COLUMNS order.
+        """
+        self.names = list(names)
+        self.masses = np.asarray(masses, dtype=float).reshape(len(self.names))
+        self.positions = np.asarray(positions, dtype=float).reshape(len(self.names), 3)
+        self.inertias = np.asarray(inertias, dtype=float).reshape(len(self.names), 6)
+
+    @classmethod
+    def from_aircraft(cls, aircraft: Aircraft):
+        props = list(aircraft.mass_properties.values())
+        return cls(
+            [prop.name for prop in props],
+            [prop.mass for prop in props],
+            [[prop.x, prop.y, prop.z] for prop in props],
+            [[getattr(prop, column) for column in INERTIA_COLUMNS] for prop in props],
+        )
+
+    def index(self, name: str) -> int:
+        return self.names.index(name)
+
+    def loadings(self, variable: dict) -> np.ndarray:
+        """
+        Returns the full-factorial loading matrix for components whose mass varies.
+
+        Parameters:
+            variable (dict): {component name: masses to try}; other components keep
+                their nominal mass. The last component varies fastest.
+
+        Returns:
+            ndarray: (k, n) component masses.
+        """
+        names = list(variable)
+        combos = np.array(list(itertools.product(*(variable[name] for name in names))), dtype=float)
+        loadings = np.tile(self.masses, (len(combos), 1))
+        for j, name in enumerate(names):
+            loadings[:, self.index(name)] = combos[:, j]
+        return loadings
+
+    def evaluate(self, loadings=None) -> dict:
+        """
+        Computes total mass, CG and inertia about the CG for one or many loadings in one pass.
+
+        Parameters:
+            loadings (array): (n,) or (k, n) component masses; defaults to the nominal masses.
+
+        Returns:
+            dict: {"mass": (k,), "cg": (k, 3), "inertia": (k, 6) in INERTIA_COLUMNS order,
+                "tensor": (k, 3, 3)}. A single loading returns arrays without the k axis.
+        """
+        single = loadings is None or np.ndim(loadings) == 1
+        m = np.atleast_2d(self.masses if loadings is None else np.asarray(loadings, dtype=float))
+
+        total = m.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cg = np.einsum("kn,ni->ki", m, self.positions) / total[:, None]
+
+        # Own inertias scaled by each component's mass fraction of nominal
+        scale = np.divide(m, self.masses, out=np.zeros_like(m), where=self.masses != 0)
+        own = scale @ self.inertias
+
+        # Second moments about the origin, then shifted to the CG (parallel axis)
+        second = np.einsum("kn,ni,nj->kij", m, self.positions, self.positions)
+        second -= total[:, None, None] * np.einsum("ki,kj->kij", cg, cg)
+
+        diag = np.einsum("kii->k", second)
+        inertia = np.column_stack([
+            own[:, 0] + diag - second[:, 0, 0],
+            own[:, 1] + diag - second[:, 1, 1],
+            own[:, 2] + diag - second[:, 2, 2],
+            own[:, 3] + second[:, 0, 1],
+            own[:, 4] + second[:, 0, 2],
+            own[:, 5] + second[:, 1, 2],
+        ])
+
+        tensor = np.empty((len(m), 3, 3))
+        tensor[:, 0, 0], tensor[:, 1, 1], tensor[:, 2, 2] = inertia[:, 0], inertia[:, 1], inertia[:, 2]
+        tensor[:, 0, 1] = tensor[:, 1, 0] = -inertia[:, 3]
+        tensor[:, 0, 2] = tensor[:, 2, 0] = -inertia[:, 4]
+        tensor[:, 1, 2] = tensor[:, 2, 1] = -inertia[:, 5]
+
+        result = {"mass": total, "cg": cg, "inertia": inertia, "tensor": tensor}
+        if single:
+            result = {key: value[0] for key, value in result.items()}
+        return result
+
+
+def mass_summary(aircraft: Aircraft) -> str:
+    """
+    Returns a short text summary of the aircraft's total mass, CG and inertias.
+    """
+    if not aircraft.mass_properties:
+        return "No mass components"
+    totals = MassModel.from_aircraft(aircraft).evaluate()
+    x, y, z = totals["cg"]
+    ixx, iyy, izz, ixy, ixz, iyz = totals["inertia"]
+    return (
+        f"Mass: {totals['mass']:.4g}\n"
+        f"CG: ({x:.4g}, {y:.4g}, {z:.4g})\n"
+        f"Ixx/Iyy/Izz: {ixx:.4g} / {iyy:.4g} / {izz:.4g}\n"
+        f"Ixy/Ixz/Iyz: {ixy:.4g} / {ixz:.4g} / {iyz:.4g}"
+    )
@@ -0,0 +1,196 @@
+import numpy as np
+from models import Aircraft, SimulationCase
+from backend import compute_total_span, compute_surface_area
+from runner import run_case, AVL_EXECUTABLE_PATH
+
+# (Nchord, Nspan) pairs tried from coarsest to finest; the last level is the reference lattice
+CONVERGENCE_LEVELS = [(4, 8), (6, 12), (8, 16), (10, 22), (12, 28), (16, 36)]
+
+# AVL outputs that must settle before a lattice is accepted
+CONVERGENCE_KEYS = ("CLtot", "Cmtot", "CLa", "Cma")
+
+# Typical magnitude of each output. References smaller than this (e.g. Cm near trim)
+# are compared on an absolute basis, so a tolerance of 0.005 allows dCm = 2.5e-4.
+CONVERGENCE_SCALES = {
+    "CLtot": 0.1, "CDtot": 0.005, "CYtot": 0.01,
+    "Cltot": 0.01, "Cmtot": 0.05, "Cntot": 0.01,
+    "CLa": 1.0, "CYb": 0.1, "Cla": 0.01, "Cma": 0.1, "Clb": 0.01, "Cnb": 0.01, "Xnp": 0.01,
+}
+
+
+def mesh_error(values: dict, reference: dict, keys=CONVERGENCE_KEYS, scales: dict = None,
+               atol: float = 1e-3) -> float:
+    """
+    Returns the largest relative deviation of `values` from `reference` over `keys`.
+
+    Deviations are normalised by max(|reference|, scale), where the scale of a key comes
+    from `scales` (default CONVERGENCE_SCALES) or is `atol`, so that quantities close to
+    zero (e.g. Cm near trim) are compared on an absolute basis instead.
+    Missing keys count as non-converged (infinite error).
+    """
+    scales = CONVERGENCE_SCALES if scales is None else scales
+    worst = 0.0
+    for key in keys:
+        if key not in values or key not in reference:
+            return float("inf")
+        scale = max(abs(reference[key]), scales.get(key, atol))
+        worst = max(worst, abs(values[key] - reference[key]) / scale)
+    return worst
+
+
+def mesh_convergence_study(aircraft: Aircraft, sim_case: SimulationCase, results_dir: str,
+                           levels=CONVERGENCE_LEVELS, keys=CONVERGENCE_KEYS, tol: float = 0.005,
+                           jobname: str = "meshconv", avl_exe_path: str = AVL_EXECUTABLE_PATH) -> dict:
+    """
+    Finds the coarsest lattice per surface that reproduces the reference solution.
+
+    A reference run is made with every surface at the finest level. Each surface is then
+    refined from the coarsest level upwards while the others stay at the reference, and
+    the first level whose outputs are all within `tol` of the reference is recorded.
+
+    Parameters:
+        aircraft (Aircraft): Aircraft model to study.
+        sim_case (SimulationCase): Flight condition used for every run.
+        results_dir (str): Directory for the generated decks and results.
+        levels (list): (Nchord, Nspan) pairs in increasing density.
+        keys (tuple): AVL output names compared against the reference.
+        tol (float): Allowed relative deviation from the reference.
+        jobname (str): Prefix for the generated job names.
+        avl_exe_path (str): Path to the AVL executable.
+
+    Returns:
+        dict: {surface name: {"Nchord", "Nspan", "error", "converged"}}.
+    """
+    finest_chord, finest_span = levels[-1]
+    reference_mesh = {
+        name: (finest_chord, float(surface.cspace), finest_span, float(surface.sspace))
+        for name, surface in aircraft.geometry.items()
+    }
+
+    reference = run_case(f"{jobname}_ref", aircraft, sim_case, results_dir, reference_mesh, avl_exe_path)
+    if not reference:
+        raise RuntimeError("Reference lattice run produced no AVL output.")
+
+    study = {}
+    for name, surface in aircraft.geometry.items():
+        study[name] = {"Nchord": finest_chord, "Nspan": finest_span, "error": 0.0, "converged": False}
+
+        for i, (nchord, nspan) in enumerate(levels[:-1]):
+            trial_mesh = dict(reference_mesh)
+            trial_mesh[name] = (nchord, float(surface.cspace), nspan, float(surface.sspace))
+            values = run_case(f"{jobname}_{name}_{i}", aircraft, sim_case, results_dir, trial_mesh, avl_exe_path)
+
+            error = mesh_error(values, reference, keys)
+            print(f"Mesh study {name}: {nchord}x{nspan} error = {error:.4g}")
+            if error <= tol:
+                study[name] = {"Nchord": nchord, "Nspan": nspan, "error": error, "converged": True}
+                break
+
+    return study
+
+
+def apply_mesh_study(aircraft: Aircraft, study: dict):
+    """
+    Stores the lattice chosen by `mesh_convergence_study` on each surface so that
+    subsequent decks are written with it.
+    """
+    for name, result in study.items():
+        surface = aircraft.geometry.get(name)
+        if surface is None:
+            continue
+        surface.nchord = int(result["Nchord"])
+        surface.nspan = int(result["Nspan"])
+
+
+# Array limits of a stock AVL 3.35 build (NVMAX / NSMAX in AVL.INC)
+AVL_MAX_VORTICES = 6000
+AVL_MAX_STRIPS = 400
+
+
+def allocate_panels(aircraft: Aircraft, budget: int = 2000, panel_aspect: float = 2.0,
+                    min_chord: int = 4, min_span: int = 6, duplicated: bool = True) -> dict:
+    """
+    Distributes a global vortex budget across surfaces in proportion to their area.
+
+    Each surface's share is split into chordwise and spanwise counts so that panels
+    have roughly `panel_aspect` spanwise width per chordwise length. Chordwise spacing
+    is cosine; spanwise spacing is -sine (bunched at the tip) for plain surfaces and
+    cosine for surfaces carrying controls, so hinge breaks at both ends stay resolved.
+
+    Parameters:
+        aircraft (Aircraft): Aircraft whose surfaces are meshed.
+        budget (int): Total number of vortices, counting YDUPLICATE images.
+        panel_aspect (float): Target spanwise/chordwise panel dimension ratio.
+        min_chord (int): Lower bound on Nchord per surface.
+        min_span (int): Lower bound on Nspan per surface.
+        duplicated (bool): Whether surfaces are mirrored with YDUPLICATE.
+
+    Returns:
+        dict: {surface name: (Nchord, Cspace, Nspan, Sspace)}, usable as a `mesh` override.
+    """
+    factor = 2 if duplicated else 1
+    budget = min(int(budget), AVL_MAX_VORTICES)
+
+    planforms = {}
+    for name, surface in aircraft.geometry.items():
+        span = compute_total_span(surface)
+        area = compute_surface_area(surface)
+        if span > 0 and area > 0:
+            planforms[name] = (area, span, bool(surface.control_surfaces))
+
+    total_area = sum(area for area, _, _ in planforms.values())
+    if total_area <= 0:
+        return {}
+
+    counts = {}
+    for name, (area, span, _) in planforms.items():
+        share = budget / factor * area / total_area
+        mean_chord = area / span
+        nspan = np.sqrt(share * span / (panel_aspect * mean_chord))
+        nchord = share / nspan
+        counts[name] = [max(min_chord, int(round(nchord))), max(min_span, int(round(nspan)))]
+
+    # Rounding and lower bounds can overshoot; trim the densest surfaces until both limits hold
+    def total_vortices():
+        return factor * sum(nc * ns for nc, ns in counts.values())
+
+    def total_strips():
+        return factor * sum(ns for _, ns in counts.values())
+
+    def reduction(name):
+        """Index of the count to trim on a surface (0: Nchord, 1: Nspan), or None at the lower bounds."""
+        nchord, nspan = counts[name]
+        can_chord, can_span = nchord > min_chord, nspan > min_span
+        if total_strips() > AVL_MAX_STRIPS:
+            return 1 if can_span else None
+        if can_span and (nspan / panel_aspect >= nchord or not can_chord):
+            return 1
+        return 0 if can_chord else None
+
+    while total_vortices() > budget or total_strips() > AVL_MAX_STRIPS:
+        candidates = [name for name in counts if reduction(name) is not None]
+        if not candidates:
+            print(f"Warning: The lower bounds (Nchord >= {min_chord}, Nspan >= {min_span}) leave "
+                  f"{total_vortices()} vortices and {total_strips()} strips, above the budget of "
+                  f"{budget} vortices or AVL's {AVL_MAX_STRIPS} strips.")
+            break
+        name = max(candidates, key=lambda n: counts[n][0] * counts[n][1])
+        counts[name][reduction(name)] -= 1
+
+    mesh = {}
+    for name, (nchord, nspan) in counts.items():
+        sspace = 1.0 if planforms[name][2] else -2.0
+        mesh[name] = (nchord, 1.0, nspan, sspace)
+    return mesh
+
+
+def apply_mesh(aircraft: Aircraft, mesh: dict):
+    """
+    Stores a {surface name: (Nchord, Cspace, Nspan, Sspace)} lattice on the aircraft's surfaces.
+    """
+    for name, (nchord, cspace, nspan, sspace) in mesh.items():
+        surface = aircraft.geometry.get(name)
+        if surface is None:
+            continue
+        surface.nchord, surface.cspace = int(nchord), float(cspace)
+        surface.nspan, surface.sspace = int(nspan), float(sspace)
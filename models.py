@@ -10,6 +10,12 @@ class GeometrySurface:
         self.twist = 0.0
         self.naca_airfoil = ""
 
+        # Vortex lattice density written on the SURFACE line
+        self.nchord = 10
+        self.cspace = 1.0
+        self.nspan = 22
+        self.sspace = 1.0
+
         self.sections = []  # List of dicts with fields like AR, Span, Taper, etc.
         self.control_surfaces = []  # List of dicts with type and positions
 
@@ -31,7 +37,11 @@ class SimulationCase:
     def __init__(self, name, Mach=0.0, rho=0.0, Cdo=0.0,
                  aoa_mode="Angle", aoa_val=0.0,
                  elevator_mode=None, elevator_val=None,
-                 flap_mode=None, flap_val=None):
+                 flap_mode=None, flap_val=None,
+                 beta=0.0, pb2V=0.0, qc2V=0.0, rb2V=0.0,
+                 aileron_mode=None, aileron_val=None,
+                 rudder_mode=None, rudder_val=None,
+                 velocity=None):
         self.name = name
         self.Mach = Mach
         self.rho = rho
@@ -46,6 +56,19 @@ class SimulationCase:
         self.flap_mode = flap_mode    # "Deflection", or None
         self.flap_val = flap_val      # float or None
 
+        self.beta = beta              # sideslip [deg]
+        self.pb2V = pb2V              # non-dimensional roll rate
+        self.qc2V = qc2V              # non-dimensional pitch rate
+        self.rb2V = rb2V              # non-dimensional yaw rate
+
+        self.aileron_mode = aileron_mode  # "Deflection" or "Cl", or None
+        self.aileron_val = aileron_val    # float or None
+
+        self.rudder_mode = rudder_mode    # "Deflection" or "Cn", or None
+        self.rudder_val = rudder_val      # float or None
+
+        self.velocity = velocity          # flight speed for eigenmode analysis, or None
+
 
 class Aircraft:
     def __init__(self, units = "MKS", g=0, Sref=0, Cref=0, Bref=0):
@@ -57,6 +80,22 @@ class Aircraft:
         self.Cref = Cref
         self.Bref = Bref
         self.session_jobs = set()
+        self.configurations = {}  # {name: Configuration} deltas over this aircraft
+
+
+class Configuration:
+    """
+    A named variant of an aircraft stored as changes to it; everything not listed
+    is taken from the base aircraft, see configurations.build_configuration.
+    """
+    def __init__(self, name, parameters=None, surfaces=None, mass_changes=None, mass_properties=None,
+                 settings=None):
+        self.name = name
+        self.parameters = parameters or {}            # {"wing.twist" / "wing[0].Span": value}
+        self.surfaces = surfaces or {}                # {name: GeometrySurface to add/replace, or None to remove}
+        self.mass_changes = mass_changes or {}        # {component name: {field: value}}
+        self.mass_properties = mass_properties or {}  # {name: MassProperty to add/replace, or None to remove}
+        self.settings = settings or {}                # {"Sref"/"Cref"/"Bref"/"units": value}
 
 # Global aircraft instance
 aircraft = Aircraft()
@@ -0,0 +1,120 @@
+import os
+import numpy as np
+from output_parser import SYSTEM_STATES
+
+# State indices of the decoupled dynamic blocks of the AVL system matrix
+LONGITUDINAL_STATES = ("u", "w", "q", "the")
+LATERAL_STATES = ("v", "p", "r", "phi")
+
+MODE_NAMES = ("short_period", "phugoid", "dutch_roll", "roll", "spiral")
+
+
+def _block(A: np.ndarray, states: tuple) -> np.ndarray:
+    index = [SYSTEM_STATES.index(state) for state in states]
+    return A[np.ix_(index, index)]
+
+
+def eigen_decomposition(A: np.ndarray):
+    """
+    Returns (eigenvalues, eigenvectors) of the full system matrix; the columns of the
+    eigenvector array are the mode shapes over SYSTEM_STATES.
+    """
+    return np.linalg.eig(A)
+
+
+def _mode_entry(eigenvalue: complex, eigenvector: np.ndarray, states: tuple) -> dict:
+    """
+    Returns the eigenvalue, its mode shape over the 12 states and its characteristics.
+    """
+    shape = np.zeros(len(SYSTEM_STATES), dtype=complex)
+    shape[[SYSTEM_STATES.index(state) for state in states]] = eigenvector
+    largest = shape[np.argmax(np.abs(shape))]
+    if largest != 0:
+        shape = shape / largest
+
+    wn = abs(eigenvalue)
+    entry = {
+        "eigenvalue": complex(eigenvalue),
+        "eigenvector": shape,
+        "wn": wn,
+        "zeta": -eigenvalue.real / wn if wn > 0 else np.nan,
+        "period": 2.0 * np.pi / abs(eigenvalue.imag) if eigenvalue.imag != 0 else np.inf,
+    }
+    # Time to halve (stable) or double (unstable) the amplitude
+    entry["time_to_half"] = np.log(2.0) / -eigenvalue.real if eigenvalue.real < 0 else np.inf
+    entry["time_to_double"] = np.log(2.0) / eigenvalue.real if eigenvalue.real > 0 else np.inf
+    return entry
+
+
+def classify_modes(A: np.ndarray) -> dict:
+    """
+    Identifies the classical rigid-body modes from the longitudinal (u, w, q, theta)
+    and lateral (v, p, r, phi) blocks of an AVL system matrix.
+
+    Longitudinal: the faster root pair is the short period, the slower one the phugoid.
+    Lateral: the oscillatory pair is the Dutch roll; of the real roots the fastest is
+    the roll subsidence and the slowest the spiral. For each oscillatory mode the root
+    with positive imaginary part is reported.
+
+    Returns:
+        dict: {mode name: {"eigenvalue", "eigenvector" (12,), "wn", "zeta", "period",
+            "time_to_half", "time_to_double"}} for the modes that could be identified.
+    """
+    modes = {}
+
+    values, vectors = np.linalg.eig(_block(A, LONGITUDINAL_STATES))
+    order = [i for i in np.argsort(-np.abs(values)) if values[i].imag >= 0]
+    if len(order) >= 2:
+        modes["short_period"] = _mode_entry(values[order[0]], vectors[:, order[0]], LONGITUDINAL_STATES)
+        modes["phugoid"] = _mode_entry(values[order[-1]], vectors[:, order[-1]], LONGITUDINAL_STATES)
+
+    values, vectors = np.linalg.eig(_block(A, LATERAL_STATES))
+    oscillatory = [i for i in range(len(values)) if values[i].imag > 1e-9]
+    real = sorted((i for i in range(len(values)) if abs(values[i].imag) <= 1e-9), key=lambda i: -abs(values[i]))
+    if oscillatory:
+        modes["dutch_roll"] = _mode_entry(values[oscillatory[0]], vectors[:, oscillatory[0]], LATERAL_STATES)
+    if len(real) >= 2:
+        modes["roll"] = _mode_entry(values[real[0]], vectors[:, real[0]], LATERAL_STATES)
+        modes["spiral"] = _mode_entry(values[real[-1]], vectors[:, real[-1]], LATERAL_STATES)
+
+    return modes
+
+
+def load_modes(results_dir: str, jobname: str) -> dict:
+    """
+    Loads a job's eigenmode data written by `runner.run_avl` with `eigenmodes=True`.
+
+    Returns:
+        dict: {"A", "B", "controls", "eigenvalues" (AVL), "eigenvectors"} or {} if missing.
+    """
+    path = os.path.join(results_dir, f"{jobname}_modes.npz")
+    if not os.path.exists(path):
+        print(f"[ERROR] Eigenmode file not found: {path}")
+        return {}
+    with np.load(path) as data:
+        return {key: data[key] for key in data.files}
+
+
+def root_locus(results_dir: str, jobnames, parameter=None) -> dict:
+    """
+    Stacks the classified mode roots of many jobs, e.g. a batch swept over speed or CG.
+
+    Parameters:
+        results_dir (str): Directory where all result files are located.
+        jobnames (list): Jobs in sweep order.
+        parameter (array): Optional swept value per job, returned unchanged.
+
+    Returns:
+        dict: {"parameter": (n,), mode name: complex (n,) roots}; NaN where a mode
+            was not identified or a job has no eigenmode data.
+    """
+    jobnames = list(jobnames)
+    locus = {name: np.full(len(jobnames), np.nan, dtype=complex) for name in MODE_NAMES}
+    for k, jobname in enumerate(jobnames):
+        data = load_modes(results_dir, jobname)
+        if "A" not in data or data["A"].size == 0:
+            continue
+        for name, mode in classify_modes(data["A"]).items():
+            locus[name][k] = mode["eigenvalue"]
+    locus["parameter"] = np.arange(len(jobnames)) if parameter is None else np.asarray(parameter)
+    return locus
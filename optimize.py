@@ -0,0 +1,273 @@
+import os
+import csv
+import json
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from models import Aircraft
+from batch import run_batch
+from doe import apply_parameters
+
+
+class Optimizer:
+    """
+    Minimizes an objective over GeometryParameter values by running PAVL batches.
+
+    Parameters are optimized in normalized [0, 1] coordinates of their [lo, hi] ranges.
+    Constraints are "g <= 0" functions added to the objective as a quadratic penalty.
+    Every set of independent candidates (initial simplex, speculative Nelder-Mead
+    moves, finite-difference stencils, line-search steps) is evaluated concurrently
+    through `batch.run_batch`; identical candidates are never run twice.
+
+    With `checkpoint`, the optimizer state and every evaluation are saved to JSON after
+    each iteration and a rerun resumes from it. With `log`, one CSV row per iteration
+    records the best objective, penalty, constraint values and parameters.
+    """
+
+    def __init__(self, aircraft: Aircraft, parameters, cases, objective, constraints: dict = None,
+                 results_dir: str = "results", penalty: float = 1e3, workers: int = 4,
+                 checkpoint: str = None, log: str = None, prefix: str = "opt", **batch_options):
+        """
+        Parameters:
+            aircraft (Aircraft): Base aircraft.
+            parameters (list): doe.GeometryParameter objects to optimize.
+            cases (list): SimulationCase objects run for every candidate.
+            objective (callable): f(results) -> float, where results is {case name: parsed values}.
+            constraints (dict): {name: g(results) -> float}, satisfied when g <= 0.
+            results_dir (str): Directory for the generated decks and results.
+            penalty (float): Weight of the squared constraint violations.
+            workers (int): Number of candidates run at the same time.
+            checkpoint (str): JSON file for saving and resuming the optimizer state.
+            log (str): CSV file receiving one row per iteration.
+            prefix (str): Prefix of the job names.
+            **batch_options: Passed to `batch.run_batch` (solver, avl_exe_path, cache, ...).
+        """
+        self.aircraft = aircraft
+        self.parameters = list(parameters)
+        self.cases = list(cases)
+        self.objective = objective
+        self.constraints = dict(constraints or {})
+        self.results_dir = results_dir
+        self.penalty = penalty
+        self.workers = max(1, workers)
+        self.checkpoint = checkpoint
+        self.log = log
+        self.prefix = prefix
+        self.batch_options = batch_options
+
+        self.lo = np.array([p.lo for p in self.parameters])
+        self.hi = np.array([p.hi for p in self.parameters])
+        self.evaluations = {}
+        self.runs = 0
+        self.iteration = 0
+        self.state = {}
+
+    # ---- evaluation ----
+
+    def to_parameters(self, z) -> np.ndarray:
+        return self.lo + np.clip(z, 0.0, 1.0) * (self.hi - self.lo)
+
+    def _key(self, z) -> tuple:
+        return tuple(np.round(np.clip(z, 0.0, 1.0), 12))
+
+    def _run(self, z, jobprefix) -> dict:
+        variant = apply_parameters(self.aircraft, self.parameters, self.to_parameters(z))
+        results = run_batch(variant, self.cases, self.results_dir, prefix=jobprefix, **self.batch_options)
+        try:
+            objective = float(self.objective(results))
+            constraints = {name: float(g(results)) for name, g in self.constraints.items()}
+        except (KeyError, ValueError, ZeroDivisionError) as e:
+            print(f"Warning: Candidate {jobprefix} has no usable results: {e}")
+            return {"f": float("inf"), "objective": float("nan"), "constraints": {}}
+        violation = sum(max(0.0, g) ** 2 for g in constraints.values())
+        return {"f": objective + self.penalty * violation, "objective": objective, "constraints": constraints}
+
+    def evaluate(self, points) -> np.ndarray:
+        """
+        Returns the penalized objective of each normalized point, running new ones concurrently.
+        """
+        points = [np.clip(np.asarray(z, dtype=float), 0.0, 1.0) for z in points]
+        pending = {}
+        for z in points:
+            key = self._key(z)
+            if key not in self.evaluations and key not in pending:
+                self.runs += 1
+                pending[key] = (z, f"{self.prefix}{self.runs}")
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                outcomes = pool.map(lambda item: self._run(*item), pending.values())
+                for key, outcome in zip(pending, outcomes):
+                    self.evaluations[key] = outcome
+
+        return np.array([self.evaluations[self._key(z)]["f"] for z in points])
+
+    def best(self) -> dict:
+        """
+        Returns the best evaluation so far: {"x" (parameter values), "f", "objective", "constraints"}.
+        """
+        key = min(self.evaluations, key=lambda k: self.evaluations[k]["f"])
+        return {"x": self.to_parameters(np.array(key)), **self.evaluations[key]}
+
+    # ---- checkpointing and logging ----
+
+    def _save(self, method: str):
+        if self.log:
+            best = self.best()
+            new = not os.path.exists(self.log)
+            with open(self.log, "a", newline="") as f:
+                writer = csv.writer(f)
+                if new:
+                    writer.writerow(["iteration", "runs", "f", "objective"] + list(self.constraints)
+                                    + [p.name for p in self.parameters])
+                writer.writerow([self.iteration, self.runs, best["f"], best["objective"]]
+                                + [best["constraints"].get(name, float("nan")) for name in self.constraints]
+                                + list(best["x"]))
+        if self.checkpoint:
+            data = {
+                "method": method,
+                "iteration": self.iteration,
+                "runs": self.runs,
+                "state": {key: np.asarray(value).tolist() for key, value in self.state.items()},
+                "evaluations": [[list(key), value] for key, value in self.evaluations.items()],
+            }
+            with open(self.checkpoint, "w") as f:
+                json.dump(data, f)
+
+    def _resume(self, method: str) -> bool:
+        if not self.checkpoint or not os.path.exists(self.checkpoint):
+            return False
+        with open(self.checkpoint, "r") as f:
+            data = json.load(f)
+        for key, value in data["evaluations"]:
+            self.evaluations[tuple(key)] = value
+        self.runs = data["runs"]
+        if data["method"] != method:
+            print(f"Warning: Checkpoint is from {data['method']}; reusing its evaluations only.")
+            return False
+        self.iteration = data["iteration"]
+        self.state = {key: np.array(value) for key, value in data["state"].items()}
+        print(f"Resuming {method} from iteration {self.iteration}.")
+        return True
+
+    def _start(self, x0):
+        if x0 is None:
+            return np.full(len(self.parameters), 0.5)
+        return (np.asarray(x0, dtype=float) - self.lo) / (self.hi - self.lo)
+
+    # ---- strategies ----
+
+    def nelder_mead(self, x0=None, max_iter: int = 100, tol: float = 1e-4, step: float = 0.1) -> dict:
+        """
+        Nelder-Mead simplex search. Each iteration evaluates the reflection, expansion
+        and both contractions together, so an iteration costs one parallel round.
+
+        Parameters:
+            x0 (array): Starting parameter values; defaults to the middle of the ranges.
+            max_iter (int): Maximum number of iterations.
+            tol (float): Stop when the spread of simplex values falls below this.
+            step (float): Initial simplex size as a fraction of each range.
+
+        Returns:
+            dict: Best evaluation, see `best`.
+        """
+        if not self._resume("nelder_mead"):
+            start = self._start(x0)
+            simplex = np.vstack([start] + [start + step * np.eye(len(start))[i] for i in range(len(start))])
+            simplex = np.clip(simplex, 0.0, 1.0)
+            self.state = {"simplex": simplex, "values": self.evaluate(simplex)}
+
+        while self.iteration < max_iter:
+            simplex, values = self.state["simplex"], self.state["values"]
+            order = np.argsort(values)
+            simplex, values = simplex[order], values[order]
+            if np.isfinite(values[-1]) and values[-1] - values[0] < tol:
+                break
+
+            centroid = simplex[:-1].mean(axis=0)
+            worst = simplex[-1]
+            moves = np.clip(np.array([
+                centroid + (centroid - worst),          # reflection
+                centroid + 2.0 * (centroid - worst),    # expansion
+                centroid + 0.5 * (centroid - worst),    # outside contraction
+                centroid - 0.5 * (centroid - worst),    # inside contraction
+            ]), 0.0, 1.0)
+            fr, fe, foc, fic = self.evaluate(moves)
+
+            if fr < values[0]:
+                replacement = (moves[1], fe) if fe < fr else (moves[0], fr)
+            elif fr < values[-2]:
+                replacement = (moves[0], fr)
+            elif fr < values[-1] and foc <= fr:
+                replacement = (moves[2], foc)
+            elif fic < values[-1]:
+                replacement = (moves[3], fic)
+            else:
+                replacement = None
+
+            if replacement is None:
+                simplex = simplex[0] + 0.5 * (simplex - simplex[0])
+                values = np.concatenate([[values[0]], self.evaluate(simplex[1:])])
+            else:
+                simplex[-1], values[-1] = replacement
+
+            self.state = {"simplex": simplex, "values": values}
+            self.iteration += 1
+            self._save("nelder_mead")
+
+        return self.best()
+
+    def gradient(self, x0=None, max_iter: int = 50, tol: float = 1e-6, fd_step: float = 1e-3,
+                 steps=(1.0, 0.5, 0.25, 0.1)) -> dict:
+        """
+        Quasi-Newton (BFGS) descent with forward-difference gradients. The gradient
+        stencil and the trial steps of the line search are each evaluated as one
+        parallel round.
+
+        Parameters:
+            x0 (array): Starting parameter values; defaults to the middle of the ranges.
+            max_iter (int): Maximum number of iterations.
+            tol (float): Stop when the gradient norm or the improvement falls below this.
+            fd_step (float): Finite-difference step as a fraction of each range.
+            steps (tuple): Trial step lengths along the search direction.
+
+        Returns:
+            dict: Best evaluation, see `best`.
+        """
+        n = len(self.parameters)
+
+        def gradient_at(z, f):
+            # Step backwards at the upper bound so every stencil point stays in range
+            h = np.where(z + fd_step > 1.0, -fd_step, fd_step)
+            stencil = z + np.diag(h)
+            return (self.evaluate(stencil) - f) / h
+
+        if not self._resume("gradient"):
+            z = self._start(x0)
+            f = self.evaluate([z])[0]
+            self.state = {"z": z, "f": f, "grad": gradient_at(z, f), "H": np.eye(n)}
+
+        while self.iteration < max_iter:
+            z, f, grad, H = self.state["z"], float(self.state["f"]), self.state["grad"], self.state["H"]
+            if not np.isfinite(f) or np.linalg.norm(grad) < tol:
+                break
+
+            direction = -H @ grad
+            trials = np.clip(z + np.outer(steps, direction), 0.0, 1.0)
+            values = self.evaluate(trials)
+            best = int(np.argmin(values))
+            if values[best] >= f - tol:
+                break
+
+            z_new, f_new = trials[best], values[best]
+            grad_new = gradient_at(z_new, f_new)
+            s, y = z_new - z, grad_new - grad
+            if s @ y > 1e-12:
+                rho = 1.0 / (s @ y)
+                I = np.eye(n)
+                H = (I - rho * np.outer(s, y)) @ H @ (I - rho * np.outer(y, s)) + rho * np.outer(s, s)
+
+            self.state = {"z": z_new, "f": f_new, "grad": grad_new, "H": H}
+            self.iteration += 1
+            self._save("gradient")
+
+        return self.best()
@@ -0,0 +1,287 @@
+import os
+import re
+import numpy as np
+
+# Matches AVL "name = value" pairs, e.g. "CLtot =   0.51234" or "Cma = -1.2E+00"
+VALUE_PATTERN = re.compile(r"([A-Za-z][\w'/^.]*)\s*=\s*(-?\d+\.?\d*(?:[Ee][-+]?\d+)?)")
+
+
+def parse_avl_values(text: str) -> dict:
+    """
+    Extracts every "name = value" pair from AVL text output.
+
+    Parameters:
+        text (str): Contents of an AVL force or stability output.
+
+    Returns:
+        dict: Mapping of AVL variable name (e.g. "CLtot", "Cma", "Xnp") to float.
+    """
+    values = {}
+    for line in text.splitlines():
+        start = 0
+        for match in VALUE_PATTERN.finditer(line):
+            # A "/" before the label means it ends a ratio expression, such as the spiral
+            # stability line "Clb Cnr / Clr Cnb  =  0.58", not a variable of its own
+            if "/" in line[start:match.start()]:
+                start = match.end()
+                continue
+            start = match.end()
+            try:
+                values[match.group(1)] = float(match.group(2))
+            except ValueError:
+                continue
+    return values
+
+
+# Column header of the control derivative block in AVL stability output, e.g. "Elevator     d01"
+CONTROL_INDEX_PATTERN = re.compile(r"(\S+)\s+d(\d{2})\b")
+CONTROL_DERIVATIVE_PATTERN = re.compile(r"^(CL|CY|Cl|Cm|Cn|CDff|e)d(\d{2})$")
+
+
+def parse_control_indices(text: str) -> dict:
+    """
+    Maps AVL control indices ("01", "02", ...) to control names using the
+    column headers of the stability derivative output.
+    """
+    indices = {}
+    for line in text.splitlines():
+        if "=" in line:
+            continue
+        for name, index in CONTROL_INDEX_PATTERN.findall(line):
+            indices[index] = name
+    return indices
+
+
+def parse_hinge_moments(text: str) -> dict:
+    """
+    Parses AVL hinge moment output ("hm") into {control name: Chinge}.
+    """
+    moments = {}
+    in_table = False
+    for line in text.splitlines():
+        if "Chinge" in line:
+            in_table = True
+            continue
+        if not in_table:
+            continue
+        tokens = line.split()
+        if not tokens or set(line.strip()) <= {"-"}:
+            continue
+        try:
+            moments[" ".join(tokens[:-1])] = float(tokens[-1])
+        except ValueError:
+            in_table = False
+    return moments
+
+
+def parse_sim_file(filepath: str) -> dict:
+    """
+    Reads a merged `.sim` result file written by `runner.run_avl`.
+
+    Besides the raw AVL names, control quantities are added under control-name keys:
+    `Chinge_<control>` for hinge moments and `<coef>d_<control>` (e.g. "Cmd_Elevator")
+    for control derivatives.
+
+    Parameters:
+        filepath (str): Path to the `.sim` file.
+
+    Returns:
+        dict: Mapping of AVL variable name to float. Empty if the file is missing.
+    """
+    try:
+        with open(filepath, "r") as f:
+            text = f.read()
+    except OSError as e:
+        print(f"[ERROR] Could not read result file {filepath}: {e}")
+        return {}
+
+    return parse_sim_text(text)
+
+
+def parse_sim_text(text: str) -> dict:
+    """
+    Parses the contents of a `.sim` file, see `parse_sim_file`.
+    """
+    values = parse_avl_values(text)
+
+    indices = parse_control_indices(text)
+    for key in list(values):
+        match = CONTROL_DERIVATIVE_PATTERN.match(key)
+        if match and match.group(2) in indices:
+            values[f"{match.group(1)}d_{indices[match.group(2)]}"] = values[key]
+
+    for name, moment in parse_hinge_moments(text).items():
+        values[f"Chinge_{name}"] = moment
+
+    return values
+
+
+# Columns of AVL's strip force listing ("fs"), in file order
+STRIP_COLUMNS = ("Xle", "Yle", "Zle", "Chord", "Area", "c_cl", "ai", "cl_norm",
+                 "cl", "cd", "cdv", "cm_c4", "cm_LE", "cp_xc")
+STRIP_DTYPE = np.dtype([("surface", np.int32), ("strip", np.int32)] +
+                       [(name, np.float32) for name in STRIP_COLUMNS])
+
+# Columns of AVL's element force listing ("fe"), in file order
+ELEMENT_COLUMNS = ("X", "Y", "Z", "DX", "Slope", "dCp")
+ELEMENT_DTYPE = np.dtype([("surface", np.int32), ("strip", np.int32), ("element", np.int32)] +
+                         [(name, np.float32) for name in ELEMENT_COLUMNS])
+
+SURFACE_PATTERN = re.compile(r"Surface\s*#\s*(\d+)")
+STRIP_PATTERN = re.compile(r"Strip\s*#\s*(\d+)")
+
+
+def _numeric_row(line: str):
+    """
+    Returns the line's tokens as floats, or None if any token is not a number.
+    """
+    tokens = line.split()
+    if not tokens:
+        return None
+    try:
+        return [float(t) for t in tokens]
+    except ValueError:
+        return None
+
+
+def _force_row(line: str):
+    """
+    Like `_numeric_row`, but fields AVL overflowed with "*" become NaN. An overflowed
+    field can run into its neighbour ("0.1234*******"), so such tokens are split.
+    """
+    tokens = []
+    for token in line.split():
+        tokens.extend(re.findall(r"\*+|[^*]+", token) if "*" in token else [token])
+    if not tokens or "*" in tokens[0]:
+        return None
+    try:
+        return [np.nan if "*" in t else float(t) for t in tokens]
+    except ValueError:
+        return None
+
+
+def parse_strip_forces(text: str) -> np.ndarray:
+    """
+    Parses AVL strip force output ("fs") into a structured array.
+
+    Parameters:
+        text (str): Contents of the strip force file.
+
+    Returns:
+        np.ndarray: One record per strip with fields `surface`, `strip` and STRIP_COLUMNS;
+        fields AVL printed as "***" are NaN.
+    """
+    rows = []
+    surface = 0
+    for line in text.splitlines():
+        match = SURFACE_PATTERN.search(line)
+        if match:
+            surface = int(match.group(1))
+            continue
+
+        values = _force_row(line)
+        if values is None or len(values) < len(STRIP_COLUMNS):
+            continue
+        # C.P.x/c is left blank by AVL for unloaded strips
+        data = values[1:1 + len(STRIP_COLUMNS)]
+        data += [np.nan] * (len(STRIP_COLUMNS) - len(data))
+        rows.append((surface, int(values[0]), *data))
+
+    return np.array(rows, dtype=STRIP_DTYPE)
+
+
+def parse_element_forces(text: str) -> np.ndarray:
+    """
+    Parses AVL element (vortex) force output ("fe") into a structured array.
+
+    Parameters:
+        text (str): Contents of the element force file.
+
+    Returns:
+        np.ndarray: One record per vortex with fields `surface`, `strip`, `element` and ELEMENT_COLUMNS;
+        fields AVL printed as "***" are NaN.
+    """
+    rows = []
+    surface = strip = 0
+    for line in text.splitlines():
+        match = SURFACE_PATTERN.search(line)
+        if match:
+            surface = int(match.group(1))
+        match = STRIP_PATTERN.search(line)
+        if match:
+            strip = int(match.group(1))
+            continue
+
+        values = _force_row(line)
+        if values is None or len(values) != len(ELEMENT_COLUMNS) + 1:
+            continue
+        rows.append((surface, strip, int(values[0]), *values[1:]))
+
+    return np.array(rows, dtype=ELEMENT_DTYPE)
+
+
+def load_force_array(results_dir: str, jobname: str, kind: str = "strips", mmap: bool = True) -> np.ndarray:
+    """
+    Loads a job's strip or element force array written by `runner.run_avl`.
+
+    Parameters:
+        results_dir (str): Directory where all result files are located.
+        jobname (str): Name of the job.
+        kind (str): "strips" or "elements".
+        mmap (bool): Memory-map the file instead of reading it into memory.
+
+    Returns:
+        np.ndarray: Structured array (see STRIP_DTYPE / ELEMENT_DTYPE).
+    """
+    path = os.path.join(results_dir, f"{jobname}_{kind}.npy")
+    return np.load(path, mmap_mode="r" if mmap else None)
+
+
+# State order of AVL's system matrix output (MODE menu, "s")
+SYSTEM_STATES = ("u", "w", "q", "the", "v", "p", "r", "phi", "x", "y", "z", "psi")
+
+
+def parse_system_matrix(text: str):
+    """
+    Parses AVL's linearized system matrix output into (A, B, control names).
+
+    Each row lists the 12 state columns (SYSTEM_STATES), then "|" and one column per control.
+
+    Returns:
+        tuple: A (12, 12) array, B (12, n_controls) array, list of control names.
+    """
+    n = len(SYSTEM_STATES)
+    controls, rows = [], []
+    for line in text.splitlines():
+        left, _, right = line.partition("|")
+        values = _numeric_row(left)
+        if values is None:
+            if left.split()[:1] == [SYSTEM_STATES[0]]:
+                controls = right.split()
+            continue
+        if len(values) != n:
+            continue
+        rows.append(values + (_numeric_row(right) or []))
+
+    if len(rows) < n:
+        return np.empty((0, 0)), np.empty((0, 0)), controls
+
+    matrix = np.array([row[:n + len(controls)] for row in rows[-n:]], dtype=float)
+    return matrix[:, :n], matrix[:, n:], controls
+
+
+def parse_eigenvalues(text: str) -> np.ndarray:
+    """
+    Parses AVL's eigenvalue file (MODE menu, "w"), whose rows are "run  real  imag".
+
+    Returns:
+        np.ndarray: Complex eigenvalues in file order.
+    """
+    eigenvalues = []
+    for line in text.splitlines():
+        if line.lstrip().startswith("#"):
+            continue
+        values = _numeric_row(line)
+        if values is not None and len(values) == 3:
+            eigenvalues.append(complex(values[1], values[2]))
+    return np.array(eigenvalues, dtype=complex)
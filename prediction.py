@@ -0,0 +1,226 @@
+import numpy as np
+from models import Aircraft, SimulationCase
+from batch import run_batch, deck_key
+from hinges import get_control_types
+from vlm import TRIM_CONSTRAINTS
+
+# Body rates as (SimulationCase attribute, AVL output name, AVL derivative suffix)
+RATE_VARIABLES = (("pb2V", "pb/2V", "p"), ("qc2V", "qc/2V", "q"), ("rb2V", "rb/2V", "r"))
+
+# Coefficients extrapolated from the stored derivatives, as (coefficient, AVL total name)
+PREDICTED_COEFFICIENTS = (("CL", "CLtot"), ("CY", "CYtot"), ("Cl", "Cltot"), ("Cm", "Cmtot"), ("Cn", "Cntot"))
+
+# Size of one unit of distance per variable kind: angles and deflections in degrees, rates non-dimensional
+DISTANCE_SCALES = {"angle": 1.0, "rate": 0.01, "control": 1.0}
+
+
+class DerivativeCache:
+    """
+    Answers cases from the nearest solved case by first-order Taylor extrapolation
+    with the stability and control derivatives AVL reports for that case.
+
+    A case is only extrapolated from cached results with the same Mach, Cdo and rho
+    (the same deck), and only if its state lies within `trust_radius` of the anchor.
+    Distance is measured in degrees of alpha, beta and control deflection, with 0.01
+    of a non-dimensional rate counting as one degree. Cases outside the radius are
+    run for real and added to the cache.
+
+    The cache belongs to one geometry; call `clear()` after editing the aircraft.
+    """
+
+    def __init__(self, aircraft: Aircraft, results_dir: str, trust_radius: float = 2.0,
+                 prefix: str = "predict", **run_options):
+        """
+        Parameters:
+            aircraft (Aircraft): Aircraft the cached results belong to.
+            results_dir (str): Directory for the decks of real runs.
+            trust_radius (float): Largest distance answered by extrapolation.
+            prefix (str): Prefix of the job names of real runs.
+            **run_options: Passed to `batch.run_batch` (solver, avl_exe_path, ...).
+        """
+        self.aircraft = aircraft
+        self.results_dir = results_dir
+        self.trust_radius = trust_radius
+        self.prefix = prefix
+        self.run_options = run_options
+        self.controls = sorted(set(get_control_types(aircraft).values()))
+        self.entries = []
+        self.runs = 0
+
+    def clear(self):
+        self.entries = []
+        self.controls = sorted(set(get_control_types(self.aircraft).values()))
+
+    def _variables(self):
+        """Returns [(variable, output name, kind)] in state-vector order."""
+        variables = [("alpha", "Alpha", "angle"), ("beta", "Beta", "angle")]
+        variables += [(attr, name, "rate") for attr, name, _ in RATE_VARIABLES]
+        variables += [(ctrl, ctrl, "control") for ctrl in self.controls]
+        return variables
+
+    def _derivative_key(self, coef: str, variable: str) -> str:
+        if variable in ("alpha", "beta"):
+            return f"{coef}{variable[0]}"
+        for attr, _, suffix in RATE_VARIABLES:
+            if attr == variable:
+                return f"{coef}{suffix}"
+        return f"{coef}d_{variable}"
+
+    def _derivative(self, values: dict, coef: str, variable: str):
+        """Returns d(coef)/d(variable) per state unit (degrees for angles), or None if not reported."""
+        derivative = values.get(self._derivative_key(coef, variable))
+        if derivative is None:
+            return None
+        # AVL alpha and beta derivatives are per radian; the state holds degrees
+        return derivative * np.pi / 180.0 if variable in ("alpha", "beta") else derivative
+
+    def _case_state(self, case: SimulationCase):
+        """
+        Returns ({variable: value} fixed by the case, [(variable, coefficient, target)] trim constraints).
+        Controls the case leaves unset are held at zero, as in the written run file.
+        """
+        known = {"beta": float(case.beta)}
+        for attr, _, _ in RATE_VARIABLES:
+            known[attr] = float(getattr(case, attr))
+        for ctrl in self.controls:
+            known[ctrl] = 0.0
+        if case.aoa_mode == "Angle":
+            known["alpha"] = float(case.aoa_val)
+
+        constraints = []
+        for mode_attr, val_attr, variable, targets in TRIM_CONSTRAINTS:
+            mode = getattr(case, mode_attr, None)
+            value = getattr(case, val_attr, None)
+            if mode is None or value is None:
+                continue
+            if mode == "Deflection" and variable in self.controls:
+                known[variable] = float(value)
+            elif mode in targets:
+                known.pop(variable, None)
+                constraints.append((variable, targets[mode], float(value)))
+
+        if getattr(case, "flap_mode", None) == "Deflection" and case.flap_val is not None and "Flap" in self.controls:
+            known["Flap"] = float(case.flap_val)
+
+        return known, constraints
+
+    def add(self, case: SimulationCase, values: dict):
+        """
+        Stores a solved case. Results without derivatives (e.g. failed runs) are ignored.
+        """
+        if "CLa" not in values:
+            return
+        self.entries.append((deck_key(self.aircraft, case)[:3], values))
+
+    def _extrapolate(self, anchor: dict, known: dict, constraints: list):
+        """
+        Extrapolates from one anchor. Returns (estimate, distance), or None if the anchor
+        lacks a needed derivative or the trim constraints are singular.
+        """
+        variables = self._variables()
+        origin = {variable: anchor.get(name, 0.0) for variable, name, _ in variables}
+        delta = {variable: known[variable] - origin[variable] for variable in known}
+
+        if constraints:
+            totals = dict(PREDICTED_COEFFICIENTS)
+            unknowns = [variable for variable, _, _ in constraints]
+            jacobian = np.zeros((len(constraints), len(unknowns)))
+            residual = np.zeros(len(constraints))
+            for i, (_, coef, target) in enumerate(constraints):
+                if totals[coef] not in anchor:
+                    return None
+                residual[i] = target - anchor[totals[coef]]
+                for variable, d in delta.items():
+                    if d != 0.0:
+                        derivative = self._derivative(anchor, coef, variable)
+                        if derivative is None:
+                            return None
+                        residual[i] -= derivative * d
+                for j, variable in enumerate(unknowns):
+                    derivative = self._derivative(anchor, coef, variable)
+                    if derivative is None:
+                        return None
+                    jacobian[i, j] = derivative
+            try:
+                solution = np.linalg.solve(jacobian, residual)
+            except np.linalg.LinAlgError:
+                return None
+            delta.update(zip(unknowns, solution))
+
+        distance = float(np.sqrt(sum((delta[variable] / DISTANCE_SCALES[kind]) ** 2
+                                     for variable, _, kind in variables if variable in delta)))
+
+        estimate = dict(anchor)
+        for variable, name, _ in variables:
+            estimate[name] = float(origin[variable] + delta.get(variable, 0.0))
+        for coef, total in PREDICTED_COEFFICIENTS:
+            if total not in anchor:
+                continue
+            value = anchor[total]
+            for variable, d in delta.items():
+                if d == 0.0:
+                    continue
+                derivative = self._derivative(anchor, coef, variable)
+                if derivative is None:
+                    value = None
+                    break
+                value += derivative * d
+            if value is None:
+                estimate.pop(total, None)
+            else:
+                estimate[total] = float(value)
+        # Drag has no reported state derivatives; drop it rather than return the anchor's value
+        for key in ("CDtot", "CDff", "CDind", "CDvis"):
+            estimate.pop(key, None)
+        return estimate, distance
+
+    def predict(self, case: SimulationCase):
+        """
+        Returns (estimate, distance) extrapolated from the nearest compatible cached case,
+        or (None, inf) if no cached case can be used. The estimate carries the anchor's
+        derivatives unchanged.
+        """
+        key = deck_key(self.aircraft, case)[:3]
+        known, constraints = self._case_state(case)
+
+        best, best_distance = None, float("inf")
+        for entry_key, anchor in self.entries:
+            if entry_key != key:
+                continue
+            result = self._extrapolate(anchor, known, constraints)
+            if result is not None and result[1] < best_distance:
+                best, best_distance = result
+        return best, best_distance
+
+    def query(self, case: SimulationCase):
+        """
+        Returns (values, distance, predicted). Inside the trust radius the values are an
+        extrapolation; otherwise the case is run, cached, and returned with distance 0.
+        """
+        return self.query_many([case])[case.name]
+
+    def query_many(self, cases) -> dict:
+        """
+        Answers many cases; those outside the trust radius are run together as one batch.
+
+        Returns:
+            dict: {case name: (values, distance, predicted)}.
+        """
+        answers, pending = {}, []
+        for case in cases:
+            estimate, distance = self.predict(case)
+            if estimate is not None and distance <= self.trust_radius:
+                answers[case.name] = (estimate, distance, True)
+            else:
+                pending.append(case)
+
+        if pending:
+            self.runs += 1
+            results = run_batch(self.aircraft, pending, self.results_dir,
+                                prefix=f"{self.prefix}{self.runs}", **self.run_options)
+            for case in pending:
+                values = results.get(case.name, {})
+                self.add(case, values)
+                answers[case.name] = (values, 0.0, False)
+
+        return answers
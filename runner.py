@@ -1,21 +1,80 @@
 import os
 import subprocess
+from backend import write_avl_file, write_mass_file, write_run_file, is_symmetric_case
+from output_parser import (parse_sim_file, parse_strip_forces, parse_element_forces,
+                           parse_system_matrix, parse_eigenvalues)
+from modes import eigen_decomposition
+import numpy as np
 
 AVL_EXECUTABLE_PATH = "C:/Users/brgietzen/Documents/AVL/avl335/avl.exe"
 
-def write_avl_command_file(jobname: str, results_dir: str) -> str:
+# Run cases one AVL session can hold (NRMAX in AVL.INC of a stock 3.35 build)
+AVL_MAX_RUN_CASES = 25
+
+def write_oper_output_commands(f, jobname: str, results_dir: str, strip_forces: bool = False,
+                               element_forces: bool = False, hinge_moments: bool = False):
+    """
+    Writes the OPER-menu commands that execute the current run case and save its outputs.
+    """
+    force_file = os.path.join(results_dir, f"{jobname}_forces.txt")
+    st_file = os.path.join(results_dir, f"{jobname}_stability.txt")
+    strip_file = os.path.join(results_dir, f"{jobname}_strips.txt")
+    element_file = os.path.join(results_dir, f"{jobname}_elements.txt")
+    hinge_file = os.path.join(results_dir, f"{jobname}_hinge.txt")
+
+    f.write("x\n")
+    f.write("w\n")
+    f.write(f"{force_file}\n")
+    f.write("st\n")
+    f.write(f"{st_file}\n")
+    if strip_forces:
+        f.write("fs\n")
+        f.write(f"{strip_file}\n")
+    if element_forces:
+        f.write("fe\n")
+        f.write(f"{element_file}\n")
+    if hinge_moments:
+        f.write("hm\n")
+        f.write(f"{hinge_file}\n")
+
+def write_mode_commands(f, jobname: str, results_dir: str):
+    """
+    Writes the commands that leave OPER, compute the eigenmodes of the current run case
+    in the MODE menu, save its system matrix and eigenvalues, and return to the top level.
+    """
+    sysmat_file = os.path.join(results_dir, f"{jobname}_sysmat.txt")
+    eigen_file = os.path.join(results_dir, f"{jobname}_eigen.txt")
+
+    f.write("\n")
+    f.write("mode\n")
+    f.write("n\n")
+    f.write("s\n")
+    f.write(f"{sysmat_file}\n")
+    f.write("w\n")
+    f.write(f"{eigen_file}\n")
+    f.write("\n")
+
+def write_avl_command_file(jobname: str, results_dir: str, strip_forces: bool = False,
+                           element_forces: bool = False, hinge_moments: bool = False,
+                           eigenmodes: bool = False) -> str:
     """
     Creates a command script for AVL to load geometry, mass, run case,
     and write out force and stability files.
 
+    Parameters:
+        jobname (str): Name of the job.
+        results_dir (str): Directory where all result files are located.
+        strip_forces (bool): Also write spanwise strip forces (`fs`).
+        element_forces (bool): Also write per-vortex element forces (`fe`).
+        hinge_moments (bool): Also write control hinge moments (`hm`).
+        eigenmodes (bool): Also write the system matrix and eigenvalues from the MODE menu.
+
     Returns:
         cmd_file (str): Path to the command script.
     """
     avl_file = os.path.join(results_dir, f"{jobname}.avl")
     run_file = os.path.join(results_dir, f"{jobname}.run")
     mass_file = os.path.join(results_dir, f"{jobname}.mass")
-    force_file = os.path.join(results_dir, f"{jobname}_forces.txt")
-    st_file = os.path.join(results_dir, f"{jobname}_stability.txt")
     cmd_file = os.path.join(results_dir, f"{jobname}_avl_commands.txt")
 
     with open(cmd_file, "w") as f:
@@ -24,70 +83,273 @@ def write_avl_command_file(jobname: str, results_dir: str) -> str:
         f.write(f"mass {mass_file}\n")
         f.write("mset 0\n")
         f.write("oper\n")
-        f.write("x\n")
-        f.write("w\n")
-        f.write(f"{force_file}\n")
-        f.write("st\n")
-        f.write(f"{st_file}\n")
-        f.write("\n")
+        write_oper_output_commands(f, jobname, results_dir, strip_forces, element_forces, hinge_moments)
+        if eigenmodes:
+            write_mode_commands(f, jobname, results_dir)
+        else:
+            f.write("\n")
         f.write("quit\n")
 
     return cmd_file
 
-def run_avl(jobname: str, results_dir: str, avl_exe_path: str = AVL_EXECUTABLE_PATH) -> None:
+def write_avl_session_command_file(session: str, jobnames: list, results_dir: str, strip_forces: bool = False,
+                                   element_forces: bool = False, hinge_moments: bool = False,
+                                   eigenmodes: bool = False) -> str:
     """
-    Executes AVL using the generated command file and captures output into a merged `.sim` result file.
+    Creates a command script that loads one geometry/mass deck and a multi-case `.run`
+    file, then executes every run case in the same AVL session. AVL keeps the
+    factored influence matrix between cases, so each extra case only costs a new
+    right-hand side.
 
     Parameters:
-        jobname (str): Name of the job.
+        session (str): Name of the shared `.avl`/`.mass`/`.run` decks.
+        jobnames (list): Job name per run case, in run file order.
         results_dir (str): Directory where all result files are located.
-        avl_exe_path (str): Path to the AVL executable.
+        eigenmodes (bool): Also run the MODE menu for every case.
+
+    Returns:
+        cmd_file (str): Path to the command script.
+    """
+    if len(jobnames) > AVL_MAX_RUN_CASES:
+        raise ValueError(f"AVL holds at most {AVL_MAX_RUN_CASES} run cases, got {len(jobnames)} for session {session}.")
+
+    avl_file = os.path.join(results_dir, f"{session}.avl")
+    run_file = os.path.join(results_dir, f"{session}.run")
+    mass_file = os.path.join(results_dir, f"{session}.mass")
+    cmd_file = os.path.join(results_dir, f"{session}_avl_commands.txt")
+
+    with open(cmd_file, "w") as f:
+        f.write(f"load {avl_file}\n")
+        f.write(f"case {run_file}\n")
+        f.write(f"mass {mass_file}\n")
+        f.write("mset 0\n")
+        if eigenmodes:
+            # The MODE menu works on the current run case, so OPER is re-entered per case
+            for index, jobname in enumerate(jobnames, start=1):
+                f.write("oper\n")
+                f.write(f"{index}\n")
+                write_oper_output_commands(f, jobname, results_dir, strip_forces, element_forces, hinge_moments)
+                write_mode_commands(f, jobname, results_dir)
+        else:
+            f.write("oper\n")
+            for index, jobname in enumerate(jobnames, start=1):
+                f.write(f"{index}\n")
+                write_oper_output_commands(f, jobname, results_dir, strip_forces, element_forces, hinge_moments)
+            f.write("\n")
+        f.write("quit\n")
+
+    return cmd_file
+
+def merge_avl_output(jobname: str, results_dir: str) -> str:
+    """
+    Merges one job's force, stability, hinge moment and eigenvalue files into `{jobname}.sim`,
+    converts strip/element force listings to `.npy` arrays, saves the system matrix and
+    eigenmodes to `{jobname}_modes.npz` and removes the text files.
+
+    Returns:
+        sim_file (str): Path to the merged `.sim` file.
     """
-    cmd_file = write_avl_command_file(jobname, results_dir)
     sim_file = os.path.join(results_dir, f"{jobname}.sim")
     force_file = os.path.join(results_dir, f"{jobname}_forces.txt")
     st_file = os.path.join(results_dir, f"{jobname}_stability.txt")
+    strip_file = os.path.join(results_dir, f"{jobname}_strips.txt")
+    element_file = os.path.join(results_dir, f"{jobname}_elements.txt")
+    hinge_file = os.path.join(results_dir, f"{jobname}_hinge.txt")
+    sysmat_file = os.path.join(results_dir, f"{jobname}_sysmat.txt")
+    eigen_file = os.path.join(results_dir, f"{jobname}_eigen.txt")
 
-    try:
-        result = subprocess.run(
-            [avl_exe_path],
-            stdin=open(cmd_file, 'r'),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-
-        force_data = ""
-        st_data = ""
-
-        if os.path.exists(force_file):
-            with open(force_file, "r") as f:
-                force_data = f.read()
-
-        if os.path.exists(st_file):
-            with open(st_file, "r") as f:
-                lines = f.readlines()
-                
-                start_idx = 0
-                for i, line in enumerate(lines):
-                    if "Stability-axis derivatives" in line:
-                        start_idx = i
-                        break
-                st_data = "".join(lines[start_idx:])
-
-        with open(sim_file, "w") as f:
-            f.write(force_data)
+    force_data = ""
+    st_data = ""
+    hinge_data = ""
+    eigen_data = ""
+
+    if os.path.exists(force_file):
+        with open(force_file, "r") as f:
+            force_data = f.read()
+
+    if os.path.exists(st_file):
+        with open(st_file, "r") as f:
+            lines = f.readlines()
+
+            start_idx = 0
+            for i, line in enumerate(lines):
+                if "Stability-axis derivatives" in line:
+                    start_idx = i
+                    break
+            st_data = "".join(lines[start_idx:])
+
+    if os.path.exists(hinge_file):
+        with open(hinge_file, "r") as f:
+            hinge_data = f.read()
+
+    if os.path.exists(eigen_file):
+        with open(eigen_file, "r") as f:
+            eigen_data = f.read()
+
+    with open(sim_file, "w") as f:
+        f.write(force_data)
+        f.write("\n" * 5)
+        f.write(st_data)
+        if hinge_data:
+            f.write("\n" * 5)
+            f.write(hinge_data)
+        if eigen_data:
             f.write("\n" * 5)
-            f.write(st_data)
-            
+            f.write(eigen_data)
 
-        for file_path in [cmd_file, force_file, st_file]:
-            try:
-                os.remove(file_path)
-            except Exception as e:
-                print(f"Warning: Could not delete {file_path}: {e}")
+    for text_file, parse in [(strip_file, parse_strip_forces), (element_file, parse_element_forces)]:
+        if os.path.exists(text_file):
+            with open(text_file, "r") as f:
+                forces = parse(f.read())
+            np.save(os.path.splitext(text_file)[0] + ".npy", forces)
 
+    if os.path.exists(sysmat_file):
+        with open(sysmat_file, "r") as f:
+            A, B, controls = parse_system_matrix(f.read())
+        if A.size:
+            eigenvalues, eigenvectors = eigen_decomposition(A)
+            np.savez(os.path.join(results_dir, f"{jobname}_modes.npz"), A=A, B=B, controls=np.array(controls),
+                     eigenvalues=parse_eigenvalues(eigen_data) if eigen_data else eigenvalues,
+                     system_eigenvalues=eigenvalues, eigenvectors=eigenvectors)
+        else:
+            print(f"Warning: No system matrix found in {sysmat_file}")
+
+    for file_path in [force_file, st_file, strip_file, element_file, hinge_file, sysmat_file, eigen_file]:
+        if not os.path.exists(file_path):
+            continue
+        try:
+            os.remove(file_path)
+        except Exception as e:
+            print(f"Warning: Could not delete {file_path}: {e}")
+
+    return sim_file
+
+def execute_avl(cmd_file: str, avl_exe_path: str = AVL_EXECUTABLE_PATH):
+    """
+    Runs the AVL executable on a command script and removes the script afterwards.
+    Raises RuntimeError if AVL exits with an error code.
+    """
+    try:
+        with open(cmd_file, "r") as stdin:
+            result = subprocess.run(
+                [avl_exe_path],
+                stdin=stdin,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True
+            )
+    finally:
+        try:
+            os.remove(cmd_file)
+        except Exception as e:
+            print(f"Warning: Could not delete {cmd_file}: {e}")
+
+    if result.returncode != 0:
+        raise RuntimeError(f"AVL exited with code {result.returncode}: {result.stderr.strip()[:200]}")
+
+def run_avl(jobname: str, results_dir: str, avl_exe_path: str = AVL_EXECUTABLE_PATH,
+            strip_forces: bool = False, element_forces: bool = False, hinge_moments: bool = False,
+            eigenmodes: bool = False) -> str:
+    """
+    Executes AVL using the generated command file and captures output into a merged `.sim` result file.
+
+    Strip and element forces, when requested, are not merged into the `.sim` text; they are
+    parsed into structured arrays and saved as `{jobname}_strips.npy` / `{jobname}_elements.npy`.
+
+    Parameters:
+        jobname (str): Name of the job.
+        results_dir (str): Directory where all result files are located.
+        avl_exe_path (str): Path to the AVL executable.
+        strip_forces (bool): Capture spanwise strip forces.
+        element_forces (bool): Capture per-vortex element forces.
+        hinge_moments (bool): Append control hinge moments to the `.sim` file.
+        eigenmodes (bool): Append AVL's eigenvalues to the `.sim` file and save the system
+            matrix and eigenvectors to `{jobname}_modes.npz` (see `modes.load_modes`).
+
+    Returns:
+        sim_file (str): Path to the merged `.sim` file.
+    """
+    sim_file = os.path.join(results_dir, f"{jobname}.sim")
+
+    try:
+        # A failed run must not leave the previous result behind
+        if os.path.exists(sim_file):
+            os.remove(sim_file)
+        cmd_file = write_avl_command_file(jobname, results_dir, strip_forces, element_forces, hinge_moments,
+                                          eigenmodes)
+        execute_avl(cmd_file, avl_exe_path)
+        sim_file = merge_avl_output(jobname, results_dir)
         print(f"AVL simulation completed. Merged output saved to: {sim_file}")
 
     except Exception as e:
         print(f"[ERROR] Failed to run AVL: {e}")
+
+    return sim_file
+
+def run_avl_session(session: str, jobnames: list, results_dir: str, avl_exe_path: str = AVL_EXECUTABLE_PATH,
+                    strip_forces: bool = False, element_forces: bool = False, hinge_moments: bool = False,
+                    eigenmodes: bool = False) -> list:
+    """
+    Executes every run case of a multi-case session in one AVL process and merges
+    each case's output into its own `{jobname}.sim` file.
+
+    Returns:
+        list: Path to the `.sim` file of each job, in `jobnames` order; empty if AVL
+        could not be run or failed.
+    """
+    sim_files = []
+
+    try:
+        cmd_file = write_avl_session_command_file(session, jobnames, results_dir,
+                                                  strip_forces, element_forces, hinge_moments, eigenmodes)
+        execute_avl(cmd_file, avl_exe_path)
+        sim_files = [merge_avl_output(jobname, results_dir) for jobname in jobnames]
+        print(f"AVL session {session} completed: {len(jobnames)} cases.")
+
+    except Exception as e:
+        print(f"[ERROR] Failed to run AVL session {session}: {e}")
+
+    return sim_files
+
+def check_eigenmode_cases(cases):
+    """
+    Raises ValueError if a case has no velocity. AVL's MODE menu would otherwise use
+    its default velocity, and the dimensional frequencies and damping of the modes
+    would belong to the wrong speed.
+    """
+    missing = [case.name for case in cases if getattr(case, "velocity", None) is None]
+    if missing:
+        raise ValueError(f"Eigenmodes need a case velocity; none is set for: {', '.join(missing)}")
+
+def run_case(jobname: str, aircraft, sim_case, results_dir: str, mesh: dict = None,
+             avl_exe_path: str = AVL_EXECUTABLE_PATH, allow_symmetry: bool = False,
+             strip_forces: bool = False, element_forces: bool = False, hinge_moments: bool = False,
+             eigenmodes: bool = False) -> dict:
+    """
+    Writes the .avl/.mass/.run decks for one case, runs AVL and parses the merged output.
+
+    Parameters:
+        jobname (str): Name of the job.
+        aircraft (Aircraft): Aircraft model to write.
+        sim_case (SimulationCase): Flight condition to run.
+        results_dir (str): Directory where all result files are located.
+        mesh (dict): Optional {surface name: (Nchord, Cspace, Nspan, Sspace)} lattice override.
+        avl_exe_path (str): Path to the AVL executable.
+        allow_symmetry (bool): Solve on the half-span (iYsym) when the case is symmetric.
+            Lateral stability derivatives are not available from such runs.
+        strip_forces (bool): Also save spanwise strip forces to `{jobname}_strips.npy`.
+        element_forces (bool): Also save element forces to `{jobname}_elements.npy`.
+        hinge_moments (bool): Also capture control hinge moments.
+        eigenmodes (bool): Also run AVL's eigenmode analysis (needs a case velocity).
+
+    Returns:
+        dict: Parsed AVL values (see `output_parser.parse_sim_file`).
+    """
+    if eigenmodes:
+        check_eigenmode_cases([sim_case])
+    symmetric = allow_symmetry and is_symmetric_case(aircraft, sim_case)
+    write_mass_file(jobname, aircraft, sim_case, os.path.join(results_dir, f"{jobname}.mass"))
+    write_run_file(jobname, sim_case, os.path.join(results_dir, f"{jobname}.run"))
+    write_avl_file(jobname, aircraft, sim_case, None, os.path.join(results_dir, f"{jobname}.avl"), mesh, symmetric)
+    sim_file = run_avl(jobname, results_dir, avl_exe_path, strip_forces, element_forces, hinge_moments, eigenmodes)
+    return parse_sim_file(sim_file)
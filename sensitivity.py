@@ -0,0 +1,128 @@
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from models import Aircraft, SimulationCase
+from batch import run_batch
+from doe import GeometryParameter, apply_parameters
+from mass import MassModel
+
+# Outputs differentiated by default; CDi is AVL's induced drag, with CDff as fallback
+SENSITIVITY_OUTPUTS = ("CL", "CDi", "Cm", "static_margin")
+
+# Finite-difference steps for angle fields (deg); length fields use a relative step
+ANGLE_STEPS = {"twist": 0.5, "incidence": 0.5, "LE Sweep": 0.5, "C/4 Sweep": 0.5, "Dihedral": 0.5}
+
+
+def geometry_parameters(aircraft: Aircraft) -> list:
+    """
+    Returns the standard sensitivity parameters of every surface: twist and incidence,
+    and per section its span, chord (root chord of the first section, taper or tip
+    chord after it, following the ChordMode), sweep (following the SweepMode) and dihedral.
+    """
+    parameters = []
+    for name, surface in aircraft.geometry.items():
+        for field in ("twist", "incidence"):
+            value = float(getattr(surface, field))
+            parameters.append(GeometryParameter(name, field, value, value))
+        for i, section in enumerate(surface.sections):
+            chord_mode = section.get("ChordMode", "Taper+Root")
+            if i == 0 and "Root C" in section:
+                chord_field = "Root C"
+            elif "Tip" in chord_mode:
+                chord_field = "Tip C"
+            else:
+                chord_field = "Taper"
+            sweep_field = "C/4 Sweep" if section.get("SweepMode", "LE") != "LE" else "LE Sweep"
+            for field in ("Span", chord_field, sweep_field, "Dihedral"):
+                value = float(section.get(field, 0))
+                parameters.append(GeometryParameter(name, field, value, value, section=i))
+    return parameters
+
+
+def output_values(aircraft: Aircraft, values: dict, xcg: float) -> dict:
+    """
+    Returns the sensitivity outputs of one parsed run.
+    """
+    xnp = values.get("Xnp", np.nan)
+    return {
+        "CL": values.get("CLtot", np.nan),
+        "CDi": values.get("CDind", values.get("CDff", np.nan)),
+        "Cm": values.get("Cmtot", np.nan),
+        "static_margin": (xnp - xcg) / aircraft.Cref,
+    }
+
+
+def geometry_jacobian(aircraft: Aircraft, sim_case: SimulationCase, results_dir: str, parameters=None,
+                      outputs=SENSITIVITY_OUTPUTS, central: bool = False, rel_step: float = 0.01,
+                      prefix: str = "sens", workers: int = 4, cache: bool = True, **batch_options) -> dict:
+    """
+    Finite-difference derivatives of CL, CDi, Cm and static margin with respect to
+    geometry parameters for one case.
+
+    The baseline and every perturbed aircraft (a shallow delta, see `doe.apply_parameters`)
+    run concurrently; with `cache` the baseline and any earlier identical deck are
+    taken from `results_dir/cache` instead of being rerun.
+
+    Parameters:
+        aircraft (Aircraft): Aircraft model.
+        sim_case (SimulationCase): Flight condition.
+        results_dir (str): Directory for the generated decks and results.
+        parameters (list): GeometryParameter objects; defaults to `geometry_parameters(aircraft)`.
+        outputs (tuple): Subset of SENSITIVITY_OUTPUTS.
+        central (bool): Central instead of forward differences (twice the runs).
+        rel_step (float): Relative step of length fields (angle fields use ANGLE_STEPS).
+        prefix (str): Prefix of the job names.
+        workers (int): Number of runs at the same time.
+        cache (bool): Reuse results of identical decks (AVL only).
+        **batch_options: Passed to `batch.run_batch` (solver, avl_exe_path, mesh, ...).
+
+    Returns:
+        dict: {"jacobian" (n_outputs, n_parameters), "outputs", "parameters" (names),
+            "steps" (n_parameters,), "baseline" {output: value}}.
+    """
+    parameters = list(parameters or geometry_parameters(aircraft))
+    base_values = np.array([p.value(aircraft) for p in parameters])
+    steps = np.array([
+        ANGLE_STEPS.get(p.field, 0.0) or max(rel_step * abs(v), 1e-4)
+        for p, v in zip(parameters, base_values)
+    ])
+
+    # Run list: baseline, then +step (and -step) per parameter
+    runs = [None]
+    for j in range(len(parameters)):
+        runs.append((j, 1.0))
+        if central:
+            runs.append((j, -1.0))
+
+    def run(index):
+        entry = runs[index]
+        if entry is None:
+            variant = aircraft
+        else:
+            j, sign = entry
+            values = base_values.copy()
+            values[j] += sign * steps[j]
+            variant = apply_parameters(aircraft, [parameters[j]], [values[j]])
+        results = run_batch(variant, [sim_case], results_dir, prefix=f"{prefix}{index}", cache=cache, **batch_options)
+        xcg = MassModel.from_aircraft(variant).evaluate()["cg"][0] if variant.mass_properties else 0.0
+        return output_values(variant, results.get(sim_case.name, {}), xcg)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        outcomes = list(pool.map(run, range(len(runs))))
+
+    baseline = outcomes[0]
+    jacobian = np.zeros((len(outputs), len(parameters)))
+    for j in range(len(parameters)):
+        if central:
+            plus, minus = outcomes[1 + 2 * j], outcomes[2 + 2 * j]
+            jacobian[:, j] = [(plus[o] - minus[o]) / (2.0 * steps[j]) for o in outputs]
+        else:
+            plus = outcomes[1 + j]
+            jacobian[:, j] = [(plus[o] - baseline[o]) / steps[j] for o in outputs]
+
+    return {
+        "jacobian": jacobian,
+        "outputs": list(outputs),
+        "parameters": [p.name for p in parameters],
+        "steps": steps,
+        "baseline": {o: baseline[o] for o in outputs},
+    }
@@ -0,0 +1,136 @@
+import copy
+import threading
+from types import MappingProxyType
+from models import Aircraft, GeometrySurface, MassProperty, SimulationCase
+
+
+class _Frozen:
+    """
+    Read-only mixin for snapshot objects. Attributes cannot be set or deleted;
+    `replace` returns a new snapshot object sharing every unchanged attribute.
+    """
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is a read-only snapshot; use replace()")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is a read-only snapshot")
+
+    def replace(self, **changes):
+        new = object.__new__(type(self))
+        new.__dict__.update(self.__dict__)
+        new.__dict__.update({name: _freeze_value(value) for name, value in changes.items()})
+        return new
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+class FrozenSurface(_Frozen, GeometrySurface):
+    pass
+
+
+class FrozenMassProperty(_Frozen, MassProperty):
+    pass
+
+
+class FrozenSimulationCase(_Frozen, SimulationCase):
+    pass
+
+
+class FrozenAircraft(_Frozen, Aircraft):
+    pass
+
+
+def _freeze_value(value):
+    """Freezes the containers used by PAVL objects: lists of dicts become tuples of mapping proxies."""
+    if isinstance(value, (MappingProxyType, tuple, frozenset)) or isinstance(value, _Frozen):
+        return value
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze_value(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze_value(item) for item in value)
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+
+def _frozen(cls, obj):
+    new = object.__new__(cls)
+    new.__dict__.update({name: _freeze_value(value) for name, value in vars(obj).items()})
+    return new
+
+
+def fingerprint(value):
+    """Hashable summary of an object's contents, used to reuse unchanged snapshot parts."""
+    if isinstance(value, (dict, MappingProxyType)):
+        return tuple(sorted((key, fingerprint(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(fingerprint(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(value))
+    if hasattr(value, "__dict__"):
+        return (type(value).__name__,) + fingerprint(vars(value))
+    return value
+
+
+_last = {}
+_lock = threading.Lock()
+
+
+def _reuse(kind: str, name: str, obj, cls):
+    """Returns the previous frozen copy of `obj` if its contents are unchanged, else a new one."""
+    key = (kind, name)
+    contents = fingerprint(obj)
+    with _lock:
+        previous = _last.get(key)
+        if previous is not None and previous[0] == contents:
+            return previous[1]
+        frozen = _frozen(cls, obj)
+        _last[key] = (contents, frozen)
+        return frozen
+
+
+def snapshot(aircraft: Aircraft) -> FrozenAircraft:
+    """
+    Returns an immutable snapshot of an aircraft for a job to use while the live
+    model keeps being edited.
+
+    Surfaces, mass components and cases whose contents did not change since the
+    previous snapshot are reused as-is, so successive snapshots share all unchanged
+    parts. Snapshots of snapshots are returned unchanged.
+    """
+    if isinstance(aircraft, FrozenAircraft):
+        return aircraft
+
+    state = dict(vars(aircraft))
+    state["geometry"] = MappingProxyType({
+        name: _reuse("surface", name, surface, FrozenSurface) for name, surface in aircraft.geometry.items()
+    })
+    state["mass_properties"] = MappingProxyType({
+        name: _reuse("mass", name, prop, FrozenMassProperty) for name, prop in aircraft.mass_properties.items()
+    })
+    state["simulation_cases"] = MappingProxyType({
+        name: _reuse("case", name, case, FrozenSimulationCase) for name, case in aircraft.simulation_cases.items()
+    })
+
+    frozen = object.__new__(FrozenAircraft)
+    frozen.__dict__.update({name: _freeze_value(value) for name, value in state.items()})
+    return frozen
+
+
+def replace(obj, **changes):
+    """
+    Returns a copy of `obj` with the given attributes changed. Works for live model
+    objects (shallow copy) and snapshot objects (`replace`), so helpers that derive
+    variants accept either.
+    """
+    if isinstance(obj, _Frozen):
+        return obj.replace(**changes)
+    new = copy.copy(obj)
+    for name, value in changes.items():
+        setattr(new, name, value)
+    return new
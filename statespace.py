@@ -0,0 +1,164 @@
+import numpy as np
+from models import Aircraft, SimulationCase
+from mass import MassModel
+from hinges import get_control_types
+
+LONGITUDINAL_STATES = ("u", "w", "q", "theta")
+LATERAL_STATES = ("v", "p", "r", "phi")
+
+# Gravity per unit system, as written to the .mass file
+GRAVITY = {"MKS": 9.81, "FPS": 32.17}
+
+
+def flight_speed(aircraft: Aircraft, sim_case: SimulationCase, values: dict, mass: float) -> float:
+    """
+    Returns the case velocity if set, otherwise the speed at which the parsed CL
+    supports the aircraft weight in level flight.
+    """
+    if getattr(sim_case, "velocity", None):
+        return float(sim_case.velocity)
+    g = GRAVITY[aircraft.units.upper()]
+    cl = values.get("CLtot", 0.0)
+    if cl <= 0 or sim_case.rho <= 0 or aircraft.Sref <= 0:
+        raise ValueError(f"Case '{sim_case.name}' needs a velocity, or rho > 0 and CL > 0 to find one.")
+    return float(np.sqrt(2.0 * mass * g / (sim_case.rho * aircraft.Sref * cl)))
+
+
+def state_space(aircraft: Aircraft, sim_case: SimulationCase, values: dict, mass_totals: dict = None) -> dict:
+    """
+    Assembles the decoupled longitudinal and lateral state-space models of a trimmed
+    case from its parsed derivatives (see `output_parser.parse_sim_file`).
+
+    The models are the classical small-perturbation equations in stability axes about
+    level flight: states (u, w, q, theta) and (v, p, r, phi) in SI/FPS units and radians,
+    inputs are the control types in radians. AVL gives no speed or alpha-dot derivatives,
+    so CL_u, CD_u, Cm_u and the alpha-dot terms are zero; CD_alpha comes from the
+    induced-drag polar with the reported span efficiency.
+
+    Parameters:
+        aircraft (Aircraft): Aircraft providing Sref/Cref/Bref, units and mass components.
+        sim_case (SimulationCase): Case providing rho and, optionally, velocity.
+        values (dict): Parsed results of the case.
+        mass_totals (dict): Optional `MassModel.evaluate()` result to use instead of the
+            aircraft's own mass components.
+
+    Returns:
+        dict: {"A_lon" (4, 4), "B_lon" (4, nc), "A_lat" (4, 4), "B_lat" (4, nc),
+            "controls", "V", "qbar"}.
+    """
+    totals = mass_totals or MassModel.from_aircraft(aircraft).evaluate()
+    m = float(totals["mass"])
+    g = GRAVITY[aircraft.units.upper()]
+    V = flight_speed(aircraft, sim_case, values, m)
+    rho = sim_case.rho
+    S, c, b = aircraft.Sref, aircraft.Cref, aircraft.Bref
+    qbar = 0.5 * rho * V ** 2
+    deg = 180.0 / np.pi
+
+    # Inertia rotated from body to stability axes by the trim alpha
+    alpha = np.radians(values.get("Alpha", 0.0))
+    rot = np.array([[np.cos(alpha), 0.0, np.sin(alpha)], [0.0, 1.0, 0.0], [-np.sin(alpha), 0.0, np.cos(alpha)]])
+    J = rot @ totals["tensor"] @ rot.T
+    Ixx, Iyy, Izz, Ixz = J[0, 0], J[1, 1], J[2, 2], -J[0, 2]
+
+    def d(name):
+        return values.get(name, 0.0)
+
+    CL, CD = d("CLtot"), d("CDtot")
+    aspect = b ** 2 / S
+    e = values.get("e", 1.0) or 1.0
+    CDa = 2.0 * CL * d("CLa") / (np.pi * e * aspect)
+
+    k = qbar * S / (m * V)
+    Xu = -2.0 * CD * k
+    Xw = -(CDa - CL) * k
+    Zu = -2.0 * CL * k
+    Zw = -(d("CLa") + CD) * k
+    Zq = -d("CLq") * qbar * S * c / (2.0 * m * V)
+    Mw = d("Cma") * qbar * S * c / (Iyy * V)
+    Mq = d("Cmq") * qbar * S * c ** 2 / (2.0 * Iyy * V)
+
+    A_lon = np.array([
+        [Xu, Xw, 0.0, -g],
+        [Zu, Zw, V + Zq, 0.0],
+        [0.0, Mw, Mq, 0.0],
+        [0.0, 0.0, 1.0, 0.0],
+    ])
+
+    Yv = d("CYb") * qbar * S / (m * V)
+    Yp = d("CYp") * qbar * S * b / (2.0 * m * V)
+    Yr = d("CYr") * qbar * S * b / (2.0 * m * V)
+    L = np.array([d("Clb") / V, d("Clp") * b / (2.0 * V), d("Clr") * b / (2.0 * V)]) * qbar * S * b / Ixx
+    N = np.array([d("Cnb") / V, d("Cnp") * b / (2.0 * V), d("Cnr") * b / (2.0 * V)]) * qbar * S * b / Izz
+
+    # Primed derivatives remove the roll/yaw inertia coupling
+    coupling = 1.0 - Ixz ** 2 / (Ixx * Izz)
+    Lp = (L + Ixz / Ixx * N) / coupling
+    Np = (N + Ixz / Izz * L) / coupling
+
+    A_lat = np.array([
+        [Yv, Yp, Yr - V, g],
+        [Lp[0], Lp[1], Lp[2], 0.0],
+        [Np[0], Np[1], Np[2], 0.0],
+        [0.0, 1.0, 0.0, 0.0],
+    ])
+
+    controls = sorted(set(get_control_types(aircraft).values()))
+    B_lon = np.zeros((4, len(controls)))
+    B_lat = np.zeros((4, len(controls)))
+    for j, ctrl in enumerate(controls):
+        B_lon[0, j] = -d(f"CDffd_{ctrl}") * deg * qbar * S / m
+        B_lon[1, j] = -d(f"CLd_{ctrl}") * deg * qbar * S / m
+        B_lon[2, j] = d(f"Cmd_{ctrl}") * deg * qbar * S * c / Iyy
+        l_ctrl = d(f"Cld_{ctrl}") * deg * qbar * S * b / Ixx
+        n_ctrl = d(f"Cnd_{ctrl}") * deg * qbar * S * b / Izz
+        B_lat[0, j] = d(f"CYd_{ctrl}") * deg * qbar * S / m
+        B_lat[1, j] = (l_ctrl + Ixz / Ixx * n_ctrl) / coupling
+        B_lat[2, j] = (n_ctrl + Ixz / Izz * l_ctrl) / coupling
+
+    return {"A_lon": A_lon, "B_lon": B_lon, "A_lat": A_lat, "B_lat": B_lat,
+            "controls": controls, "V": V, "qbar": qbar}
+
+
+def batch_state_space(aircraft: Aircraft, cases, results: dict, filepath: str = None) -> dict:
+    """
+    Builds the state-space models of every case of a batch as stacked arrays for
+    gain scheduling, optionally saving them to a `.npz` file.
+
+    Parameters:
+        aircraft (Aircraft): Aircraft the batch was run on.
+        cases (list): SimulationCase objects.
+        results (dict): {case name: parsed values}, e.g. from `batch.run_batch`.
+        filepath (str): Optional `.npz` path to write.
+
+    Returns:
+        dict: {"cases" (n,), "A_lon" (n, 4, 4), "B_lon" (n, 4, nc), "A_lat", "B_lat",
+            "V" (n,), "qbar" (n,), "alpha" (n,), "Mach" (n,), "controls" (nc,)}.
+            Cases without results are skipped.
+    """
+    totals = MassModel.from_aircraft(aircraft).evaluate()
+    models, names = [], []
+    for case in cases:
+        values = results.get(case.name, {})
+        if "CLa" not in values:
+            print(f"Warning: No derivatives for case '{case.name}'; skipped.")
+            continue
+        models.append((case, values, state_space(aircraft, case, values, totals)))
+        names.append(case.name)
+
+    controls = sorted(set(get_control_types(aircraft).values()))
+    stacked = {
+        "cases": np.array(names),
+        "controls": np.array(controls),
+        "alpha": np.array([values.get("Alpha", np.nan) for _, values, _ in models]),
+        "Mach": np.array([case.Mach for case, _, _ in models], dtype=float),
+    }
+    for key in ("A_lon", "B_lon", "A_lat", "B_lat"):
+        width = 4 if key.startswith("A") else len(controls)
+        stacked[key] = np.array([model[key] for _, _, model in models]).reshape(len(models), 4, width)
+    for key in ("V", "qbar"):
+        stacked[key] = np.array([model[key] for _, _, model in models])
+
+    if filepath:
+        np.savez(filepath, **stacked)
+    return stacked
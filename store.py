@@ -0,0 +1,290 @@
+import os
+import re
+import json
+import sqlite3
+from contextlib import contextmanager
+from export import result_schema, result_row, export_plan, iter_rows
+from archive import ResultArchive, ARCHIVE_FILE
+from output_parser import parse_sim_text
+
+# Results index inside the results directory
+INDEX_FILE = "index.sqlite"
+
+# Columns shown in the results table, and indexed for filtering and sorting
+TABLE_COLUMNS = ("job", "Mach", "Alpha", "CLtot", "CDtot", "Cmtot", "Xnp")
+INDEXED_COLUMNS = TABLE_COLUMNS + ("Beta", "CLa", "Cma", "e", "aoa_val")
+
+# Short names accepted in filter expressions
+COLUMN_ALIASES = {
+    "CL": "CLtot", "CD": "CDtot", "CY": "CYtot", "Cl": "Cltot", "Cm": "Cmtot", "Cn": "Cntot",
+    "alpha": "Alpha", "beta": "Beta", "mach": "Mach",
+}
+
+TOKEN_PATTERN = re.compile(r"""\s*(?:
+    (?P<number>-?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)
+  | (?P<string>'[^']*'|"[^"]*")
+  | (?P<op><=|>=|==|!=|<>|<|>|=)
+  | (?P<paren>[()])
+  | (?P<name>[A-Za-z_][\w/]*)
+)""", re.VERBOSE)
+
+KEYWORDS = ("and", "or", "not", "like")
+
+
+def _tokenize(text: str) -> list:
+    tokens, pos = [], 0
+    text = text.strip()
+    while pos < len(text):
+        match = TOKEN_PATTERN.match(text, pos)
+        if match is None or match.end() == pos:
+            raise ValueError(f"Unexpected character in filter at: {text[pos:pos + 10]!r}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "name" and value.lower() in KEYWORDS:
+            kind, value = "keyword", value.lower()
+        tokens.append((kind, value))
+        pos = match.end()
+        while pos < len(text) and text[pos].isspace():
+            pos += 1
+    return tokens
+
+
+def parse_filter(text: str, columns) -> tuple:
+    """
+    Translates a filter expression into a parameterized SQL condition.
+
+    Expressions compare columns with numbers, strings or other columns, combined with
+    and/or/not and parentheses, e.g. "Mach < 0.3 and CL > 0.8" or "job like 'cruise%'".
+    Column names are checked against `columns` (plus COLUMN_ALIASES) and every value
+    is passed as a parameter, so no input text reaches the SQL itself.
+
+    Parameters:
+        text (str): Filter expression.
+        columns (dict): {column name: SQL column identifier}.
+
+    Returns:
+        tuple: (SQL condition, parameters); ("", []) for an empty expression.
+    """
+    tokens = _tokenize(text or "")
+    if not tokens:
+        return "", []
+    lower = {}
+    for name in list(columns) + list(COLUMN_ALIASES):
+        lower.setdefault(name.lower(), []).append(name)
+    params = []
+    pos = 0
+
+    def peek():
+        return tokens[pos] if pos < len(tokens) else (None, None)
+
+    def take(kind=None, value=None):
+        nonlocal pos
+        token = peek()
+        if token[0] is None or (kind and token[0] != kind) or (value and token[1] != value):
+            expected = value or kind or "more input"
+            raise ValueError(f"Expected {expected} in filter, found {token[1] or 'end of filter'!r}")
+        pos += 1
+        return token
+
+    def column(name):
+        if name in columns:
+            return name
+        if name in COLUMN_ALIASES:
+            return COLUMN_ALIASES[name]
+        matches = lower.get(name.lower(), [])
+        if len(matches) == 1:
+            return COLUMN_ALIASES.get(matches[0], matches[0])
+        if matches:
+            raise ValueError(f"Ambiguous column in filter: {name} (use one of {', '.join(matches)})")
+        raise ValueError(f"Unknown column in filter: {name}")
+
+    def operand():
+        kind, value = take()
+        if kind == "name":
+            return columns[column(value)]
+        if kind == "number":
+            params.append(float(value))
+            return "?"
+        if kind == "string":
+            params.append(value[1:-1])
+            return "?"
+        raise ValueError(f"Expected a column or value in filter, found {value!r}")
+
+    def comparison():
+        if peek() == ("paren", "("):
+            take()
+            condition = disjunction()
+            take("paren", ")")
+            return f"({condition})"
+        left = operand()
+        kind, value = take()
+        if kind == "keyword" and value == "like":
+            return f"{left} LIKE {operand()}"
+        if kind != "op":
+            raise ValueError(f"Expected a comparison in filter, found {value!r}")
+        op = {"==": "=", "<>": "!="}.get(value, value)
+        return f"{left} {op} {operand()}"
+
+    def negation():
+        if peek() == ("keyword", "not"):
+            take()
+            return f"NOT {negation()}"
+        return comparison()
+
+    def conjunction():
+        condition = negation()
+        while peek() == ("keyword", "and"):
+            take()
+            condition = f"{condition} AND {negation()}"
+        return condition
+
+    def disjunction():
+        condition = conjunction()
+        while peek() == ("keyword", "or"):
+            take()
+            condition = f"{condition} OR {conjunction()}"
+        return condition
+
+    condition = disjunction()
+    if pos != len(tokens):
+        raise ValueError(f"Unexpected {tokens[pos][1]!r} in filter")
+    return condition, params
+
+
+class ResultStore:
+    """
+    SQLite index of parsed results, one row per job over `export.result_schema()`.
+
+    The index is refreshed from the results directory and the archive with `update`;
+    `query` and `count` filter, sort and page it in SQL, so tables of tens of thousands
+    of jobs never have to be loaded into Python at once.
+    """
+
+    def __init__(self, results_dir: str = "results", filename: str = INDEX_FILE):
+        self.results_dir = results_dir
+        self.path = os.path.join(results_dir, filename)
+        self.schema = result_schema()
+        self.columns = [name for name, _ in self.schema]
+        # SQL column names are positional: SQLite names are case-insensitive, and the
+        # schema has e.g. both "beta" (case input) and "Beta" (result)
+        self.sql_columns = {name: f"c{i}" for i, name in enumerate(self.columns)}
+
+        definitions = ", ".join(f"{self.sql_columns[name]} {'TEXT' if kind == 'str' else 'REAL'}"
+                                + (" PRIMARY KEY" if name == "job" else "") for name, kind in self.schema)
+        with self._connect() as conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS results ({definitions}, mtime REAL)")
+            for name in INDEXED_COLUMNS:
+                if name != "job":
+                    column = self.sql_columns[name]
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS results_{column} ON results ({column})")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30.0)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _insert(self, conn, rows):
+        placeholders = ", ".join("?" * (len(self.columns) + 1))
+        conn.executemany(f"INSERT OR REPLACE INTO results VALUES ({placeholders})",
+                         ([row[name] for name in self.columns] + [mtime] for row, mtime in rows))
+
+    def update(self, batch_size: int = 500) -> dict:
+        """
+        Brings the index up to date: new or rewritten `.sim` files are (re)indexed,
+        archived jobs missing from the index are added from the archive (without case
+        metadata), and jobs that no longer exist anywhere are removed.
+
+        Returns:
+            dict: {"indexed": number of rows written, "removed": number of rows removed}.
+        """
+        with self._connect() as conn:
+            known = dict(conn.execute(f"SELECT {self.sql_columns['job']}, mtime FROM results"))
+
+        full_plan = export_plan(self.results_dir)
+        on_disk = {job for job, _ in full_plan}
+        plan = [(job, run_file) for job, run_file in full_plan
+                if known.get(job) != os.path.getmtime(os.path.join(self.results_dir, f"{job}.sim"))]
+        indexed = 0
+
+        batch = []
+        with self._connect() as conn:
+            for row, _ in iter_rows(self.results_dir, plan):
+                mtime = os.path.getmtime(os.path.join(self.results_dir, f"{row['job']}.sim"))
+                batch.append((row, mtime))
+                if len(batch) >= batch_size:
+                    self._insert(conn, batch)
+                    indexed += len(batch)
+                    batch = []
+            self._insert(conn, batch)
+            indexed += len(batch)
+
+        archived = set()
+        if os.path.exists(os.path.join(self.results_dir, ARCHIVE_FILE)):
+            archive = ResultArchive(self.results_dir)
+            archived = set(archive.jobs())
+            missing = [job for job in archived - on_disk if job not in known]
+            with self._connect() as conn:
+                for start in range(0, len(missing), batch_size):
+                    rows = []
+                    for job in missing[start:start + batch_size]:
+                        values = parse_sim_text(archive.read(job, f"{job}.sim").decode())
+                        rows.append((result_row(job, None, None, values), None))
+                    self._insert(conn, rows)
+                    indexed += len(rows)
+
+        gone = [job for job in known if job not in on_disk and job not in archived]
+        with self._connect() as conn:
+            conn.executemany(f"DELETE FROM results WHERE {self.sql_columns['job']} = ?", [(job,) for job in gone])
+        return {"indexed": indexed, "removed": len(gone)}
+
+    def _where(self, where: str, jobs) -> tuple:
+        condition, params = parse_filter(where, self.sql_columns)
+        clauses = [condition] if condition else []
+        if jobs is not None:
+            # One JSON parameter instead of one per job keeps large job lists within SQLite's limits
+            clauses.append(f"{self.sql_columns['job']} IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(sorted(jobs)))
+        return (" WHERE " + " AND ".join(f"({c})" for c in clauses)) if clauses else "", params
+
+    def count(self, where: str = "", jobs=None) -> int:
+        """Returns the number of jobs matching a filter expression (see `parse_filter`)."""
+        sql, params = self._where(where, jobs)
+        with self._connect() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM results{sql}", params).fetchone()[0]
+
+    def query(self, columns=TABLE_COLUMNS, where: str = "", order_by: str = None, descending: bool = False,
+              limit: int = 200, offset: int = 0, jobs=None) -> list:
+        """
+        Returns one page of rows.
+
+        Parameters:
+            columns (tuple): Columns to return.
+            where (str): Filter expression, see `parse_filter`.
+            order_by (str): Column to sort by (ties are ordered by job name).
+            descending (bool): Sort in descending order.
+            limit (int): Page size.
+            offset (int): Rows to skip.
+            jobs (iterable): Only these jobs, e.g. the session's.
+
+        Returns:
+            list: Tuples of the requested columns.
+        """
+        for name in list(columns) + ([order_by] if order_by else []):
+            if name not in self.columns:
+                raise ValueError(f"Unknown column: {name}")
+        sql, params = self._where(where, jobs)
+        job = self.sql_columns["job"]
+        order = f"{self.sql_columns[order_by]} {'DESC' if descending else 'ASC'}, {job}" if order_by else job
+        select = ", ".join(self.sql_columns[name] for name in columns)
+        with self._connect() as conn:
+            return conn.execute(f"SELECT {select} FROM results{sql} ORDER BY {order} LIMIT ? OFFSET ?",
+                                params + [int(limit), int(offset)]).fetchall()
+
+    def delete(self, jobs):
+        """Removes jobs from the index."""
+        with self._connect() as conn:
+            conn.executemany(f"DELETE FROM results WHERE {self.sql_columns['job']} = ?", [(job,) for job in jobs])
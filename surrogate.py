@@ -0,0 +1,203 @@
+import numpy as np
+from models import Aircraft
+
+# Default outputs fitted by the surrogate (AVL output names)
+SURROGATE_OUTPUTS = ("CLtot", "CDtot", "Cmtot", "CYtot", "Cltot", "Cntot", "CLa", "Cma")
+
+
+class Surrogate:
+    """
+    Scattered-data response surface of parsed results over case variables and
+    optional geometry parameters.
+
+    The interpolant is a cubic radial basis function (phi = r^3) with a linear
+    polynomial tail, fitted in features normalized to [0, 1]. Samples can be added
+    at any time: while they stay inside the normalization bounds the factorization
+    is extended by a bordered update, otherwise it is refitted from scratch. A sample
+    at the inputs of an existing one (e.g. a cached or repeated case) replaces its
+    outputs, since repeated points would make the system singular.
+    Error estimates come from leave-one-out residuals (Rippa's formula), spread to
+    the query points by inverse-distance weighting.
+    """
+
+    def __init__(self, features=("Alpha", "Mach"), outputs=SURROGATE_OUTPUTS, geometry: dict = None,
+                 bounds: dict = None, smoothing: float = 0.0):
+        """
+        Parameters:
+            features (tuple): Parsed output names used as inputs, e.g. ("Alpha", "Beta", "Mach", "Elevator").
+            outputs (tuple): Parsed output names to fit.
+            geometry (dict): {parameter name: callable(aircraft) -> float} geometry inputs,
+                e.g. {"wing_span": lambda ac: compute_total_span(ac.geometry["wing"])}.
+            bounds (dict): Optional fixed {input name: (lo, hi)} normalization bounds. Inputs
+                without bounds take them from the data.
+            smoothing (float): Added to the kernel diagonal; 0 interpolates exactly.
+        """
+        self.features = tuple(features)
+        self.geometry = dict(geometry or {})
+        self.inputs = self.features + tuple(self.geometry)
+        self.outputs = tuple(outputs)
+        self.fixed_bounds = dict(bounds or {})
+        self.smoothing = smoothing
+
+        self.X = np.empty((0, len(self.inputs)))
+        self.Y = np.empty((0, len(self.outputs)))
+        self._rows = {}          # input tuple -> sample index
+        self.lo = self.hi = None
+        self._inverse = None     # inverse of the augmented system, polynomial rows first
+        self._fitted = 0         # number of samples in _inverse
+        self._weights = None
+        self._loo = None
+
+    # ---- data ----
+
+    def add(self, values: dict, aircraft: Aircraft = None) -> bool:
+        """
+        Adds one parsed result. Returns False if it lacks a feature or an output.
+        """
+        return self.add_results([values], aircraft) == 1
+
+    def add_results(self, results, aircraft: Aircraft = None) -> int:
+        """
+        Adds parsed results (an iterable of dicts or a {case name: dict} mapping) that
+        share one geometry. Results at the inputs of an existing sample replace its
+        outputs. Returns the number of results used.
+        """
+        if isinstance(results, dict):
+            results = results.values()
+        params = [float(fn(aircraft)) for fn in self.geometry.values()]
+        rows, targets = [], []
+        used = 0
+        for values in results:
+            if not all(name in values for name in self.features + self.outputs):
+                continue
+            row = [float(values[name]) for name in self.features] + params
+            target = [float(values[name]) for name in self.outputs]
+            key = tuple(np.round(row, 9))
+            used += 1
+            if key in self._rows:
+                index = self._rows[key]
+                if index < len(self.Y):
+                    self.Y[index] = target
+                else:
+                    targets[index - len(self.Y)] = target
+                continue
+            self._rows[key] = len(self.X) + len(rows)
+            rows.append(row)
+            targets.append(target)
+        if rows:
+            self.X = np.vstack([self.X, np.array(rows, dtype=float)])
+            self.Y = np.vstack([self.Y, np.array(targets, dtype=float)])
+        if used:
+            self._weights = None
+        return used
+
+    # ---- fitting ----
+
+    def _data_bounds(self):
+        lo, hi = self.X.min(axis=0), self.X.max(axis=0)
+        for i, name in enumerate(self.inputs):
+            if name in self.fixed_bounds:
+                lo[i], hi[i] = self.fixed_bounds[name]
+        hi = np.where(hi - lo > 1e-12, hi, lo + 1.0)
+        return lo, hi
+
+    def _normalize(self, X):
+        return (X - self.lo) / (self.hi - self.lo)
+
+    def _kernel(self, A, B):
+        r = np.sqrt(((A[:, None, :] - B[None, :, :]) ** 2).sum(axis=2))
+        return r ** 3
+
+    def _poly(self, A):
+        return np.hstack([np.ones((len(A), 1)), A])
+
+    def _full_inverse(self, Z):
+        n, p = len(Z), Z.shape[1] + 1
+        P = self._poly(Z)
+        M = np.zeros((p + n, p + n))
+        M[:p, p:] = P.T
+        M[p:, :p] = P
+        M[p:, p:] = self._kernel(Z, Z) + self.smoothing * np.eye(n)
+        return np.linalg.inv(M)
+
+    def _bordered_inverse(self, Z):
+        """Extends the stored inverse with the samples after `_fitted`."""
+        old, new = Z[:self._fitted], Z[self._fitted:]
+        b = np.vstack([self._poly(new).T, self._kernel(old, new)])
+        d = self._kernel(new, new) + self.smoothing * np.eye(len(new))
+        Ainv_b = self._inverse @ b
+        s_inv = np.linalg.inv(d - b.T @ Ainv_b)
+        top_left = self._inverse + Ainv_b @ s_inv @ Ainv_b.T
+        top_right = -Ainv_b @ s_inv
+        return np.block([[top_left, top_right], [top_right.T, s_inv]])
+
+    def fit(self):
+        """
+        Fits (or extends) the interpolant. Called automatically by `predict`.
+        """
+        n, p = len(self.X), len(self.inputs) + 1
+        if n < p + 1:
+            raise ValueError(f"Surrogate needs at least {p + 1} samples, has {n}.")
+
+        lo, hi = self._data_bounds()
+        incremental = (self._inverse is not None and 0 < self._fitted < n
+                       and np.allclose(lo, self.lo) and np.allclose(hi, self.hi))
+        self.lo, self.hi = lo, hi
+        Z = self._normalize(self.X)
+
+        if incremental:
+            self._inverse = self._bordered_inverse(Z)
+        elif self._inverse is None or self._fitted != n:
+            self._inverse = self._full_inverse(Z)
+        self._fitted = n
+
+        rhs = np.vstack([np.zeros((p, len(self.outputs))), self.Y])
+        self._weights = self._inverse @ rhs
+        self._loo = self._weights[p:] / np.diag(self._inverse)[p:, None]
+
+    def loo_rms(self) -> dict:
+        """
+        Returns {output: RMS leave-one-out error} over the samples.
+        """
+        if self._weights is None:
+            self.fit()
+        return dict(zip(self.outputs, np.sqrt(np.mean(self._loo ** 2, axis=0))))
+
+    # ---- queries ----
+
+    def _query_matrix(self, points, aircraft):
+        if isinstance(points, dict):
+            columns = [np.asarray(points[name], dtype=float) for name in self.features]
+            m = np.broadcast(*columns).shape
+            columns = [np.broadcast_to(c, m).ravel() for c in columns]
+            for name, fn in self.geometry.items():
+                value = points[name] if name in points else fn(aircraft)
+                columns.append(np.broadcast_to(np.asarray(value, dtype=float), m).ravel())
+            return np.column_stack(columns), m
+        X = np.atleast_2d(np.asarray(points, dtype=float))
+        return X, (len(X),)
+
+    def predict(self, points, aircraft: Aircraft = None):
+        """
+        Evaluates the surrogate.
+
+        Parameters:
+            points: Either an (m, n_inputs) array in `inputs` order, or a dict of feature
+                arrays (broadcast together); geometry inputs missing from the dict are
+                evaluated on `aircraft`.
+            aircraft (Aircraft): Geometry for the geometry inputs of dict queries.
+
+        Returns:
+            tuple: ({output: predictions}, {output: error estimates}), arrays shaped like the query.
+        """
+        if self._weights is None:
+            self.fit()
+        X, shape = self._query_matrix(points, aircraft)
+        Z = self._normalize(X)
+        kernel = self._kernel(Z, self._normalize(self.X))
+        values = np.hstack([self._poly(Z), kernel]) @ self._weights
+
+        inverse_distance = 1.0 / np.maximum(kernel, 1e-18) ** (2.0 / 3.0)
+        errors = (inverse_distance @ np.abs(self._loo)) / inverse_distance.sum(axis=1, keepdims=True)
+        return ({name: values[:, i].reshape(shape) for i, name in enumerate(self.outputs)},
+                {name: errors[:, i].reshape(shape) for i, name in enumerate(self.outputs)})
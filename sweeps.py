@@ -0,0 +1,96 @@
+import numpy as np
+from models import Aircraft, SimulationCase
+from cases import sweep_cases
+from batch import run_batch
+
+# Allowed deviation from linear interpolation before an interval is bisected
+SWEEP_TOLERANCES = {"CLtot": 0.005, "Cmtot": 0.002, "CLa": 0.05, "Cma": 0.05}
+
+# Outputs whose sign change inside an interval is resolved down to `min_width`
+CROSSING_KEYS = ("Cmtot",)
+
+
+def interval_deviation(lo: dict, mid: dict, hi: dict, tolerances: dict) -> float:
+    """
+    Returns the largest deviation of the midpoint from the linear interpolation of the
+    interval ends, as a multiple of each key's tolerance. Missing keys count as infinite.
+    """
+    worst = 0.0
+    for key, tol in tolerances.items():
+        if key not in lo or key not in mid or key not in hi:
+            return float("inf")
+        worst = max(worst, abs(mid[key] - 0.5 * (lo[key] + hi[key])) / tol)
+    return worst
+
+
+def has_crossing(lo: dict, hi: dict, keys=CROSSING_KEYS) -> bool:
+    """
+    Returns True if any of `keys` changes sign between the two results.
+    """
+    return any(key in lo and key in hi and np.sign(lo[key]) != np.sign(hi[key]) for key in keys)
+
+
+def adaptive_sweep(aircraft: Aircraft, base_case: SimulationCase, field: str, lo: float, hi: float,
+                   results_dir: str, initial: int = 5, tolerances: dict = None, crossing_keys=CROSSING_KEYS,
+                   min_width: float = 0.05, max_depth: int = 6, prefix: str = "sweep", **batch_options) -> dict:
+    """
+    Sweeps one case field (e.g. "aoa_val", "elevator_val") from `lo` to `hi`, starting
+    coarse and bisecting only intervals where the response is not linear or where a
+    crossing key (Cm by default) changes sign.
+
+    Each refinement level is submitted as one batch. An interval stops refining once
+    its midpoint agrees with linear interpolation of its ends within `tolerances`
+    (and it brackets no crossing), it is narrower than `min_width`, or `max_depth`
+    levels have been run.
+
+    Parameters:
+        aircraft (Aircraft): Aircraft model to run.
+        base_case (SimulationCase): Case providing every field except the swept one.
+        field (str): SimulationCase attribute to sweep.
+        lo, hi (float): Sweep limits.
+        results_dir (str): Directory for the generated decks and results.
+        initial (int): Number of evenly spaced starting points.
+        tolerances (dict): {output name: allowed absolute deviation}; defaults to SWEEP_TOLERANCES.
+        crossing_keys (tuple): Outputs whose sign changes are bracketed tightly.
+        min_width (float): Narrowest interval that is still bisected.
+        max_depth (int): Maximum number of refinement levels.
+        prefix (str): Prefix of the generated case and job names.
+        **batch_options: Passed to `batch.run_batch` (solver, avl_exe_path, ...).
+
+    Returns:
+        dict: {"x": sorted sample values, "results": parsed values per sample, "runs": number of cases run}.
+    """
+    tolerances = tolerances or SWEEP_TOLERANCES
+    samples = {}
+
+    def evaluate(values, level):
+        cases = sweep_cases(base_case, field, values, prefix)
+        results = run_batch(aircraft, cases, results_dir, prefix=f"{prefix}_L{level}", **batch_options)
+        for value, case in zip(values, cases):
+            samples[float(value)] = results.get(case.name, {})
+
+    evaluate(np.linspace(lo, hi, initial), 0)
+    xs = sorted(samples)
+    active = list(zip(xs[:-1], xs[1:]))
+
+    for level in range(1, max_depth + 1):
+        active = [(a, b) for a, b in active if b - a > min_width]
+        if not active:
+            break
+
+        midpoints = [0.5 * (a + b) for a, b in active]
+        evaluate(midpoints, level)
+
+        refined = []
+        for (a, b), m in zip(active, midpoints):
+            deviation = interval_deviation(samples[a], samples[m], samples[b], tolerances)
+            if deviation > 1.0:
+                refined.extend([(a, m), (m, b)])
+                continue
+            for half in ((a, m), (m, b)):
+                if has_crossing(samples[half[0]], samples[half[1]], crossing_keys):
+                    refined.append(half)
+        active = refined
+
+    xs = sorted(samples)
+    return {"x": np.array(xs), "results": [samples[x] for x in xs], "runs": len(xs)}
@@ -1,8 +1,11 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from models import aircraft
-from backend import write_mass_file, write_run_file, write_avl_file
-from runner import run_avl
+from batch import run_batch, batch_jobnames
+from mass import mass_summary
+from snapshot import snapshot
+from archive import ResultArchive, maintain_results, read_job_text, ARCHIVE_FILE
+from store import ResultStore, TABLE_COLUMNS
 import os
 
 # Provide a global reference so workspace can inject this
@@ -121,6 +124,8 @@ class AnalysisTab:
         row += 1
         self.mass_listbox = tk.Listbox(self.tab_frame, height=5)
         self.mass_listbox.grid(column=1, row=row+2)
+        self.mass_summary = ttk.Label(self.tab_frame, text="", justify="left")
+        self.mass_summary.grid(column=1, row=row+3, rowspan=3, sticky="nw")
         row += 1
 
         self.add_case_button = ttk.Button(self.tab_frame, text="Add Case", command=self.add_case)
@@ -179,20 +184,22 @@ class AnalysisTab:
             messagebox.showerror("No Case Selected", "Please add at least one case to run.")
             return
 
-        case_name = selected_cases[0]
-        if case_name not in aircraft.simulation_cases:
-            messagebox.showerror("Invalid Case", f"Simulation case '{case_name}' not found.")
+        missing = [name for name in selected_cases if name not in aircraft.simulation_cases]
+        if missing:
+            messagebox.showerror("Invalid Case", f"Simulation case '{missing[0]}' not found.")
             return
 
-        sim_case = aircraft.simulation_cases[case_name]
+        # The job runs on a snapshot, so later edits in the UI cannot change it mid-run
+        snap = snapshot(aircraft)
+        sim_cases = [snap.simulation_cases[name] for name in selected_cases]
         results_dir = "results"
 
         try:
-            write_mass_file(job_name, aircraft, sim_case, os.path.join(results_dir, f"{job_name}.mass"))
-            write_run_file(job_name, sim_case, os.path.join(results_dir, f"{job_name}.run"))
-            write_avl_file(job_name, aircraft, sim_case, None, os.path.join(results_dir, f"{job_name}.avl"))
-            run_avl(job_name, results_dir)
-            aircraft.session_jobs.add(job_name)
+            run_batch(snap, sim_cases, results_dir, prefix=job_name)
+            aircraft.session_jobs.update(batch_jobnames(job_name, sim_cases).values())
+            # Index before archiving, while the .run decks are still on disk
+            ResultStore(results_dir).update()
+            maintain_results(results_dir)
             parent = self.tab_frame.master
             if hasattr(parent, 'results_tab'):
                 parent.results_tab.refresh_job_list()
@@ -207,6 +214,7 @@ class AnalysisTab:
         self.mass_listbox.delete(0, tk.END)
         for name in aircraft.mass_properties:
             self.mass_listbox.insert(tk.END, name)
+        self.mass_summary.config(text=mass_summary(aircraft))
 
         self.existing_cases.delete(0, tk.END)
         for name in aircraft.simulation_cases:
@@ -234,6 +242,8 @@ class AnalysisTab:
 
 
 class ResultsTab:
+    PAGE_SIZE = 200
+
     def __init__(self, parent_frame):
         self.tab_frame = ttk.Frame(parent_frame, padding="10")
         parent_frame.add(self.tab_frame, text="Results")
@@ -264,32 +274,93 @@ class ResultsTab:
         self.mode_combo.bind("<<ComboboxSelected>>", self.update_mode)
 
         ttk.Label(self.tab_frame, text="Existing Jobs").grid(column=2, row=2, sticky="w")
-        self.job_listbox = tk.Listbox(self.tab_frame, height=15, width=40)
-        self.job_listbox.grid(column=2, row=3, padx=5)
+
+        filter_frame = ttk.Frame(self.tab_frame)
+        filter_frame.grid(column=2, row=3, padx=5, sticky="ew")
+        self.filter_var = tk.StringVar()
+        filter_entry = ttk.Entry(filter_frame, textvariable=self.filter_var, width=30)
+        filter_entry.grid(row=0, column=0, sticky="ew")
+        filter_entry.bind("<Return>", lambda event: self.reload_jobs())
+        ttk.Button(filter_frame, text="Filter", command=self.reload_jobs).grid(row=0, column=1, padx=(5, 0))
+        self.session_only = tk.BooleanVar(value=True)
+        ttk.Checkbutton(filter_frame, text="Session jobs only", variable=self.session_only,
+                        command=self.reload_jobs).grid(row=1, column=0, columnspan=2, sticky="w")
+        filter_frame.columnconfigure(0, weight=1)
+
+        # Rows are paged in from the results index as the table is scrolled
+        tree_frame = ttk.Frame(self.tab_frame)
+        tree_frame.grid(column=2, row=4, padx=5, sticky="nsew")
+        self.job_tree = ttk.Treeview(tree_frame, columns=TABLE_COLUMNS, show="headings", height=15,
+                                     selectmode="browse")
+        for column in TABLE_COLUMNS:
+            self.job_tree.heading(column, text=column, command=lambda c=column: self.sort_jobs(c))
+            self.job_tree.column(column, width=120 if column == "job" else 60, anchor="w" if column == "job" else "e")
+        self.job_tree.grid(row=0, column=0, sticky="nsew")
+        self.tree_scroll = ttk.Scrollbar(tree_frame, orient="vertical", command=self.job_tree.yview)
+        self.tree_scroll.grid(row=0, column=1, sticky="ns")
+        self.job_tree.config(yscrollcommand=self.on_tree_scroll)
 
         self.action_button = ttk.Button(self.tab_frame, text="Display", command=self.handle_action)
-        self.action_button.grid(column=2, row=4, pady=5)
+        self.action_button.grid(column=2, row=5, pady=5)
 
+        self.sort_column, self.sort_descending = None, False
+        self.loaded, self.total = 0, 0
         self.refresh_job_list()
 
     def update_mode(self, event):
         self.action_button.config(text="Display" if self.mode_var.get() == "Access" else "Delete")
 
     def refresh_job_list(self):
-        self.job_listbox.delete(0, tk.END)
-        for file in os.listdir("results"):
-            if file.endswith(".sim"):
-                jobname = os.path.splitext(file)[0]
-                if jobname in aircraft.session_jobs:
-                    self.job_listbox.insert(tk.END, jobname)
+        # Index new results (on disk or archived) before listing them
+        ResultStore("results").update()
+        self.reload_jobs()
+
+    def reload_jobs(self):
+        jobs = aircraft.session_jobs if self.session_only.get() else None
+        try:
+            self.total = ResultStore("results").count(self.filter_var.get(), jobs=jobs)
+        except ValueError as e:
+            messagebox.showerror("Invalid Filter", str(e))
+            return
+        self.job_tree.delete(*self.job_tree.get_children())
+        self.loaded = 0
+        self.load_jobs()
+
+    def load_jobs(self):
+        if self.loaded >= self.total:
+            return
+        jobs = aircraft.session_jobs if self.session_only.get() else None
+        rows = ResultStore("results").query(TABLE_COLUMNS, self.filter_var.get(), self.sort_column,
+                                            self.sort_descending, limit=self.PAGE_SIZE, offset=self.loaded, jobs=jobs)
+        for row in rows:
+            values = [row[0]] + ["" if value is None else f"{value:.4f}" for value in row[1:]]
+            self.job_tree.insert("", tk.END, iid=row[0], values=values)
+        self.loaded += len(rows)
+        if len(rows) < self.PAGE_SIZE:
+            self.total = self.loaded
+
+    def on_tree_scroll(self, first, last):
+        self.tree_scroll.set(first, last)
+        if float(last) > 0.9:
+            self.load_jobs()
+
+    def sort_jobs(self, column):
+        if self.sort_column == column:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_column, self.sort_descending = column, False
+        for name in TABLE_COLUMNS:
+            arrow = (" \u25bc" if self.sort_descending else " \u25b2") if name == column else ""
+            self.job_tree.heading(name, text=name + arrow)
+        self.reload_jobs()
 
     def handle_action(self):
-        selected = self.job_listbox.curselection()
+        selected = self.job_tree.selection()
         if not selected:
             messagebox.showwarning("No Selection", "Please select a job.")
             return
 
-        job_name = self.job_listbox.get(selected[0])
+        job_name = selected[0]
         sim_path = os.path.join("results", job_name + ".sim")
 
         if self.mode_var.get() == "Access":
@@ -299,8 +370,8 @@ class ResultsTab:
 
     def display_job(self, filepath):
         try:
-            with open(filepath, 'r') as file:
-                content = file.read()
+            jobname = os.path.splitext(os.path.basename(filepath))[0]
+            content = read_job_text(os.path.dirname(filepath), jobname)
             self.output_text.config(state='normal')
             self.output_text.delete(1.0, tk.END)
             self.output_text.insert(tk.END, content)
@@ -313,7 +384,12 @@ class ResultsTab:
         confirm = messagebox.askyesno("Delete File", f"Are you sure you want to delete the following file: {filename}?")
         if confirm:
             try:
-                os.remove(filepath)
+                # A job rerun after archiving exists in both places
+                results_dir = os.path.dirname(filepath)
+                if os.path.exists(filepath):
+                    os.remove(filepath)
+                if os.path.exists(os.path.join(results_dir, ARCHIVE_FILE)):
+                    ResultArchive(results_dir).delete([os.path.splitext(filename)[0]])
                 self.refresh_job_list()
                 self.output_text.config(state='normal')
                 self.output_text.delete(1.0, tk.END)
@@ -0,0 +1,19 @@
+from models import SimulationCase
+from backend import write_multi_run_file
+from archive import ResultArchive
+
+
+def test_session_decks_are_removed_with_their_last_job(tmp_path):
+    cases = [SimulationCase("a", Mach=0.1), SimulationCase("b", Mach=0.1)]
+    write_multi_run_file(["s_a", "s_b"], cases, str(tmp_path / "s.run"))
+    (tmp_path / "s.avl").write_text("s\n")
+    for job in ("s_a", "s_b", "single"):
+        (tmp_path / f"{job}.sim").write_text("  CLtot =   0.50000\n")
+
+    archive = ResultArchive(str(tmp_path))
+    assert archive.archive_jobs(["s_a"]) == ["s_a"]
+    assert (tmp_path / "s.run").exists() and (tmp_path / "s.avl").exists()
+
+    assert sorted(archive.archive_jobs()) == ["s_b", "single"]
+    assert not (tmp_path / "s.run").exists() and not (tmp_path / "s.avl").exists()
+    assert archive.read("s_a", "s.run") == archive.read("s_b", "s.run")
@@ -0,0 +1,30 @@
+import os
+from models import Aircraft, GeometrySurface, SimulationCase
+from batch import run_batch, CACHE_DIR
+
+
+def _wing() -> Aircraft:
+    aircraft = Aircraft(units="MKS", Sref=1.0, Cref=0.25, Bref=4.0)
+    wing = GeometrySurface("wing")
+    wing.naca_airfoil = "2412"
+    wing.sections = [{"Span": "2.0", "Taper": "1.0", "Root C": "0.25", "LE Sweep": "0", "Dihedral": "0",
+                      "ChordMode": "Taper+Root", "SweepMode": "LE"}]
+    aircraft.geometry = {"wing": wing}
+    return aircraft
+
+
+def test_failed_avl_run_is_not_cached(tmp_path):
+    avl = tmp_path / "failing_avl"
+    avl.write_text("#!/bin/sh\nexit 1\n")
+    avl.chmod(0o755)
+    stale = tmp_path / "job.sim"
+    stale.write_text("  CLtot =   9.99000\n")
+
+    cases = [SimulationCase("cruise", Mach=0.05, aoa_val=3.0)]
+    for _ in range(2):
+        results = run_batch(_wing(), cases, str(tmp_path), prefix="job", avl_exe_path=str(avl), cache=True)
+        assert "CLtot" not in results["cruise"]
+        assert not stale.exists()
+
+    cache_dir = tmp_path / CACHE_DIR
+    assert not cache_dir.exists() or not [name for name in os.listdir(cache_dir) if name.endswith(".sim")]
@@ -0,0 +1,32 @@
+import csv
+import numpy as np
+from models import SimulationCase
+from backend import write_multi_run_file
+from output_parser import STRIP_DTYPE
+from archive import ResultArchive
+from export import export_results
+
+
+def _session(results_dir):
+    cases = [SimulationCase("a", Mach=0.1, aoa_val=2.0), SimulationCase("b", Mach=0.1, aoa_val=4.0)]
+    write_multi_run_file(["s_a", "s_b"], cases, str(results_dir / "s.run"))
+    for job, cl in (("s_a", 0.25), ("s_b", 0.5)):
+        (results_dir / f"{job}.sim").write_text(f"  CLtot =   {cl:.5f}\n")
+        np.save(results_dir / f"{job}_strips.npy", np.zeros(3, dtype=STRIP_DTYPE))
+
+
+def test_export_includes_archived_jobs(tmp_path):
+    _session(tmp_path)
+    assert ResultArchive(str(tmp_path)).archive_jobs(["s_a"]) == ["s_a"]
+    assert not (tmp_path / "s_a.sim").exists()
+
+    for ext in (".csv", ".npz"):
+        summary = export_results(str(tmp_path), str(tmp_path / f"export{ext}"))
+        assert summary["rows"] == 2 and summary["strip_rows"] == 6
+
+    with open(tmp_path / "export.csv", newline="") as f:
+        rows = {row["job"]: row for row in csv.DictReader(f)}
+    assert float(rows["s_a"]["CLtot"]) == 0.25
+    assert float(rows["s_a"]["aoa_val"]) == 2.0
+    assert rows["s_a"]["run_file"] == "s.run"
+    assert float(rows["s_b"]["aoa_val"]) == 4.0
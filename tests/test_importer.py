@@ -0,0 +1,49 @@
+from models import Aircraft, GeometrySurface, SimulationCase
+from backend import write_avl_file
+from importer import read_avl
+
+
+def _swept_wing() -> Aircraft:
+    aircraft = Aircraft(units="MKS", Sref=10.0, Cref=1.0, Bref=10.0)
+    wing = GeometrySurface("wing")
+    wing.naca_airfoil = "2412"
+    wing.sections = [
+        {"Span": "2.5", "Taper": "1.0", "Root C": "1.0", "LE Sweep": "0", "Dihedral": "0",
+         "ChordMode": "Taper+Root", "SweepMode": "LE"},
+        {"Span": "2.5", "Taper": "0.5", "Root C": "1.0", "LE Sweep": "20", "Dihedral": "3",
+         "ChordMode": "Taper+Root", "SweepMode": "LE"},
+    ]
+    wing.control_surfaces = [{"Hinge Loc": "0.75", "Inboard Loc": "0.5", "Outboard Loc": "0.9",
+                              "Control Type": "Aileron", "Control Name": "wing_aileron_1"}]
+    aircraft.geometry = {"wing": wing}
+    return aircraft
+
+
+def _stations(path) -> list:
+    """Returns [(Xle, Yle, Zle, chord, ainc, has CONTROL)] per SECTION of a deck."""
+    with open(path, "r") as f:
+        lines = [line.strip() for line in f]
+    stations = []
+    for i, line in enumerate(lines):
+        if line == "SECTION":
+            stations.append([float(v) for v in lines[i + 1].split()] + [False])
+        elif line == "CONTROL":
+            stations[-1][-1] = True
+    return stations
+
+
+def test_control_on_section_tip_survives_round_trip(tmp_path):
+    case = SimulationCase("cruise", Mach=0.1)
+    first, second = tmp_path / "first.avl", tmp_path / "second.avl"
+
+    write_avl_file("first", _swept_wing(), case, None, str(first))
+    imported, _ = read_avl(str(first))
+    write_avl_file("second", imported, case, None, str(second))
+
+    original, rewritten = _stations(first), _stations(second)
+    # Inboard aileron end sits on the kink at 2.5, outboard end at 4.5
+    assert [round(s[1], 3) for s in original if s[-1]] == [2.5, 4.494]
+    assert len(rewritten) == len(original)
+    for a, b in zip(original, rewritten):
+        assert a[-1] == b[-1]
+        assert all(abs(x - y) <= 1e-4 for x, y in zip(a[:-1], b[:-1]))
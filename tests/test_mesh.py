@@ -0,0 +1,41 @@
+from models import Aircraft, GeometrySurface
+from mesh import mesh_error, allocate_panels
+
+
+def test_near_zero_cm_reference_converges():
+    # Trimmed reference: Cm is almost zero, so a 1e-4 change must not count as 100 %
+    reference = {"CLtot": 0.5, "Cmtot": 1e-4, "CLa": 5.0, "Cma": -1.2}
+    values = {"CLtot": 0.501, "Cmtot": 2e-4, "CLa": 5.01, "Cma": -1.203}
+    assert mesh_error(values, reference) <= 0.005
+
+
+def test_large_deviation_is_not_converged():
+    reference = {"CLtot": 0.5, "Cmtot": 1e-4, "CLa": 5.0, "Cma": -1.2}
+    values = {"CLtot": 0.5, "Cmtot": 0.01, "CLa": 5.0, "Cma": -1.2}
+    assert mesh_error(values, reference) > 0.005
+    assert mesh_error({}, reference) == float("inf")
+
+
+def _aircraft(spans):
+    aircraft = Aircraft(units="MKS", Sref=1.0, Cref=0.25, Bref=4.0)
+    for i, (span, chord) in enumerate(spans):
+        surface = GeometrySurface(f"s{i}")
+        surface.sections = [{"Span": str(span), "Taper": "1.0", "Root C": str(chord), "LE Sweep": "0",
+                             "Dihedral": "0", "ChordMode": "Taper+Root", "SweepMode": "LE"}]
+        aircraft.geometry[surface.name] = surface
+    return aircraft
+
+
+def test_allocation_trims_other_surfaces_once_densest_is_at_bounds():
+    # The tail is the densest surface but already at min_span; the wing must absorb the rest
+    aircraft = _aircraft([(2.0, 0.3), (0.5, 0.5)])
+    mesh = allocate_panels(aircraft, budget=400, min_span=20)
+    assert 2 * sum(nc * ns for nc, _, ns, _ in mesh.values()) <= 400
+    assert all(ns >= 20 for _, _, ns, _ in mesh.values())
+
+
+def test_allocation_warns_when_bounds_exceed_budget(capsys):
+    aircraft = _aircraft([(2.0, 1.0), (1.0, 0.5)])
+    mesh = allocate_panels(aircraft, budget=100, min_chord=4, min_span=8)
+    assert all(nc == 4 and ns == 8 for nc, _, ns, _ in mesh.values())
+    assert "Warning:" in capsys.readouterr().out
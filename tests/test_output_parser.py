@@ -0,0 +1,91 @@
+import numpy as np
+from output_parser import parse_avl_values, parse_sim_text, parse_strip_forces
+
+# Stability-axis derivative block as printed by AVL's "st" command
+ST_OUTPUT = """
+ ---------------------------------------------------------------
+ Vortex Lattice Output -- Total Forces
+
+ Configuration: PAVL
+     # Surfaces =   4
+     # Strips   =  48
+     # Vortices = 384
+
+  Sref = 0.50000       Cref = 0.25000       Bref =  2.0000
+  Xref = 0.10000       Yref =  0.0000       Zref =  0.0000
+
+ Standard axis orientation,  X fwd, Z down
+
+ Run case:  cruise
+
+  Alpha =   2.00000     pb/2V =  -0.00000     p'b/2V =  -0.00000
+  Beta  =   0.00000     qc/2V =   0.00000
+  Mach  =     0.000     rb/2V =  -0.00000     r'b/2V =  -0.00000
+
+  CXtot =  -0.00512     Cltot =  -0.00000     Cl'tot =  -0.00000
+  CYtot =  -0.00000     Cmtot =  -0.05171
+  CZtot =  -0.51005     Cntot =  -0.00000     Cn'tot =  -0.00000
+
+  CLtot =   0.51155
+  CDtot =   0.01293
+  CDvis =   0.00000     CDind =   0.01293
+  CLff  =   0.51120     CDff  =   0.01281    | Trefftz
+  CYff  =  -0.00000         e =    0.9870    | Plane
+
+ ---------------------------------------------------------------
+
+ Stability-axis derivatives...
+
+                             alpha                beta
+                  ----------------     ----------------
+ z' force CL |    CLa =   5.132000    CLb =  -0.000000
+ y  force CY |    CYa =  -0.000000    CYb =  -0.254000
+ x' mom.  Cl'|    Cla =  -0.000000    Clb =  -0.023510
+ y  mom.  Cm |    Cma =  -1.180000    Cmb =  -0.000000
+ z' mom.  Cn'|    Cna =   0.000000    Cnb =   0.070920
+
+                     roll rate  p'      pitch rate  q'        yaw rate  r'
+                  ----------------   ----------------   ----------------
+ z' force CL |    CLp =  -0.000000    CLq =   7.010000    CLr =  -0.000000
+ y  force CY |    CYp =  -0.110000    CYq =  -0.000000    CYr =   0.190000
+ x' mom.  Cl'|    Clp =  -0.520000    Clq =  -0.000000    Clr =   0.118000
+ y  mom.  Cm |    Cmp =   0.000000    Cmq = -12.400000    Cmr =   0.000000
+ z' mom.  Cn'|    Cnp =  -0.021000    Cnq =  -0.000000    Cnr =  -0.040750
+
+ Neutral point  Xnp =   0.331200
+
+ Clb Cnr / Clr Cnb  =   0.579566    (  > 1 if spirally stable )
+"""
+
+
+def test_spiral_ratio_does_not_overwrite_cnb():
+    values = parse_avl_values(ST_OUTPUT)
+    assert values["Cnb"] == 0.070920
+    assert values["Clr"] == 0.118000
+    assert values["Cnr"] == -0.040750
+
+
+def test_st_block_values():
+    values = parse_sim_text(ST_OUTPUT)
+    assert values["Alpha"] == 2.0
+    assert values["pb/2V"] == 0.0
+    assert values["CLtot"] == 0.51155
+    assert values["e"] == 0.9870
+    assert values["CLa"] == 5.132
+    assert values["Cmq"] == -12.4
+    assert values["Xnp"] == 0.3312
+
+
+def test_overflowed_strip_fields_are_nan():
+    text = """
+  Surface # 1     Wing
+     j     Xle      Yle      Zle      Chord     Area     c cl      ai      cl_norm  cl       cd       cdv    cm_c/4    cm_LE  C.P.x/c
+     1   0.0000   0.0500   0.0000   0.2500   0.0250   0.1300  -0.0200   0.5200   0.5200   0.0000   0.0000  -0.0100  -0.1400   0.270
+     2   0.0000   0.1500   0.0000   0.2500   0.0250   0.1290  -0.0210   0.5160   0.5160   0.0000   0.0000  -0.0100  -0.1390 *******
+     3   0.0000   0.2500   0.0000   0.2500   0.0250   0.1280********   0.5120   0.5120   0.0000   0.0000  -0.0100  -0.1380   0.270
+"""
+    strips = parse_strip_forces(text)
+    assert list(strips["strip"]) == [1, 2, 3]
+    assert np.isnan(strips["cp_xc"][1])
+    assert np.isnan(strips["ai"][2])
+    assert strips["cl"][2] == np.float32(0.512)
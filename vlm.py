@@ -0,0 +1,566 @@
+import numpy as np
+from models import Aircraft, SimulationCase
+from backend import compute_total_span, compute_section_stations, get_surface_mesh
+
+try:
+    from scipy.linalg import lu_factor, lu_solve
+except ImportError:  # scipy is optional; fall back to an explicit inverse
+    lu_factor = lu_solve = None
+
+# Control types whose YDUPLICATE image deflects antisymmetrically (SgnDup = -1 in the deck)
+ANTISYMMETRIC_CONTROLS = ("aileron",)
+
+# Variables perturbed for stability derivatives, with their AVL suffix and step size
+DERIVATIVE_VARIABLES = (("alpha", "a", np.radians(0.5)), ("beta", "b", np.radians(0.5)),
+                        ("pb2V", "p", 0.01), ("qc2V", "q", 0.01), ("rb2V", "r", 0.01))
+
+# Force and moment coefficients reported per derivative variable
+DERIVATIVE_COEFFICIENTS = ("CL", "CY", "Cl", "Cm", "Cn")
+
+
+def spacing(n: int, param: float) -> np.ndarray:
+    """
+    Returns n+1 node fractions on [0, 1] following AVL's Cspace/Sspace convention:
+    0 = equal, 1 = cosine, 2 = sine (bunched at start), -2 = -sine (bunched at end),
+    3 = equal, with linear blending in between.
+    """
+    t = np.linspace(0.0, 1.0, n + 1)
+    cosine = 0.5 * (1.0 - np.cos(np.pi * t))
+    sine = np.sin(0.5 * np.pi * t) if param < 0 else 1.0 - np.cos(0.5 * np.pi * t)
+
+    p = abs(param)
+    if p <= 1.0:
+        return (1.0 - p) * t + p * cosine
+    if p <= 2.0:
+        return (2.0 - p) * cosine + (p - 1.0) * sine
+    f = min(p - 2.0, 1.0)
+    return (1.0 - f) * sine + f * t
+
+
+def naca_camber_slope(naca: str, xc: np.ndarray) -> np.ndarray:
+    """
+    Returns the mean-line slope dz/dx of a NACA 4-digit airfoil at chord fractions `xc`.
+    Anything other than a 4-digit designation is treated as a flat plate.
+    """
+    digits = str(naca).strip()
+    if len(digits) != 4 or not digits.isdigit():
+        return np.zeros_like(xc)
+
+    m = int(digits[0]) / 100.0
+    p = int(digits[1]) / 10.0
+    if m == 0.0 or p == 0.0:
+        return np.zeros_like(xc)
+
+    return np.where(xc < p,
+                    2.0 * m / p**2 * (p - xc),
+                    2.0 * m / (1.0 - p)**2 * (p - xc))
+
+
+def _segment_velocity(points, a, b, eps=1e-10):
+    """
+    Velocity induced at `points` (P, 1, 3) by unit-strength segments a -> b (1, V, 3).
+    Returns (P, V, 3).
+    """
+    r1 = points - a
+    r2 = points - b
+    cross = np.cross(r1, r2)
+    cross_sq = np.einsum("...k,...k->...", cross, cross)
+    n1 = np.linalg.norm(r1, axis=-1)
+    n2 = np.linalg.norm(r2, axis=-1)
+    r0 = b - a
+    dot = np.einsum("...k,...k->...", r0, r1) / np.maximum(n1, eps) \
+        - np.einsum("...k,...k->...", r0, r2) / np.maximum(n2, eps)
+    factor = np.where(cross_sq > eps, dot / (4.0 * np.pi * np.maximum(cross_sq, eps)), 0.0)
+    return cross * factor[..., None]
+
+
+def _trailing_velocity(points, a, direction, eps=1e-10):
+    """
+    Velocity induced at `points` (P, 1, 3) by unit-strength semi-infinite vortices
+    running from `a` (1, V, 3) to infinity along `direction`. Returns (P, V, 3).
+    """
+    r = points - a
+    cross = np.cross(direction, r)
+    cross_sq = np.einsum("...k,...k->...", cross, cross)
+    nr = np.linalg.norm(r, axis=-1)
+    along = np.einsum("...k,k->...", r, direction)
+    factor = np.where(cross_sq > eps,
+                      (1.0 + along / np.maximum(nr, eps)) / (4.0 * np.pi * np.maximum(cross_sq, eps)),
+                      0.0)
+    return cross * factor[..., None]
+
+
+def horseshoe_velocity(points: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Influence of unit horseshoe vortices (bound leg a -> b, trailing legs to +x)
+    at `points`. Returns an array of shape (len(points), len(a), 3).
+    """
+    x_axis = np.array([1.0, 0.0, 0.0])
+    p = points[:, None, :]
+    a = a[None, :, :]
+    b = b[None, :, :]
+    return (_segment_velocity(p, a, b)
+            + _trailing_velocity(p, b, x_axis)
+            - _trailing_velocity(p, a, x_axis))
+
+
+class VortexLattice:
+    """
+    Horseshoe-vortex model of an aircraft built from the same section stations
+    that `backend.write_section_block` writes to the AVL deck.
+
+    Axes follow AVL: x aft, y right, z up. The influence matrix is factored once
+    per Mach number; every flight condition only changes the right-hand side.
+    """
+
+    def __init__(self, aircraft: Aircraft, mesh: dict = None, mach: float = 0.0, ref_point=None):
+        if aircraft.Sref <= 0 or aircraft.Cref <= 0 or aircraft.Bref <= 0:
+            raise ValueError("Sref, Cref, and Bref must be positive.")
+
+        self.Sref = float(aircraft.Sref)
+        self.Cref = float(aircraft.Cref)
+        self.Bref = float(aircraft.Bref)
+        self.mach = float(mach)
+        self.ref_point = np.asarray(ref_point if ref_point is not None else mass_center(aircraft), dtype=float)
+
+        self.control_names = sorted({
+            ctrl.get("Control Type", "Elevator")
+            for surface in aircraft.geometry.values()
+            for ctrl in surface.control_surfaces
+        })
+
+        self._build_panels(aircraft, mesh or {})
+        self._factorize()
+
+    # ---------------------------------------------------------------- geometry
+    def _build_panels(self, aircraft: Aircraft, mesh: dict):
+        a_pts, b_pts, cps, normals, hinges = [], [], [], [], []
+        strip_a, strip_b, strip_normal, strip_of_panel = [], [], [], []
+        n_controls = len(self.control_names)
+
+        for surface in aircraft.geometry.values():
+            if not surface.sections:
+                continue
+            total_span = compute_total_span(surface)
+            if total_span <= 0:
+                continue
+
+            stations = compute_section_stations(surface, total_span)
+            nchord, cspace, nspan, sspace = mesh.get(surface.name) or get_surface_mesh(surface)
+
+            station_span = np.array([s["span"] for s in stations])
+            offset = np.array([surface.x, surface.y, surface.z], dtype=float)
+            le = np.array([[s["Xle"], s["Yle"], s["Zle"]] for s in stations]) + offset
+            chord = np.array([s["chord"] for s in stations])
+            ainc = np.radians(np.array([s["ainc"] for s in stations]) + surface.incidence)
+
+            # Spanwise strip edges and chordwise panel fractions
+            edges = spacing(int(nspan), float(sspace)) * total_span
+            xc = spacing(int(nchord), float(cspace))
+            edge_le = np.column_stack([np.interp(edges, station_span, le[:, k]) for k in range(3)])
+            edge_chord = np.interp(edges, station_span, chord)
+            edge_ainc = np.interp(edges, station_span, ainc)
+
+            xc_bound = xc[:-1] + 0.25 * np.diff(xc)
+            xc_ctrl = xc[:-1] + 0.75 * np.diff(xc)
+            camber = -np.arctan(naca_camber_slope(surface.naca_airfoil, xc_ctrl))
+
+            surf_a, surf_b, surf_cp, surf_n, surf_h = [], [], [], [], []
+            surf_sa, surf_sb, surf_sn = [], [], []
+            for k in range(int(nspan)):
+                # Spanwise direction projected on the y-z plane and the local "up" vector
+                span_vec = edge_le[k + 1] - edge_le[k]
+                e = np.array([0.0, span_vec[1], span_vec[2]])
+                e /= np.linalg.norm(e)
+                up = np.cross([1.0, 0.0, 0.0], e)
+
+                def chord_dir(theta):
+                    return np.cos(theta) * np.array([1.0, 0.0, 0.0]) - np.sin(theta) * up
+
+                left = edge_le[k] + np.outer(xc_bound, edge_chord[k] * chord_dir(edge_ainc[k]))
+                right = edge_le[k + 1] + np.outer(xc_bound, edge_chord[k + 1] * chord_dir(edge_ainc[k + 1]))
+                cp_left = edge_le[k] + np.outer(xc_ctrl, edge_chord[k] * chord_dir(edge_ainc[k]))
+                cp_right = edge_le[k + 1] + np.outer(xc_ctrl, edge_chord[k + 1] * chord_dir(edge_ainc[k + 1]))
+
+                theta = 0.5 * (edge_ainc[k] + edge_ainc[k + 1]) + camber
+                n = np.cos(theta)[:, None] * up + np.sin(theta)[:, None] * np.array([1.0, 0.0, 0.0])
+
+                # Normal rotation per radian of each control type (TE down about the span axis)
+                s_mid = 0.5 * (edges[k] + edges[k + 1])
+                h = np.zeros((int(nchord), n_controls, 3))
+                for ctrl in surface.control_surfaces:
+                    try:
+                        inboard = float(ctrl["Inboard Loc"]) * total_span
+                        outboard = float(ctrl["Outboard Loc"]) * total_span
+                        hinge = float(ctrl["Hinge Loc"])
+                    except (KeyError, ValueError):
+                        continue
+                    if not inboard <= s_mid <= outboard:
+                        continue
+                    index = self.control_names.index(ctrl.get("Control Type", "Elevator"))
+                    aft = xc_ctrl > hinge
+                    h[aft, index] = np.cross(e, n[aft])
+
+                surf_a.append(left)
+                surf_b.append(right)
+                surf_cp.append(0.5 * (cp_left + cp_right))
+                surf_n.append(n)
+                surf_h.append(h)
+                surf_sa.append(edge_le[k])
+                surf_sb.append(edge_le[k + 1])
+                surf_sn.append(up)
+
+            surf_a = np.concatenate(surf_a)
+            surf_b = np.concatenate(surf_b)
+            surf_cp = np.concatenate(surf_cp)
+            surf_n = np.concatenate(surf_n)
+            surf_h = np.concatenate(surf_h)
+            surf_sa, surf_sb, surf_sn = np.array(surf_sa), np.array(surf_sb), np.array(surf_sn)
+
+            parts = [(surf_a, surf_b, surf_cp, surf_n, surf_h, surf_sa, surf_sb, surf_sn)]
+
+            # YDUPLICATE image; surfaces lying in the symmetry plane are not mirrored
+            if np.max(np.abs(np.concatenate([surf_a, surf_b])[:, 1])) > 1e-9:
+                mirror = np.array([1.0, -1.0, 1.0])
+                gains = np.ones(n_controls)
+                for i, name in enumerate(self.control_names):
+                    if name.lower() in ANTISYMMETRIC_CONTROLS:
+                        gains[i] = -1.0
+                parts.append((surf_b * mirror, surf_a * mirror, surf_cp * mirror, surf_n * mirror,
+                              surf_h * mirror * gains[None, :, None],
+                              surf_sb * mirror, surf_sa * mirror, surf_sn * mirror))
+
+            for pa, pb, pcp, pn, ph, psa, psb, psn in parts:
+                strip_offset = len(strip_a)
+                a_pts.append(pa)
+                b_pts.append(pb)
+                cps.append(pcp)
+                normals.append(pn)
+                hinges.append(ph)
+                strip_a.extend(psa)
+                strip_b.extend(psb)
+                strip_normal.extend(psn)
+                strip_of_panel.append(strip_offset + np.repeat(np.arange(len(psa)), int(nchord)))
+
+        if not a_pts:
+            raise ValueError("Aircraft has no surfaces to build a vortex lattice from.")
+
+        self.a = np.concatenate(a_pts)
+        self.b = np.concatenate(b_pts)
+        self.cp = np.concatenate(cps)
+        self.normal = np.concatenate(normals)
+        self.hinge = np.concatenate(hinges)
+        self.mid = 0.5 * (self.a + self.b)
+        self.bound = self.b - self.a
+
+        self.strip_a = np.array(strip_a)
+        self.strip_b = np.array(strip_b)
+        self.strip_normal = np.array(strip_normal)
+        self.strip_of_panel = np.concatenate(strip_of_panel)
+
+    # ---------------------------------------------------------------- solution
+    def _factorize(self):
+        # Prandtl-Glauert: solve the incompressible problem on the x-stretched geometry
+        beta_pg = np.sqrt(max(1.0 - self.mach**2, 1e-6))
+        stretch = np.array([1.0 / beta_pg, 1.0, 1.0])
+        velocity = horseshoe_velocity(self.cp * stretch, self.a * stretch, self.b * stretch)
+        self.aic = np.einsum("ijk,ik->ij", velocity, self.normal)
+
+        if lu_factor is not None:
+            self._lu = lu_factor(self.aic)
+            self._inverse = None
+        else:
+            self._lu = None
+            self._inverse = np.linalg.inv(self.aic)
+
+        # Trefftz-plane downwash per unit strip circulation (2D point vortices at strip edges)
+        centers = 0.5 * (self.strip_a + self.strip_b)[:, 1:]
+        def point_vortex(q):
+            d = centers[:, None, :] - q[None, :, :]
+            r2 = np.maximum(np.einsum("ijk,ijk->ij", d, d), 1e-12)
+            return np.stack([-d[..., 1], d[..., 0]], axis=-1) / (2.0 * np.pi * r2[..., None])
+        wake = point_vortex(self.strip_b[:, 1:]) - point_vortex(self.strip_a[:, 1:])
+        self.trefftz = np.einsum("ijk,ik->ij", wake, self.strip_normal[:, 1:])
+        self.strip_width = np.linalg.norm((self.strip_b - self.strip_a)[:, 1:], axis=1)
+
+    def solve(self, rhs: np.ndarray) -> np.ndarray:
+        """
+        Solves the lattice for one or many right-hand sides, shape (n_panels, m).
+        """
+        if self._lu is not None:
+            return lu_solve(self._lu, rhs)
+        return self._inverse @ rhs
+
+    def _onset(self, points, alpha, beta, rates):
+        """
+        Onset velocity (freestream minus rotation) at `points` for m conditions.
+        Returns (n_points, 3, m).
+        """
+        ca, sa = np.cos(alpha), np.sin(alpha)
+        cb, sb = np.cos(beta), np.sin(beta)
+        freestream = np.stack([ca * cb, -sb, sa * cb])  # (3, m)
+
+        # Non-dimensional stability-axis rates to AVL body-axis rotation vector (V = 1)
+        p = rates[0] * 2.0 / self.Bref
+        q = rates[1] * 2.0 / self.Cref
+        r = rates[2] * 2.0 / self.Bref
+        omega = np.stack([-(p * ca - r * sa), q, -(r * ca + p * sa)])  # (3, m)
+
+        rel = points - self.ref_point
+        rotation = np.cross(omega.T[None, :, :], rel[:, None, :])  # (n, m, 3)
+        return freestream[None, :, :] - np.transpose(rotation, (0, 2, 1))
+
+    def right_hand_side(self, alpha, beta, rates, deflections) -> np.ndarray:
+        """
+        Builds the normal-flow right-hand sides for m conditions.
+
+        Parameters:
+            alpha, beta (array): Angles in radians, shape (m,).
+            rates (array): (pb/2V, qc/2V, rb/2V), shape (3, m).
+            deflections (array): Control deflections in degrees, shape (n_controls, m).
+        """
+        onset = self._onset(self.cp, alpha, beta, rates)
+        normal = self.normal[:, :, None] + np.einsum("ick,cm->ikm", self.hinge, np.radians(deflections))
+        return -np.einsum("ikm,ikm->im", onset, normal)
+
+    def coefficients(self, gamma, alpha, beta, rates) -> dict:
+        """
+        Integrates force and moment coefficients for m solved conditions.
+        Forces use Kutta-Joukowski on the bound legs; induced drag is taken in the Trefftz plane.
+        """
+        onset = self._onset(self.mid, alpha, beta, rates)
+        force = gamma[:, None, :] * np.cross(onset, self.bound[:, :, None], axis=1)  # (n, 3, m)
+        arm = self.mid - self.ref_point
+        moment = np.cross(arm[:, :, None], force, axis=1)
+
+        total_force = 2.0 * force.sum(axis=0) / self.Sref
+        total_moment = 2.0 * moment.sum(axis=0) / self.Sref
+
+        ca, sa = np.cos(alpha), np.sin(alpha)
+        strip_gamma = np.zeros((len(self.strip_a), gamma.shape[1]))
+        np.add.at(strip_gamma, self.strip_of_panel, gamma)
+        downwash = self.trefftz @ strip_gamma
+        cdff = -np.sum(strip_gamma * downwash * self.strip_width[:, None], axis=0) / self.Sref
+
+        return {
+            "CL": -total_force[0] * sa + total_force[2] * ca,
+            "CY": total_force[1],
+            "CDff": cdff,
+            "Cl": -(total_moment[0] * ca + total_moment[2] * sa) / self.Bref,
+            "Cm": total_moment[1] / self.Cref,
+            "Cn": -(-total_moment[0] * sa + total_moment[2] * ca) / self.Bref,
+        }
+
+    def evaluate(self, alpha, beta, rates, deflections) -> dict:
+        """
+        Solves and integrates m conditions at once (see `right_hand_side` for shapes).
+        """
+        gamma = self.solve(self.right_hand_side(alpha, beta, rates, deflections))
+        return self.coefficients(gamma, alpha, beta, rates)
+
+
+def mass_center(aircraft: Aircraft) -> np.ndarray:
+    """
+    Returns the mass-weighted centre of the aircraft's mass items, or the origin if there are none.
+    """
+    total = sum(prop.mass for prop in aircraft.mass_properties.values())
+    if total <= 0:
+        return np.zeros(3)
+    return np.array([
+        sum(prop.mass * getattr(prop, axis) for prop in aircraft.mass_properties.values()) / total
+        for axis in ("x", "y", "z")
+    ])
+
+
+# SimulationCase constraint targets: (mode attribute, value attribute, control, {mode: coefficient})
+TRIM_CONSTRAINTS = (
+    ("aoa_mode", "aoa_val", "alpha", {"CL": "CL", "Cm": "Cm"}),
+    ("elevator_mode", "elevator_val", "Elevator", {"Cm": "Cm"}),
+    ("aileron_mode", "aileron_val", "Aileron", {"Cl": "Cl"}),
+    ("rudder_mode", "rudder_val", "Rudder", {"Cn": "Cn"}),
+)
+
+
+def _case_state(lattice: VortexLattice, case: SimulationCase):
+    """
+    Returns the fixed condition of a case and its trim constraints as
+    (alpha [rad], beta [rad], rates (3,), deflections (n_controls,), [(variable, coefficient, target)]).
+    """
+    alpha = np.radians(case.aoa_val) if case.aoa_mode == "Angle" else 0.0
+    rates = np.array([case.pb2V, case.qc2V, case.rb2V], dtype=float)
+    deflections = np.zeros(len(lattice.control_names))
+    constraints = []
+
+    for mode_attr, val_attr, variable, targets in TRIM_CONSTRAINTS:
+        mode = getattr(case, mode_attr, None)
+        value = getattr(case, val_attr, None)
+        if mode is None or value is None:
+            continue
+        if mode == "Deflection" and variable in lattice.control_names:
+            deflections[lattice.control_names.index(variable)] = value
+        elif mode in targets:
+            if variable != "alpha" and variable not in lattice.control_names:
+                raise ValueError(f"Case '{case.name}' trims with {variable}, which the aircraft does not have.")
+            constraints.append((variable, targets[mode], float(value)))
+
+    if getattr(case, "flap_mode", None) == "Deflection" and case.flap_val is not None and "Flap" in lattice.control_names:
+        deflections[lattice.control_names.index("Flap")] = case.flap_val
+
+    return alpha, np.radians(case.beta), rates, deflections, constraints
+
+
+def _perturb(state, variable, step, lattice):
+    """
+    Returns a copy of an (alpha, beta, rates, deflections) column state with one variable shifted.
+    """
+    alpha, beta, rates, deflections = (np.array(x, dtype=float, copy=True) for x in state)
+    if variable == "alpha":
+        alpha += step
+    elif variable == "beta":
+        beta += step
+    elif variable in ("pb2V", "qc2V", "rb2V"):
+        rates[("pb2V", "qc2V", "rb2V").index(variable)] += step
+    else:
+        deflections[lattice.control_names.index(variable)] += step
+    return alpha, beta, rates, deflections
+
+
+def _evaluate_columns(lattice, columns):
+    """
+    Evaluates a list of (alpha, beta, rates, deflections) states in a single multi-RHS solve.
+    """
+    alpha = np.array([c[0] for c in columns], dtype=float)
+    beta = np.array([c[1] for c in columns], dtype=float)
+    rates = np.array([c[2] for c in columns], dtype=float).reshape(len(columns), 3).T
+    deflections = np.array([c[3] for c in columns], dtype=float).reshape(len(columns), len(lattice.control_names)).T
+    return lattice.evaluate(alpha, beta, rates, deflections)
+
+
+def _trim(lattice, states, constraints, iterations=8, tol=1e-8):
+    """
+    Newton iteration on all cases together; every iteration is one multi-RHS solve
+    containing each case's current state and its finite-difference perturbations.
+    """
+    steps = {"alpha": np.radians(0.5)}
+    for _ in range(iterations):
+        columns, layout = [], []
+        for i, (state, cons) in enumerate(zip(states, constraints)):
+            if not cons:
+                continue
+            layout.append((i, len(columns)))
+            columns.append(state)
+            for variable, _, _ in cons:
+                columns.append(_perturb(state, variable, steps.get(variable, 0.5), lattice))
+        if not columns:
+            return states
+
+        coefs = _evaluate_columns(lattice, columns)
+        converged = True
+        for i, start in layout:
+            cons = constraints[i]
+            residual = np.array([coefs[coef][start] - target for _, coef, target in cons])
+            jacobian = np.array([
+                [(coefs[coef][start + 1 + j] - coefs[coef][start]) / steps.get(variable, 0.5)
+                 for j, (variable, _, _) in enumerate(cons)]
+                for _, coef, _ in cons
+            ])
+            if np.max(np.abs(residual)) > tol:
+                converged = False
+            try:
+                delta = np.linalg.solve(jacobian, -residual)
+            except np.linalg.LinAlgError:
+                continue
+            state = states[i]
+            for (variable, _, _), d in zip(cons, delta):
+                state = _perturb(state, variable, d, lattice)
+            states[i] = state
+        if converged:
+            break
+    return states
+
+
+def solve_cases(aircraft: Aircraft, cases, mesh: dict = None, ref_point=None) -> dict:
+    """
+    Estimates AVL-style results for many cases with the in-process vortex lattice.
+
+    Cases are grouped by Mach; each group builds and factors one influence matrix
+    and solves every condition, trim iterate and derivative perturbation as extra
+    right-hand sides of that factorization.
+
+    Parameters:
+        aircraft (Aircraft): Aircraft model to analyse.
+        cases (iterable): SimulationCase objects.
+        mesh (dict): Optional {surface name: (Nchord, Cspace, Nspan, Sspace)} lattice override.
+        ref_point (array): Moment reference point; defaults to the mass centre.
+
+    Returns:
+        dict: {case name: values} using AVL output names (Alpha, CLtot, Cmtot, CLa, Cma, Xnp, ...).
+    """
+    cases = list(cases)
+    groups = {}
+    for case in cases:
+        groups.setdefault(round(float(case.Mach), 6), []).append(case)
+
+    results = {}
+    for mach, group in groups.items():
+        lattice = VortexLattice(aircraft, mesh, mach, ref_point)
+
+        states, constraints = [], []
+        for case in group:
+            alpha, beta, rates, deflections, cons = _case_state(lattice, case)
+            states.append((alpha, beta, rates, deflections))
+            constraints.append(cons)
+        states = _trim(lattice, states, constraints)
+
+        # Each case's final state followed by +/- perturbations for every derivative variable
+        variables = list(DERIVATIVE_VARIABLES) + [(name, f"d_{name}", 1.0) for name in lattice.control_names]
+        columns = []
+        for state in states:
+            columns.append(state)
+            for variable, _, step in variables:
+                columns.append(_perturb(state, variable, step, lattice))
+                columns.append(_perturb(state, variable, -step, lattice))
+        coefs = _evaluate_columns(lattice, columns)
+
+        width = 1 + 2 * len(variables)
+        for i, case in enumerate(group):
+            base = i * width
+            alpha, beta, rates, deflections = states[i]
+            values = {
+                "Alpha": float(np.degrees(alpha)),
+                "Beta": float(np.degrees(beta)),
+                "Mach": mach,
+                "pb/2V": float(rates[0]),
+                "qc/2V": float(rates[1]),
+                "rb/2V": float(rates[2]),
+                "CLtot": float(coefs["CL"][base]),
+                "CYtot": float(coefs["CY"][base]),
+                "Cltot": float(coefs["Cl"][base]),
+                "Cmtot": float(coefs["Cm"][base]),
+                "Cntot": float(coefs["Cn"][base]),
+                "CDff": float(coefs["CDff"][base]),
+                "CDtot": float(coefs["CDff"][base] + case.Cdo),
+            }
+            for name, value in zip(lattice.control_names, deflections):
+                values[name] = float(value)
+
+            for j, (variable, suffix, step) in enumerate(variables):
+                plus, minus = base + 1 + 2 * j, base + 2 + 2 * j
+                for coef in DERIVATIVE_COEFFICIENTS:
+                    derivative = (coefs[coef][plus] - coefs[coef][minus]) / (2.0 * step)
+                    values[f"{coef}{suffix}"] = float(derivative)
+
+            if abs(values["CLa"]) > 1e-12:
+                values["Xnp"] = float(lattice.ref_point[0] - lattice.Cref * values["Cma"] / values["CLa"])
+
+            results[case.name] = values
+
+    return results
+
+
+def cross_check(avl_values: dict, estimate: dict, keys=("CLtot", "Cmtot", "CLa", "Cma")) -> dict:
+    """
+    Returns {key: estimate - AVL} for the keys present in both result dicts,
+    e.g. to flag AVL runs that disagree grossly with the internal lattice.
+    """
+    return {key: estimate[key] - avl_values[key] for key in keys if key in avl_values and key in estimate}
@@ -1,13 +1,14 @@
 # File: workspace.py
 
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import os
 from models import Aircraft, MassProperty, GeometrySurface, SimulationCase, aircraft, property_drafts, validate_property_fields
 from input_windows import MassPropertyEditor
 from input_windows import GeometryPropertyEditor
 from tabs import SurfaceTab, AnalysisTab, ResultsTab
 from input_windows import SimulationCaseEditor
+from importer import import_avl, merge_aircraft
 
 
 RESULTS_DIR = os.path.join(os.getcwd(), "results")
@@ -324,6 +325,29 @@ def on_tab_changed(event):
     elif hasattr(selected_tab, 'refresh_job_list'):
         selected_tab.refresh_job_list()
 
+# ======== AVL Import ========
+def import_avl_deck(tab_control):
+    """
+    Imports an .avl deck (with its same-named .mass and .run files) into the session.
+    """
+    filepath = filedialog.askopenfilename(filetypes=[("AVL Geometry Files", "*.avl")])
+    if not filepath:
+        return
+    try:
+        imported = import_avl(filepath)
+    except (OSError, ValueError, IndexError, StopIteration) as e:
+        messagebox.showerror("Import Failed", f"Could not import {os.path.basename(filepath)}: {e}")
+        return
+
+    merge_aircraft(aircraft, imported)
+    tab_control.geometry_tab.update_listbox(aircraft.geometry.keys())
+    tab_control.properties_tab.update_listbox(aircraft.mass_properties.keys())
+    tab_control.case_tab.update_listbox(aircraft.simulation_cases.keys())
+    tab_control.analysis_tab.refresh_lists()
+    messagebox.showinfo("Import Complete", f"Imported {len(imported.geometry)} surfaces, "
+                        f"{len(imported.mass_properties)} mass components and "
+                        f"{len(imported.simulation_cases)} cases.")
+
 # ======== Main Window Launcher ========
 def open_main_window():
     main_window = tk.Toplevel()
@@ -338,6 +362,8 @@ def open_main_window():
     file_menu.add_command(label="Open", command=lambda: None)
     file_menu.add_command(label="Save", command=lambda: None)
     file_menu.add_command(label="Save As", command=lambda: None)
+    file_menu.add_separator()
+    file_menu.add_command(label="Import AVL...", command=lambda: import_avl_deck(tab_control))
     menu_bar.add_cascade(label="File", menu=file_menu)
 
     help_menu = tk.Menu(menu_bar, tearoff=0)
@@ -351,6 +377,9 @@ def open_main_window():
     analysis_tab = AnalysisTab(tab_control)
     results_tab = ResultsTab(tab_control)
 
+    tab_control.geometry_tab = geometry_tab
+    tab_control.properties_tab = properties_tab
+    tab_control.case_tab = case_tab
     tab_control.analysis_tab = analysis_tab
     tab_control.results_tab = results_tab
 